@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory used by a channel records export.
+
+Seeds one channel with synthetic games (four plays each) until it holds the
+requested number of plays, then exports it twice in fresh interpreters: once
+buffering the whole result like `DatabaseSession.execute()` does, and once
+through the server-side cursor used by `stream_channel_records()`. Each run
+reports its peak RSS, the time to the first row and the total time.
+
+Point this at a scratch database that is already migrated to head; it is
+seeded with extra rows that are left in place for later runs.
+
+Usage: uv run scripts/benchmark_export.py <database-url> [plays]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, text
+
+GUILD_XID = 900_000_000_000_000_001
+CHANNEL_XID = 900_000_000_000_000_002
+USERS = 1_000
+SEATS = 4
+
+SEED = """
+INSERT INTO guilds (xid, name) VALUES (:guild, 'benchmark-guild') ON CONFLICT DO NOTHING;
+INSERT INTO channels (xid, guild_xid, name)
+    VALUES (:channel, :guild, 'benchmark-channel') ON CONFLICT DO NOTHING;
+INSERT INTO users (xid, name)
+    SELECT :guild + n, 'benchmark-user-' || n FROM generate_series(1, :users) AS n
+    ON CONFLICT DO NOTHING;
+WITH new_games AS (
+    INSERT INTO games (guild_xid, channel_xid, seats, status, updated_at)
+    SELECT :guild, :channel, :seats, 2, now() - n * interval '1 minute'
+    FROM generate_series(1, :games) AS n
+    RETURNING id
+), new_posts AS (
+    INSERT INTO posts (game_id, guild_xid, channel_xid, message_xid)
+    SELECT id, :guild, :channel, id FROM new_games
+)
+INSERT INTO plays (game_id, user_xid, og_guild_xid)
+SELECT new_games.id, :guild + 1 + (new_games.id * :seats + seat) % :users, :guild
+FROM new_games, generate_series(0, :seats - 1) AS seat;
+"""
+
+RUN = """
+import asyncio, json, resource, sys, time
+from sqlalchemy import text
+from spellbot.database import DatabaseSession, initialize_connection, read_only_session_manager
+from spellbot.services import plays
+
+async def main(mode, guild_xid, channel_xid):
+    await initialize_connection("spellbot-benchmark", run_migrations=False)
+    start = time.perf_counter()
+    first = None
+    rows = 0
+    async with read_only_session_manager():
+        if mode == "buffered":
+            result = await DatabaseSession.execute(
+                text(plays.CHANNEL_RECORDS_EXPORT_SQL),
+                {"guild_xid": guild_xid, "channel_xid": channel_xid},
+            )
+            for _ in result:
+                first = first or time.perf_counter()
+                rows += 1
+        else:
+            async for _ in plays.stream_channel_records(guild_xid, channel_xid):
+                first = first or time.perf_counter()
+                rows += 1
+    end = time.perf_counter()
+    print(json.dumps({
+        "rows": rows,
+        "first_row_s": (first or end) - start,
+        "total_s": end - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+asyncio.run(main(sys.argv[1], int(sys.argv[2]), int(sys.argv[3])))
+"""
+
+
+def seed(url: str, plays: int) -> None:
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        have = conn.execute(
+            text("SELECT COUNT(*) FROM games WHERE channel_xid = :channel"),
+            {"channel": CHANNEL_XID},
+        ).scalar_one()
+        games = plays // SEATS - have
+        if games > 0:
+            print(f"seeding {games * SEATS:,} plays...")  # noqa: T201
+            params = {
+                "guild": GUILD_XID,
+                "channel": CHANNEL_XID,
+                "users": USERS,
+                "seats": SEATS,
+                "games": games,
+            }
+            for statement in SEED.split(";"):
+                if statement.strip():
+                    conn.execute(text(statement), params)
+    engine.dispose()
+
+
+def run(mode: str, url: str) -> dict[str, float]:
+    env = {**os.environ, "DATABASE_URL": url}
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", RUN, mode, str(GUILD_XID), str(CHANNEL_XID)],
+        check=True,
+        capture_output=True,
+        env=env,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    url = sys.argv[1]
+    plays = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    seed(url, plays)
+    for mode in ("buffered", "streamed"):
+        stats = run(mode, url)
+        print(  # noqa: T201
+            f"{mode:>8}: {stats['rows']:,} rows, "
+            f"peak RSS {stats['peak_rss_mb']:,.0f}MB, "
+            f"first row {stats['first_row_s'] * 1000:,.0f}ms, "
+            f"total {stats['total_s']:.1f}s "
+            f"({stats['rows'] / stats['total_s']:,.0f} rows/s)",
+        )
+
+
+if __name__ == "__main__":
+    main()
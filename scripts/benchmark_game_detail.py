@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark the queries behind the public game detail page.
+
+Seeds one started game with a post, four plays and a queued player, then loads
+its detail view repeatedly two ways: with the one query per table (plus a users
+lookup) it used to take, and with the single `json_agg` statement used by
+`services.games.game_detail_view()`, whose cache is cleared before every call so
+that only the database round trips are measured. Each way reports the statements
+issued per load and the median and 95th percentile latency.
+
+Point `DATABASE_URL` at a scratch database that is already migrated to head; it
+is seeded with extra rows that are left in place for later runs.
+
+Usage: DATABASE_URL=<database-url> uv run scripts/benchmark_game_detail.py [loads]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from sqlalchemy import create_engine, select, text
+
+from spellbot.database import DatabaseSession, db_session_manager, initialize_connection
+from spellbot.models import Channel, Game, Guild, Play, Post, Queue, User
+from spellbot.query_stats import query_scope
+from spellbot.services import games
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+GUILD_XID = 900_000_000_000_000_101
+CHANNEL_XID = 900_000_000_000_000_102
+SEATS = 4
+
+SEED = """
+INSERT INTO guilds (xid, name) VALUES (:guild, 'benchmark-guild') ON CONFLICT DO NOTHING;
+INSERT INTO channels (xid, guild_xid, name)
+    VALUES (:channel, :guild, 'benchmark-channel') ON CONFLICT DO NOTHING;
+INSERT INTO users (xid, name)
+    SELECT :guild + n, 'benchmark-user-' || n FROM generate_series(1, :seats + 1) AS n
+    ON CONFLICT DO NOTHING;
+WITH new_game AS (
+    INSERT INTO games (guild_xid, channel_xid, seats, status, started_at, updated_at)
+    VALUES (:guild, :channel, :seats, 2, now(), now())
+    RETURNING id
+), new_post AS (
+    INSERT INTO posts (game_id, guild_xid, channel_xid, message_xid)
+    SELECT id, :guild, :channel, id FROM new_game
+), new_queue AS (
+    INSERT INTO queues (game_id, user_xid, og_guild_xid)
+    SELECT id, :guild + :seats + 1, :guild FROM new_game
+)
+INSERT INTO plays (game_id, user_xid, og_guild_xid)
+SELECT new_game.id, :guild + seat, :guild
+FROM new_game, generate_series(1, :seats) AS seat;
+"""
+
+
+def seed(url: str) -> int:
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        params = {"guild": GUILD_XID, "channel": CHANNEL_XID, "seats": SEATS}
+        for statement in SEED.split(";"):
+            if statement.strip():
+                conn.execute(text(statement), params)
+        game_id = conn.execute(
+            text("SELECT max(id) FROM games WHERE channel_xid = :channel"),
+            {"channel": CHANNEL_XID},
+        ).scalar_one()
+    engine.dispose()
+    return int(game_id)
+
+
+async def per_table(game_id: int) -> None:
+    """Load the game's details the way `game_detail_view()` used to, one table at a time."""
+    game = (await DatabaseSession.execute(select(Game).where(Game.id == game_id))).scalar_one()
+    await DatabaseSession.execute(select(Guild).where(Guild.xid == game.guild_xid))
+    await DatabaseSession.execute(select(Channel).where(Channel.xid == game.channel_xid))
+    await DatabaseSession.execute(select(Post).where(Post.game_id == game_id))
+    plays = (
+        await DatabaseSession.execute(select(Play).where(Play.game_id == game_id))  # type: ignore
+    ).scalars()
+    queues = (
+        await DatabaseSession.execute(select(Queue).where(Queue.game_id == game_id))
+    ).scalars()
+    user_xids = {p.user_xid for p in plays} | {q.user_xid for q in queues}
+    await DatabaseSession.execute(select(User).where(User.xid.in_(user_xids)))
+
+
+async def single_statement(game_id: int) -> None:
+    games.game_detail_cache.clear()
+    await games.game_detail_view(game_id)
+
+
+async def measure(
+    load: Callable[[int], Awaitable[None]],
+    game_id: int,
+    loads: int,
+) -> tuple[int, list[float]]:
+    timings = []
+    statements = 0
+    for _ in range(loads):
+        with query_scope() as stats:
+            start = time.perf_counter()
+            async with db_session_manager():
+                await load(game_id)
+            timings.append(time.perf_counter() - start)
+        statements = stats.statements
+    return statements, timings
+
+
+async def run(game_id: int, loads: int) -> None:
+    await initialize_connection("spellbot-benchmark", run_migrations=False)
+    for name, load in (("per-table", per_table), ("single", single_statement)):
+        await measure(load, game_id, 10)  # warm up the pool and statement caches
+        statements, timings = await measure(load, game_id, loads)
+        p50 = statistics.median(timings) * 1000
+        p95 = statistics.quantiles(timings, n=20)[-1] * 1000
+        print(  # noqa: T201
+            f"{name:>9}: {statements} statements per load, p50 {p50:.2f}ms, p95 {p95:.2f}ms",
+        )
+
+
+def main() -> None:
+    loads = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    game_id = seed(os.environ["DATABASE_URL"])
+    asyncio.run(run(game_id, loads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark encoding the web app's largest JSON responses.
+
+Builds representative payloads (a full SQL console result, an all-time
+dashboard chart and an all-time analytics panel) and encodes each one with
+`json.dumps` the way responses used to be built and with the `orjson`
+encoder of `spellbot.web.json_encoding`. Reports the median encode time,
+the body size, and how long gzipping the body takes and how small it gets.
+
+Usage: uv run scripts/benchmark_json.py [runs]
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from spellbot.services.dashboard import JS_SAFE_INT, SQL_CONSOLE_MAX_ROWS, json_cell
+from spellbot.web.json_encoding import dumps
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+START = datetime(2020, 1, 1, tzinfo=UTC)
+DAYS = 6 * 365
+
+
+def sql_console_rows() -> dict[str, Any]:
+    rows = [
+        [
+            n,
+            JS_SAFE_INT + n,
+            f"user-{n}",
+            START + timedelta(minutes=n),
+            Decimal(n) / 7,
+            n % 2 == 0,
+            None,
+            4.5 * n,
+        ]
+        for n in range(SQL_CONSOLE_MAX_ROWS)
+    ]
+    return {
+        "columns": ["id", "xid", "name", "created_at", "ratio", "even", "note", "score"],
+        "rows": [[json_cell(cell) for cell in row] for row in rows],
+        "row_count": len(rows),
+        "truncated": True,
+    }
+
+
+def all_time_chart() -> dict[str, Any]:
+    days = [(START + timedelta(days=n)).date().isoformat() for n in range(DAYS)]
+    return {
+        kind: [{"date": day, "count": n % 97} for n, day in enumerate(days)]
+        for kind in ("started", "expired", "players")
+    }
+
+
+def analytics_panel() -> dict[str, Any]:
+    return {
+        "top_players": [
+            {"xid": str(JS_SAFE_INT + n), "name": f"player-{n}", "count": 5000 - n}
+            for n in range(500)
+        ],
+        "heatmap": [[(day * 24 + hour) % 13 for hour in range(24)] for day in range(7)],
+        "daily": [
+            {"date": (START + timedelta(days=n)).date().isoformat(), "count": n % 41}
+            for n in range(DAYS)
+        ],
+    }
+
+
+PAYLOADS: dict[str, Callable[[], dict[str, Any]]] = {
+    "sql console": sql_console_rows,
+    "all-time chart": all_time_chart,
+    "analytics panel": analytics_panel,
+}
+
+
+def old_dumps(value: Any) -> bytes:
+    """Encode the way responses used to be built: stdlib text, then UTF-8."""
+    return json.dumps(value, default=str).encode()
+
+
+def median_ms(fn: Callable[[], object], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    encoders: dict[str, Callable[[Any], bytes]] = {"json.dumps": old_dumps, "orjson": dumps}
+    for payload_name, build in PAYLOADS.items():
+        payload = build()
+        print(f"{payload_name}:")  # noqa: T201
+        for name, encode in encoders.items():
+            body = encode(payload)
+            encode_ms = median_ms(lambda encode=encode, payload=payload: encode(payload), runs)
+            gzip_ms = median_ms(lambda body=body: gzip.compress(body, compresslevel=6), runs)
+            compressed = len(gzip.compress(body, compresslevel=6))
+            print(  # noqa: T201
+                f"  {name:>10}: encode {encode_ms:6.2f}ms, {len(body) / 1024:7.1f}KB; "
+                f"gzip {gzip_ms:6.2f}ms, {compressed / 1024:6.1f}KB",
+            )
+
+
+if __name__ == "__main__":
+    main()
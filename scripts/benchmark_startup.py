@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup migration check against always running alembic.
+
+Each run is a fresh interpreter, so the cost of importing alembic and loading
+every migration script is measured the same way a booting bot or API task pays
+it. The database must already be migrated to head for the fast path to apply.
+
+Usage: uv run scripts/benchmark_startup.py <database-url> [runs]
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import time
+
+FULL = """
+import sys
+from sqlalchemy import create_engine
+from spellbot.models.base import upgrade_to_head
+engine = create_engine(sys.argv[1])
+upgrade_to_head(engine, sys.argv[1])
+engine.dispose()
+"""
+
+FAST = """
+import sys
+from spellbot.models import create_all
+create_all(sys.argv[1])
+"""
+
+
+def time_runs(code: str, url: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code, url], check=True)  # noqa: S603
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    url = sys.argv[1]
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # Make sure the database is at head so that every fast run takes the fast path.
+    time_runs(FULL, url, 1)
+
+    full = statistics.median(time_runs(FULL, url, runs))
+    fast = statistics.median(time_runs(FAST, url, runs))
+    print(f"alembic upgrade:  {full * 1000:8.1f}ms (median of {runs})")  # noqa: T201
+    print(f"head fast path:   {fast * 1000:8.1f}ms (median of {runs})")  # noqa: T201
+    print(f"saved per start:  {(full - fast) * 1000:8.1f}ms ({full / fast:.1f}x faster)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
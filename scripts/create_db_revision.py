@@ -13,6 +13,7 @@ SRC_ROOT = Path(realpath(__file__)).parent.parent
 SPELLBOT_DIR = SRC_ROOT / "src" / "spellbot"
 MIGRATIONS_DIR = SPELLBOT_DIR / "migrations"
 ALEMBIC_INI = MIGRATIONS_DIR / "alembic.ini"
+HEAD_REVISION_FILE = MIGRATIONS_DIR / "HEAD"
 
 url = sys.argv[1]
 message = sys.argv[2]
@@ -20,4 +21,8 @@ message = sys.argv[2]
 config = alembic.config.Config(str(ALEMBIC_INI))
 config.set_main_option("script_location", str(MIGRATIONS_DIR))
 config.set_main_option("sqlalchemy.url", url)
-alembic.command.revision(config, message=message, autogenerate=True)
+script = alembic.command.revision(config, message=message, autogenerate=True)
+
+# Record the new head so that startup can skip alembic when the database is current.
+if script is not None and not isinstance(script, list):
+    HEAD_REVISION_FILE.write_text(f"{script.revision}\n")
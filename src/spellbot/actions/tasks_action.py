@@ -211,6 +211,14 @@ class TasksAction:
         logger.info("starting task patreon_sync")
         self.bot.supporters = await services.patreon.supporters()
 
+    async def refresh_dashboard_rollups(self) -> None:
+        logger.info("starting task refresh_dashboard_rollups")
+        await services.rollups.refresh()
+
+    async def refresh_analytics_snapshots(self) -> None:
+        logger.info("starting task refresh_analytics_snapshots")
+        await services.snapshots.refresh()
+
     async def notify_pending_games(self) -> None:
         logger.info("starting task notify_pending_games")
         try:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from inspect import cleandoc
+import secrets
 from typing import TYPE_CHECKING
 
 from ddtrace.trace import tracer
@@ -12,6 +12,8 @@ from spellbot.actions.base_action import handle_exception
 from spellbot.database import db_session_manager
 from spellbot.metrics import add_span_context
 from spellbot.operations import safe_send_user
+from spellbot.pool_stats import format_pool_summary, pool_snapshots
+from spellbot.query_stats import format_scope_summary
 from spellbot.settings import settings
 from spellbot.utils import for_all_callbacks, load_extensions
 
@@ -75,6 +77,25 @@ async def set_admin(is_admin: bool, ctx: commands.Context[SpellBot], arg: str |
     return None
 
 
+async def create_api_token(ctx: commands.Context[SpellBot], arg: str | None) -> None:
+    assert ctx.message
+    scopes = arg or "*"
+    key = secrets.token_urlsafe(32)
+    await services.apps.create_token(key, scopes=scopes)
+    await safe_send_user(ctx.message.author, f"Created API token `{key}` with scopes `{scopes}`.")
+
+
+async def delete_api_token(ctx: commands.Context[SpellBot], arg: str | None) -> None:
+    assert ctx.message
+    if arg is None:
+        return await safe_send_user(ctx.message.author, "No target token.")
+
+    if not await services.apps.delete_token(arg):
+        return await safe_send_user(ctx.message.author, "No such API token.")
+    await safe_send_user(ctx.message.author, "API token deleted.")
+    return None
+
+
 @for_all_callbacks(commands.is_owner())
 class OwnerCog(commands.Cog):
     def __init__(self, bot: SpellBot) -> None:
@@ -161,26 +182,48 @@ class OwnerCog(commands.Cog):
                 await safe_send_user(ctx.message.author, f"Error: {ex}")
                 await handle_exception(ex)
 
+    @commands.command(name="create_token")
+    @tracer.wrap(name="interaction", resource="create_token")
+    async def create_token(self, ctx: commands.Context[SpellBot], arg: str | None = None) -> None:
+        add_span_context(ctx)
+        async with db_session_manager():
+            try:
+                await create_api_token(ctx, arg)
+            except Exception as ex:
+                await safe_send_user(ctx.message.author, f"Error: {ex}")
+                await handle_exception(ex)
+
+    @commands.command(name="delete_token")
+    @tracer.wrap(name="interaction", resource="delete_token")
+    async def delete_token(self, ctx: commands.Context[SpellBot], arg: str | None = None) -> None:
+        add_span_context(ctx)
+        async with db_session_manager():
+            try:
+                await delete_api_token(ctx, arg)
+            except Exception as ex:
+                await safe_send_user(ctx.message.author, f"Error: {ex}")
+                await handle_exception(ex)
+
     @commands.command(name="stats")
     @tracer.wrap(name="interaction", resource="stats")
     async def stats(self, ctx: commands.Context[SpellBot]) -> None:
         add_span_context(ctx)
-        await safe_send_user(
-            ctx.message.author,
-            cleandoc(
-                f"""
-                    ```
-                    status:   {self.bot.status}
-                    activity: {self.bot.activity}
-                    ready:    {self.bot.is_ready()}
-                    shards:   {self.bot.shard_count}
-                    guilds:   {len(self.bot.guilds)}
-                    users:    {len(self.bot.users)}
-                    patrons:  {self.bot.supporters}
-                    ```
-                """,
-            ),
+        lines = [
+            f"status:   {self.bot.status}",
+            f"activity: {self.bot.activity}",
+            f"ready:    {self.bot.is_ready()}",
+            f"shards:   {self.bot.shard_count}",
+            f"guilds:   {len(self.bot.guilds)}",
+            f"users:    {len(self.bot.users)}",
+            f"patrons:  {self.bot.supporters}",
+            f"sessions: {format_scope_summary()}",
+        ]
+        # One line per database connection pool in this process, e.g. "primary:  3/20 in use..."
+        lines.extend(
+            f"{pool['name'] + ':':<10}{format_pool_summary(pool)}" for pool in pool_snapshots()
         )
+        body = "\n".join(lines)
+        await safe_send_user(ctx.message.author, f"```\n{body}\n```")
 
 
 async def setup(bot: SpellBot) -> None:  # pragma: no cover
@@ -76,11 +76,37 @@ async def run_patreon_sync_loop(bot: SpellBot) -> None:  # pragma: no cover
         await asyncio.sleep(interval)
 
 
+async def run_dashboard_rollup_loop(bot: SpellBot) -> None:  # pragma: no cover
+    interval = settings.DASHBOARD_ROLLUP_LOOP_M * 60  # Convert minutes to seconds
+    while True:
+        try:
+            with tracer.trace(name="command", resource="refresh_dashboard_rollups"):
+                async with TasksAction.create(bot) as action:
+                    await action.refresh_dashboard_rollups()
+        except BaseException:  # Catch EVERYTHING so tasks don't die
+            logger.exception("error: exception in dashboard rollup task")
+        await asyncio.sleep(interval)
+
+
+async def run_analytics_snapshot_loop(bot: SpellBot) -> None:  # pragma: no cover
+    interval = settings.ANALYTICS_SNAPSHOT_LOOP_M * 60  # Convert minutes to seconds
+    while True:
+        try:
+            with tracer.trace(name="command", resource="refresh_analytics_snapshots"):
+                async with TasksAction.create(bot) as action:
+                    await action.refresh_analytics_snapshots()
+        except BaseException:  # Catch EVERYTHING so tasks don't die
+            logger.exception("error: exception in analytics snapshot task")
+        await asyncio.sleep(interval)
+
+
 class TasksCog(commands.Cog):  # pragma: no cover
     def __init__(self, bot: SpellBot) -> None:
         self.bot = bot
         self._shard_status_task: asyncio.Task[None] | None = None
         self._patreon_sync_task: asyncio.Task[None] | None = None
+        self._dashboard_rollup_task: asyncio.Task[None] | None = None
+        self._analytics_snapshot_task: asyncio.Task[None] | None = None
 
         if not running_in_pytest() and not bot.disable_tasks:
             self.cleanup_old_voice_channels.start()
@@ -90,12 +116,18 @@ class TasksCog(commands.Cog):  # pragma: no cover
             # Start tasks that don't require discord.py ready signal
             self._shard_status_task = asyncio.create_task(run_shard_status_loop(bot))
             self._patreon_sync_task = asyncio.create_task(run_patreon_sync_loop(bot))
+            self._dashboard_rollup_task = asyncio.create_task(run_dashboard_rollup_loop(bot))
+            self._analytics_snapshot_task = asyncio.create_task(run_analytics_snapshot_loop(bot))
 
     def cog_unload(self) -> None:
         if self._shard_status_task:
             self._shard_status_task.cancel()
         if self._patreon_sync_task:
             self._patreon_sync_task.cancel()
+        if self._dashboard_rollup_task:
+            self._dashboard_rollup_task.cancel()
+        if self._analytics_snapshot_task:
+            self._analytics_snapshot_task.cancel()
 
     ###############################################
     # Clean up old voice channels
@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 from contextlib import asynccontextmanager
 from contextvars import ContextVar, Token
-from typing import TYPE_CHECKING, Any, NoReturn
+from typing import TYPE_CHECKING, Any, Final, NoReturn
 from uuid import uuid4
 
-from sqlalchemy import any_, bindparam
+from sqlalchemy import any_, bindparam, event, func, select
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
@@ -15,9 +15,12 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 from wrapt import CallableObjectProxy
 
 from .models import create_all, reverse_all
+from .pool_stats import InstrumentedQueuePool, instrument_pool
+from .query_stats import instrument_queries, query_scope
 from .settings import settings
 
 if TYPE_CHECKING:
@@ -38,6 +41,9 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# Key in each session's `info` dict set once the session has begun a transaction.
+TOUCHED_KEY: Final = "spellbot_touched"
+
 context_vars: dict[ContextLocal[Any], ContextVar[Any]] = {}
 
 
@@ -92,6 +98,8 @@ class TypedProxy[ProxiedObject](_CallableObjectProxyBase[ProxiedObject]):
 engine = TypedProxy[AsyncEngine].of_type(AsyncEngine)
 connection = TypedProxy[AsyncConnection].of_type(AsyncConnection)
 db_session_maker = TypedProxy[async_sessionmaker[AsyncSession]].of_type(async_sessionmaker)
+read_only_engine = TypedProxy[AsyncEngine].of_type(AsyncEngine)
+read_only_session_maker = TypedProxy[async_sessionmaker[AsyncSession]].of_type(async_sessionmaker)
 DatabaseSession = ContextLocal[AsyncSession].of_type(AsyncSession)
 
 
@@ -103,6 +111,24 @@ def to_async_url(db_url: str) -> str:
     return db_url  # pragma: no cover
 
 
+def build_engine(db_url: str, app: str, *, pool_name: str, use_transaction: bool) -> AsyncEngine:
+    engine_obj = create_async_engine(
+        to_async_url(db_url),
+        echo=settings.DATABASE_ECHO,
+        connect_args={"application_name": app},
+        isolation_level=None if use_transaction else "AUTOCOMMIT",
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_S,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=pool_name,
+    )
+    instrument_pool(engine_obj, pool_name)
+    instrument_queries(engine_obj)
+    return engine_obj
+
+
 async def initialize_connection(
     app: str,
     *,
@@ -133,25 +159,24 @@ async def initialize_connection(
     session nests inside the outer transaction via savepoints. The whole
     outer transaction can then be discarded via `rollback_transaction()`,
     which is useful for tests that want full isolation.
+
+    When `DATABASE_REPLICA_URL` is configured, a second `AsyncEngine` with its
+    own pool is created against the read replica and backs the sessions handed
+    out by `read_only_session_manager()`. Heavy read workloads (analytics,
+    dashboard, records and exports) then never compete with bot interactions
+    for connections to the primary. Without a replica, or when
+    `use_transaction` is set, read-only sessions simply use the primary.
     """
     db_url = settings.RESOLVED_DATABASE_URL
+    replica_url = settings.RESOLVED_DATABASE_REPLICA_URL
     if worker_id:
         db_url += f"-{worker_id}"
+        replica_url = f"{replica_url}-{worker_id}" if replica_url else None
         app += f"-{worker_id}"
     if run_migrations:  # pragma: no cover
         create_all(db_url)
 
-    async_url = to_async_url(db_url)
-    engine_obj: AsyncEngine = create_async_engine(
-        async_url,
-        echo=settings.DATABASE_ECHO,
-        connect_args={"application_name": app},
-        isolation_level=None if use_transaction else "AUTOCOMMIT",
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
-        pool_recycle=settings.DATABASE_POOL_RECYCLE_S,
-        pool_pre_ping=True,
-    )
+    engine_obj = build_engine(db_url, app, pool_name="primary", use_transaction=use_transaction)
 
     if use_transaction:  # pragma: no cover
         connection_obj = await engine_obj.connect()
@@ -168,8 +193,25 @@ async def initialize_connection(
             expire_on_commit=False,
         )
 
+    if replica_url and not use_transaction:
+        read_only_engine_obj = build_engine(
+            replica_url,
+            f"{app}-replica",
+            pool_name="replica",
+            use_transaction=False,
+        )
+        read_only_session_maker_obj = async_sessionmaker(
+            bind=read_only_engine_obj,
+            expire_on_commit=False,
+        )
+    else:
+        read_only_engine_obj = engine_obj
+        read_only_session_maker_obj = db_session_maker_obj
+
     engine.set(engine_obj)
     db_session_maker.set(db_session_maker_obj)
+    read_only_engine.set(read_only_engine_obj)
+    read_only_session_maker.set(read_only_session_maker_obj)
 
 
 async def begin_session() -> Token[AsyncSession]:
@@ -181,7 +223,34 @@ async def rollback_session() -> None:  # pragma: no cover
     await DatabaseSession.rollback()
 
 
+def mark_touched(session: Session, *_: Any) -> None:
+    session.info[TOUCHED_KEY] = True
+
+
+# Sessions begin when their first statement checks out a connection.
+event.listen(Session, "after_begin", mark_touched)
+
+
+def session_untouched() -> bool:
+    """
+    Return True when the scoped session never ran a statement and has nothing to flush.
+
+    Sessions only check out a connection when their first statement runs, so an
+    untouched session holds no connection or transaction and needs no commit or close.
+    A session that ran statements and then committed is no longer in a transaction,
+    so whether it ever began one is tracked separately by `mark_touched()`.
+    """
+    return not DatabaseSession.info.get(TOUCHED_KEY) and not (
+        DatabaseSession.new or DatabaseSession.dirty or DatabaseSession.deleted
+    )
+
+
 async def end_session(token: Token[AsyncSession]) -> None:
+    if session_untouched():
+        # Cheap requests (404s, failed auth checks) skip the commit, the close and
+        # the outer session's `expire_all()`, since nothing here could have changed.
+        DatabaseSession.reset(token)
+        return
     await DatabaseSession.commit()
     await DatabaseSession.close()
     DatabaseSession.reset(token)
@@ -191,11 +260,97 @@ async def end_session(token: Token[AsyncSession]) -> None:
 
 @asynccontextmanager
 async def db_session_manager() -> AsyncGenerator[None]:
-    token = await begin_session()
-    try:
-        yield
-    finally:
-        await end_session(token)
+    with query_scope():
+        token = await begin_session()
+        try:
+            yield
+        finally:
+            await end_session(token)
+
+
+async def begin_read_only_session() -> Token[AsyncSession]:
+    session = read_only_session_maker()
+    return DatabaseSession.set(session)
+
+
+async def end_read_only_session(token: Token[AsyncSession]) -> None:
+    if session_untouched():
+        DatabaseSession.reset(token)
+        return
+    # Nothing to commit: closing releases the connection and discards any transaction.
+    await DatabaseSession.close()
+    DatabaseSession.reset(token)
+    if DatabaseSession.is_set():
+        DatabaseSession.expire_all()
+
+
+@asynccontextmanager
+async def read_only_session_manager() -> AsyncGenerator[None]:
+    """
+    Scope `DatabaseSession` to a session on the read replica, if one is configured.
+
+    Services are unaware of which engine backs `DatabaseSession`, so the same query
+    functions work in either scope. Replicas lag the primary slightly, so use this
+    only for reporting reads that never write and can tolerate a few seconds of
+    staleness. It nests inside `db_session_manager()`: the outer primary session is
+    restored on exit.
+    """
+    with query_scope():
+        token = await begin_read_only_session()
+        try:
+            yield
+        finally:
+            await end_read_only_session(token)
+
+
+@asynccontextmanager
+async def transaction_session_manager() -> AsyncGenerator[None]:
+    """
+    Scope `DatabaseSession` to a single transaction on a connection of its own.
+
+    The engine runs with `AUTOCOMMIT`, so each statement in an ordinary session
+    commits as soon as it runs. Work that must be all-or-nothing, or that takes a
+    lock only held until its transaction ends (`pg_try_advisory_xact_lock`), runs
+    here instead: it commits together on exit and rolls back if anything raises.
+    Like `read_only_session_manager()`, the outer session is restored on exit.
+    """
+    if connection.__wrapped__ is not None:  # pragma: no cover
+        # Under `use_transaction` every session already nests in the outer transaction.
+        async with db_session_manager():
+            yield
+        return
+    with query_scope():
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="READ COMMITTED")
+            async with conn.begin():
+                token = DatabaseSession.set(db_session_maker(bind=conn))
+                try:
+                    yield
+                    # The session joins the connection's transaction, so this only flushes.
+                    await DatabaseSession.commit()
+                finally:
+                    await DatabaseSession.close()
+                    DatabaseSession.reset(token)
+    if DatabaseSession.is_set():  # pragma: no branch
+        DatabaseSession.expire_all()
+
+
+@asynccontextmanager
+async def advisory_lock(key: int) -> AsyncGenerator[bool]:
+    """
+    Hold the session-level advisory lock `key` if it is free, yielding whether it was.
+
+    The lock is taken on a connection of its own and released on exit, so work done
+    under it can commit as it goes. If the process dies, Postgres releases the lock
+    along with the connection.
+    """
+    async with engine.connect() as conn:
+        locked = bool((await conn.execute(select(func.pg_try_advisory_lock(key)))).scalar())
+        try:
+            yield locked
+        finally:
+            if locked:
+                await conn.execute(select(func.pg_advisory_unlock(key)))
 
 
 async def rollback_transaction() -> None:  # pragma: no cover
@@ -204,6 +359,8 @@ async def rollback_transaction() -> None:  # pragma: no cover
         await connection.__wrapped__.close()
     if engine.__wrapped__ is not None:
         await engine.__wrapped__.dispose()
+    if read_only_engine.__wrapped__ not in (None, engine.__wrapped__):
+        await read_only_engine.__wrapped__.dispose()
 
 
 def delete_test_database(worker_id: str) -> None:  # pragma: no cover
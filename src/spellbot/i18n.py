@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import i18n
+from babel import Locale, UnknownLocaleError
 
 if TYPE_CHECKING:
     import discord
@@ -40,6 +41,15 @@ def normalize_locale(locale: str) -> str:
     return match.group(1).lower() if match else "en"
 
 
+def language_name(locale: str | None) -> str:
+    """Return an English display name for `locale` (e.g., `ja` -> `Japanese`)."""
+    code = normalize_locale(locale or "en")
+    try:
+        return Locale.parse(code).get_display_name("en") or code
+    except UnknownLocaleError, ValueError:
+        return code
+
+
 def parse_accept_language(header: str) -> list[str]:
     """Return language tags from an `Accept-Language` header, best-quality first."""
     tagged: list[tuple[float, int, str]] = []
@@ -108,6 +108,56 @@ def add_span_request_id(request_id: str) -> None:  # pragma: no cover
         span.set_tag("request_id", request_id)
 
 
+@skip_if_no_metrics
+def add_span_pool_checkout(  # pragma: no cover
+    pool: str,
+    wait_ms: float,
+    in_use: int,
+    overflow: int,
+    age_s: float,
+) -> None:
+    """Tag the current span with a connection pool checkout, and total its wait on the root."""
+    if span := tracer.current_span():
+        span.set_metric(f"db.pool.{pool}.checkout_wait_ms", wait_ms)
+        span.set_metric(f"db.pool.{pool}.in_use", in_use)
+        span.set_metric(f"db.pool.{pool}.overflow", overflow)
+        span.set_metric(f"db.pool.{pool}.connection_age_s", age_s)
+    if root := tracer.current_root_span():
+        total = root.get_metrics().get("db.pool.checkout_wait_ms", 0.0)
+        root.set_metric("db.pool.checkout_wait_ms", total + wait_ms)
+
+
+@skip_if_no_metrics
+def add_span_query_stats(  # pragma: no cover
+    statements: int,
+    rows: int,
+    duration_ms: float,
+    max_repeats: int,
+) -> None:
+    """Add a session scope's SQL statement, row and time totals to the root span."""
+    if root := tracer.current_root_span():
+        metrics = root.get_metrics()
+        root.set_metrics(
+            {
+                "db.statements": metrics.get("db.statements", 0) + statements,
+                "db.rows": metrics.get("db.rows", 0) + rows,
+                "db.duration_ms": metrics.get("db.duration_ms", 0.0) + duration_ms,
+                "db.max_statement_repeats": max(
+                    metrics.get("db.max_statement_repeats", 0),
+                    max_repeats,
+                ),
+            },
+        )
+
+
+@skip_if_no_metrics
+def add_span_export_stats(rows: int, rows_per_s: float) -> None:  # pragma: no cover
+    """Tag the current span with how many rows an export sent and how fast."""
+    if span := tracer.current_span():
+        span.set_metric("export.rows", rows)
+        span.set_metric("export.rows_per_s", rows_per_s)
+
+
 @skip_if_no_metrics
 def add_span_context(interaction: Any) -> None:  # pragma: no cover
     if span := tracer.current_span():
@@ -0,0 +1,56 @@
+"""
+Adds user play weeks.
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a6b7c8d9e0f1"
+down_revision = "f5a6b7c8d9e0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_play_weeks",
+        sa.Column("user_xid", sa.BigInteger(), nullable=False),
+        sa.Column("week", sa.DateTime(), nullable=False),
+        sa.Column("guild_xid", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["guild_xid"], ["guilds.xid"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_xid"], ["users.xid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_xid", "week", "guild_xid"),
+    )
+    op.create_index(
+        op.f("ix_user_play_weeks_week"),
+        "user_play_weeks",
+        ["week"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_user_play_weeks_guild_xid"),
+        "user_play_weeks",
+        ["guild_xid"],
+        unique=False,
+    )
+    op.execute(
+        """
+        INSERT INTO user_play_weeks (user_xid, week, guild_xid)
+        SELECT DISTINCT plays.user_xid, date_trunc('week', games.started_at), games.guild_xid
+        FROM plays
+        JOIN games ON games.id = plays.game_id
+        WHERE games.started_at IS NOT NULL
+        """,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_play_weeks_guild_xid"), table_name="user_play_weeks")
+    op.drop_index(op.f("ix_user_play_weeks_week"), table_name="user_play_weeks")
+    op.drop_table("user_play_weeks")
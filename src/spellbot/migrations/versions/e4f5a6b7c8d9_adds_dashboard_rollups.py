@@ -0,0 +1,49 @@
+"""
+Adds dashboard rollups.
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4f5a6b7c8d9"
+down_revision = "d3e4f5a6b7c8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "guild_daily_rollups",
+        sa.Column("metric", sa.String(), nullable=False),
+        sa.Column("day", sa.DateTime(), nullable=False),
+        sa.Column("guild_xid", sa.BigInteger(), nullable=False),
+        sa.Column("key", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["guild_xid"], ["guilds.xid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("metric", "day", "guild_xid", "key"),
+    )
+    op.create_index(
+        op.f("ix_guild_daily_rollups_guild_xid"),
+        "guild_daily_rollups",
+        ["guild_xid"],
+        unique=False,
+    )
+    op.create_table(
+        "rollup_state",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.Column("covered_until", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rollup_state")
+    op.drop_index(op.f("ix_guild_daily_rollups_guild_xid"), table_name="guild_daily_rollups")
+    op.drop_table("guild_daily_rollups")
@@ -0,0 +1,44 @@
+"""
+Adds guild analytics snapshots.
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "f5a6b7c8d9e0"
+down_revision = "e4f5a6b7c8d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "guild_analytics_snapshots",
+        sa.Column("guild_xid", sa.BigInteger(), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("computed_at", sa.DateTime(), nullable=True),
+        sa.Column("viewed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["guild_xid"], ["guilds.xid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("guild_xid"),
+    )
+    op.create_index(
+        op.f("ix_guild_analytics_snapshots_viewed_at"),
+        "guild_analytics_snapshots",
+        ["viewed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_guild_analytics_snapshots_viewed_at"),
+        table_name="guild_analytics_snapshots",
+    )
+    op.drop_table("guild_analytics_snapshots")
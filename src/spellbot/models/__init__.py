@@ -37,8 +37,11 @@ from .game import Game, GameStatus, MAX_RULES_LENGTH  # noqa: E402
 from .guild import Guild  # noqa: E402
 from .guild_member import GuildMember  # noqa: E402
 from .play import Play, generate_pin  # noqa: E402
+from .play_week import UserPlayWeek  # noqa: E402
 from .post import Post  # noqa: E402
 from .queue import Queue  # noqa: E402
+from .rollup import GuildDailyRollup, RollupState  # noqa: E402
+from .snapshot import GuildAnalyticsSnapshot  # noqa: E402
 from .token import Token  # noqa: E402
 from .user import User  # noqa: E402
 from .verify import Verify  # noqa: E402
@@ -77,14 +80,18 @@ __all__ = [
     "Game",
     "GameStatus",
     "Guild",
+    "GuildAnalyticsSnapshot",
     "GuildAward",
+    "GuildDailyRollup",
     "GuildMember",
     "Play",
     "Post",
     "Queue",
+    "RollupState",
     "Token",
     "User",
     "UserAward",
+    "UserPlayWeek",
     "Verify",
     "Watch",
     "create_all",
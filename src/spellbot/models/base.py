@@ -4,16 +4,15 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-import alembic
-import alembic.command
-import alembic.config
 from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import declarative_base
 
 from . import import_models
 
 if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
     from sqlalchemy.engine.url import URL
     from sqlalchemy.ext.declarative import DeclarativeMeta
 
@@ -21,6 +20,8 @@ MODULE_ROOT = Path(__file__).resolve().parent
 PACKAGE_ROOT = MODULE_ROOT.parent
 MIGRATIONS_DIR = PACKAGE_ROOT / "migrations"
 ALEMBIC_INI = MIGRATIONS_DIR / "alembic.ini"
+# The newest migration revision, kept up to date by `scripts/create_db_revision.py`.
+HEAD_REVISION_FILE = MIGRATIONS_DIR / "HEAD"
 
 logger = logging.getLogger(__name__)
 
@@ -52,22 +53,63 @@ def ensure_database_exists(url: URL) -> None:  # pragma: no cover
         server_engine.dispose()
 
 
-def create_all(database_url: str) -> None:
+def packaged_head_revision() -> str | None:
+    """Return the head migration revision shipped alongside the migration scripts."""
+    try:
+        return HEAD_REVISION_FILE.read_text().strip() or None
+    except OSError:  # pragma: no cover
+        return None
+
+
+def database_at_head(engine: Engine) -> bool:
+    """
+    Return True when the database's `alembic_version` is the packaged head revision.
+
+    Any failure (the database or the `alembic_version` table not existing yet, say)
+    just means the full migration path has to run, so it is reported as False.
+    """
+    head = packaged_head_revision()
+    if head is None:  # pragma: no cover
+        return False
+    try:
+        with engine.connect() as connection:
+            versions = connection.execute(text("SELECT version_num FROM alembic_version"))
+            return versions.scalars().all() == [head]
+    except SQLAlchemyError:
+        return False
+
+
+def upgrade_to_head(engine: Engine, database_url: str) -> None:
+    # Importing alembic and loading every migration script is the slow part of
+    # startup, so it's deferred until we know there is something to migrate.
+    import alembic.command  # allow_inline
+    import alembic.config  # allow_inline
+
     import_models()
+    ensure_database_exists(engine.url)
+    with engine.connect() as connection:
+        config = alembic.config.Config(str(ALEMBIC_INI))
+        config.set_main_option("script_location", str(MIGRATIONS_DIR))
+        config.set_main_option("sqlalchemy.url", database_url)
+        config.attributes["connection"] = connection
+        alembic.command.upgrade(config, "head")
+
+
+def create_all(database_url: str) -> None:
     engine = create_engine(database_url, echo=False)
     try:
-        ensure_database_exists(engine.url)
-        with engine.connect() as connection:
-            config = alembic.config.Config(str(ALEMBIC_INI))
-            config.set_main_option("script_location", str(MIGRATIONS_DIR))
-            config.set_main_option("sqlalchemy.url", database_url)
-            config.attributes["connection"] = connection
-            alembic.command.upgrade(config, "head")
+        if database_at_head(engine):
+            logger.info("database is already at the head revision, skipping migrations")
+            return
+        upgrade_to_head(engine, database_url)
     finally:
         engine.dispose()
 
 
 def reverse_all(database_url: str) -> None:
+    import alembic.command  # allow_inline
+    import alembic.config  # allow_inline
+
     import_models()
     engine = create_engine(database_url, echo=False)
     try:
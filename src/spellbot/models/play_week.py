@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey
+
+from . import Base
+
+
+class UserPlayWeek(Base):
+    """A week in which a user played at least one game in a guild."""
+
+    __tablename__ = "user_play_weeks"
+
+    user_xid = Column(
+        BigInteger,
+        ForeignKey("users.xid", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+        doc="The external Discord ID of the user who played",
+    )
+    week = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        index=True,
+        doc="UTC midnight on the Monday starting the week of the game's `started_at`",
+    )
+    guild_xid = Column(
+        BigInteger,
+        ForeignKey("guilds.xid", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+        index=True,
+        doc="The external Discord ID of the guild the game was played in",
+    )
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.sql.expression import text
+
+from . import Base
+
+
+class GuildDailyRollup(Base):
+    """One guild's total for one dashboard metric over one UTC day."""
+
+    __tablename__ = "guild_daily_rollups"
+
+    metric = Column(
+        String,
+        primary_key=True,
+        nullable=False,
+        doc="The name of the metric being totalled, see `services.rollups.RollupMetric`",
+    )
+    day = Column(
+        DateTime,
+        primary_key=True,
+        nullable=False,
+        doc="UTC midnight at the start of the day this total covers",
+    )
+    guild_xid = Column(
+        BigInteger,
+        ForeignKey("guilds.xid", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+        index=True,
+        doc="The external Discord ID of the guild this total covers",
+    )
+    key = Column(
+        Integer,
+        primary_key=True,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+        doc="The breakdown value (a format, hour, seat count, ...) or 0 for plain totals",
+    )
+    value = Column(
+        Float,
+        nullable=False,
+        doc="The total: a count of games or players, or a sum of seconds",
+    )
+
+
+class RollupState(Base):
+    """How far a set of rollups has been refreshed."""
+
+    __tablename__ = "rollup_state"
+
+    name = Column(
+        String,
+        primary_key=True,
+        nullable=False,
+        doc="The name of the rollup this state belongs to",
+    )
+    refreshed_at = Column(
+        DateTime,
+        nullable=False,
+        doc="UTC timestamp from which changed games are looked for on the next refresh",
+    )
+    covered_until = Column(
+        DateTime,
+        nullable=False,
+        doc="UTC midnight ending (exclusively) the days that have been rolled up",
+    )
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+
+from . import Base
+
+
+class GuildAnalyticsSnapshot(Base):
+    """Precomputed analytics page data for one guild."""
+
+    __tablename__ = "guild_analytics_snapshots"
+
+    guild_xid = Column(
+        BigInteger,
+        ForeignKey("guilds.xid", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+        doc="The external Discord ID of the guild this snapshot covers",
+    )
+    data = Column(
+        JSONB,
+        nullable=True,
+        doc="Every analytics panel's data, keyed by period (30d, all) then panel name",
+    )
+    computed_at = Column(
+        DateTime,
+        nullable=True,
+        doc="UTC timestamp from which the data was computed, or NULL until it first is",
+    )
+    viewed_at = Column(
+        DateTime,
+        nullable=False,
+        index=True,
+        doc="UTC timestamp of the last time the guild's analytics page was opened",
+    )
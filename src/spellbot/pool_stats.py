@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Final
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from spellbot.metrics import add_span_pool_checkout
+from spellbot.settings import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from sqlalchemy.pool import ConnectionPoolEntry, PoolProxiedConnection
+
+# Upper bounds (inclusive) of the checkout wait histogram buckets; waits longer than
+# the last bound land in a final overflow bucket.
+CHECKOUT_WAIT_BUCKETS_MS: Final = (1.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+
+# Key in each pool entry's `info` dict holding when its DBAPI connection was opened.
+CONNECTED_AT_KEY: Final = "spellbot_connected_at"
+
+
+def empty_buckets() -> list[int]:
+    return [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+
+
+@dataclass
+class PoolStats:
+    """
+    Running checkout statistics for one connection pool in this process.
+
+    `in_use` and `overflow` are gauges sampled at the most recent checkout, the
+    `peak_*` values are high-water marks, and everything else accumulates for the
+    life of the process.
+    """
+
+    name: str
+    size: int
+    max_overflow: int
+    checkouts: int = 0
+    in_use: int = 0
+    overflow: int = 0
+    peak_in_use: int = 0
+    peak_overflow: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    wait_buckets: list[int] = field(default_factory=empty_buckets)
+    age_total_s: float = 0.0
+    age_max_s: float = 0.0
+
+    def record_checkout(
+        self,
+        *,
+        wait_ms: float,
+        in_use: int,
+        overflow: int,
+        age_s: float,
+    ) -> None:
+        self.checkouts += 1
+        self.in_use = in_use
+        self.overflow = overflow
+        self.peak_in_use = max(self.peak_in_use, in_use)
+        self.peak_overflow = max(self.peak_overflow, overflow)
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.wait_buckets[bisect_left(CHECKOUT_WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.age_total_s += age_s
+        self.age_max_s = max(self.age_max_s, age_s)
+
+    def wait_percentile_ms(self, q: float) -> float | None:
+        """Estimate the `q` quantile of checkout wait as the upper bound of its bucket."""
+        if not self.checkouts:
+            return None
+        rank = q * self.checkouts
+        seen = 0
+        for bound, count in zip(CHECKOUT_WAIT_BUCKETS_MS, self.wait_buckets, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.wait_max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary of these statistics."""
+        checkouts = self.checkouts or 1
+        return {
+            "name": self.name,
+            "size": self.size,
+            "max_overflow": self.max_overflow,
+            "checkouts": self.checkouts,
+            "in_use": self.in_use,
+            "overflow": self.overflow,
+            "peak_in_use": self.peak_in_use,
+            "peak_overflow": self.peak_overflow,
+            "wait_mean_ms": round(self.wait_total_ms / checkouts, 2),
+            "wait_p50_ms": self.wait_percentile_ms(0.5),
+            "wait_p95_ms": self.wait_percentile_ms(0.95),
+            "wait_max_ms": round(self.wait_max_ms, 2),
+            "wait_buckets": self.wait_buckets.copy(),
+            "age_mean_s": round(self.age_total_s / checkouts, 1),
+            "age_max_s": round(self.age_max_s, 1),
+        }
+
+
+# Statistics for every instrumented pool in this process, keyed by pool name.
+pool_stats: dict[str, PoolStats] = {}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    An `AsyncAdaptedQueuePool` that records how long each checkout waits.
+
+    SQLAlchemy has no pool event that fires *before* a checkout starts, so the wait
+    is timed here around `connect()`. It covers waiting for a free connection,
+    opening a new one when the pool may overflow, and the `pool_pre_ping` round trip.
+    Statistics are looked up by the pool's logging name, which SQLAlchemy carries
+    over when the pool is recreated (for example after `dispose()`).
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        conn = super().connect()
+        stats = pool_stats.get(getattr(self, "logging_name", None) or "")
+        if stats is not None:
+            now = time.monotonic()
+            wait_ms = (time.perf_counter() - start) * 1000
+            in_use = self.checkedout()
+            overflow = max(self.overflow(), 0)
+            age_s = now - conn.info.get(CONNECTED_AT_KEY, now)
+            stats.record_checkout(wait_ms=wait_ms, in_use=in_use, overflow=overflow, age_s=age_s)
+            add_span_pool_checkout(stats.name, wait_ms, in_use, overflow, age_s)
+        return conn
+
+
+def stamp_connected_at(_: Any, connection_record: ConnectionPoolEntry) -> None:
+    connection_record.info[CONNECTED_AT_KEY] = time.monotonic()
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> PoolStats:
+    """
+    Start collecting statistics for `engine`'s pool under `name`.
+
+    The engine must have been created with `poolclass=InstrumentedQueuePool` and
+    `pool_logging_name=name`. Instrumenting a name again starts over from zero.
+    """
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+    stats = PoolStats(
+        name=name,
+        size=pool.size(),
+        max_overflow=settings.DATABASE_POOL_MAX_OVERFLOW,
+    )
+    pool_stats[name] = stats
+    event.listen(engine.sync_engine, "connect", stamp_connected_at)
+    return stats
+
+
+def pool_snapshots() -> list[dict[str, Any]]:
+    """Return a snapshot of every instrumented pool in this process."""
+    return [stats.snapshot() for stats in pool_stats.values()]
+
+
+def format_ms(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:g}ms"
+
+
+def format_pool_summary(snapshot: dict[str, Any]) -> str:
+    """Summarize a pool snapshot on one line, for the owner `stats` command."""
+    return (
+        f"{snapshot['in_use']}/{snapshot['size']} in use "
+        f"(peak {snapshot['peak_in_use']}), "
+        f"overflow {snapshot['overflow']}/{snapshot['max_overflow']} "
+        f"(peak {snapshot['peak_overflow']}), "
+        f"wait p50 {format_ms(snapshot['wait_p50_ms'])} "
+        f"p95 {format_ms(snapshot['wait_p95_ms'])} "
+        f"max {format_ms(snapshot['wait_max_ms'])}, "
+        f"age max {snapshot['age_max_s']:g}s"
+    )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Final
+
+from sqlalchemy import event
+
+from spellbot.metrics import add_span_query_stats
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy.engine import Connection, ExceptionContext
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# A statement issued this many times in one scope is most likely an N+1 query.
+REPEATED_STATEMENT_THRESHOLD: Final = 10
+
+# Key in each connection's `info` dict holding a stack of statement start times.
+START_TIMES_KEY: Final = "spellbot_query_start_times"
+
+
+@dataclass
+class QueryStats:
+    """SQL statements, rows and database time tallied for one session scope."""
+
+    statements: int = 0
+    rows: int = 0
+    duration_ms: float = 0.0
+    repeats: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, rows: int, duration_ms: float) -> None:
+        self.statements += 1
+        self.rows += rows
+        self.duration_ms += duration_ms
+        self.repeats[statement] += 1
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """Return the statement issued most often in this scope and its count."""
+        top = self.repeats.most_common(1)
+        return top[0] if top else None
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Process-wide count of outermost scopes ("scopes") and of those that never issued a
+# statement ("untouched"): requests that opened a session but never needed the database.
+scope_totals: Counter[str] = Counter()
+
+
+def before_cursor_execute(conn: Connection, *_: Any) -> None:
+    conn.info.setdefault(START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn: Connection, cursor: Any, statement: str, *_: Any) -> None:
+    start = conn.info[START_TIMES_KEY].pop()
+    if (stats := query_stats.get()) is not None:
+        duration_ms = (time.perf_counter() - start) * 1000
+        stats.record(statement, max(cursor.rowcount, 0), duration_ms)
+
+
+def handle_error(context: ExceptionContext) -> None:
+    # A failed statement never reaches `after_cursor_execute`, so drop its start time
+    # here or the connection's stack grows by one for every error it ever sees.
+    conn = context.connection
+    if conn is not None and (start_times := conn.info.get(START_TIMES_KEY)):
+        start_times.pop()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Tally every statement `engine` executes into the active query scope, if any."""
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+def report(stats: QueryStats) -> None:
+    scope_totals["scopes"] += 1
+    if not stats.statements:
+        scope_totals["untouched"] += 1
+    repeated = stats.most_repeated()
+    max_repeats = repeated[1] if repeated else 0
+    add_span_query_stats(stats.statements, stats.rows, stats.duration_ms, max_repeats)
+    if repeated and max_repeats >= REPEATED_STATEMENT_THRESHOLD:
+        logger.warning(
+            "possible N+1 query, statement issued %s times in one session scope: %s",
+            max_repeats,
+            repeated[0][:200],
+        )
+
+
+def format_scope_summary() -> str:
+    """Summarize `scope_totals` on one line, for the owner `stats` command."""
+    scopes = scope_totals["scopes"]
+    untouched = scope_totals["untouched"]
+    percent = f" ({untouched / scopes:.0%})" if scopes else ""
+    return f"{scopes} scopes, {untouched} untouched{percent}"
+
+
+@contextmanager
+def query_scope() -> Iterator[QueryStats]:
+    """
+    Tally SQL statements issued within this scope.
+
+    Scopes nest: an inner scope (say a read-only session opened while handling an
+    interaction) adds to the outermost one, so an interaction is measured as a whole.
+    The outermost scope reports its totals on the root span when it ends.
+    """
+    stats = query_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats.reset(token)
+        report(stats)
@@ -5,12 +5,16 @@ from . import (
     apps,
     awards,
     channels,
+    cohorts,
     dashboard,
     games,
     guilds,
     patreon,
     plays,
+    queue_events,
     queues,
+    rollups,
+    snapshots,
     users,
     verifies,
     watches,
@@ -23,12 +27,16 @@ __all__ = [
     "apps",
     "awards",
     "channels",
+    "cohorts",
     "dashboard",
     "games",
     "guilds",
     "patreon",
     "plays",
+    "queue_events",
     "queues",
+    "rollups",
+    "snapshots",
     "users",
     "verifies",
     "watches",
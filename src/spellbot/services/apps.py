@@ -1,26 +1,126 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Final
+
 from ddtrace.trace import tracer
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import select, update
 
 from spellbot.database import DatabaseSession
 from spellbot.models import Token
+from spellbot.redis_client import get_redis
+from spellbot.settings import settings
+
+if TYPE_CHECKING:
+    from spellbot.data import TokenData
+
+logger = logging.getLogger(__name__)
+
+# Tokens are checked on every API request but almost never change, so each key's scopes
+# are kept for a while. Creating or deleting a token through this module clears its
+# entry in every web process at once via Redis; other changes show up within the TTL.
+TOKEN_CACHE_TTL_S: Final = 60.0
+TOKEN_CACHE_SIZE: Final = 1024
+TOKEN_INVALIDATIONS_CHANNEL: Final = "token_invalidations"  # noqa: S105
+RESUBSCRIBE_DELAY_S: Final = 5.0
+
+# key -> (scopes, expires); an unknown or deleted key is cached with no scopes.
+token_cache: dict[str, tuple[frozenset[str], float]] = {}
+
+
+def cached_token_scopes(key: str) -> frozenset[str] | None:
+    """Return the scopes cached for the given API key, or `None` if it must be loaded."""
+    entry = token_cache.get(key)
+    if entry is None or time.monotonic() >= entry[1]:
+        return None
+    return entry[0]
 
 
 @tracer.wrap()
-async def verify_token(key: str, path: str) -> bool:
-    """Verify that the given API key has access to the given path."""
-    result = await DatabaseSession.execute(select(Token).where(Token.key == key))
-    token = result.scalar_one_or_none()
-    if not token:
-        return False
-    if token.deleted_at:
-        return False
-    if token.scopes == "*":
+async def load_token_scopes(key: str) -> frozenset[str]:
+    """Load and cache the scopes granted to the given API key, empty if it isn't valid."""
+    result = await DatabaseSession.execute(
+        select(Token.scopes).where(Token.key == key, Token.deleted_at.is_(None)),
+    )
+    scopes = result.scalars().first()
+    granted = frozenset(scopes.split(",")) if scopes is not None else frozenset()
+    while len(token_cache) >= TOKEN_CACHE_SIZE:
+        del token_cache[next(iter(token_cache))]
+    token_cache[key] = (granted, time.monotonic() + TOKEN_CACHE_TTL_S)
+    return granted
+
+
+def scopes_allow(scopes: frozenset[str], path: str) -> bool:
+    """Return True if the given scopes grant access to the given API path."""
+    if scopes == {"*"}:
         return True
     try:
         required_scope = path.lstrip("/").split("/")[1]
     except IndexError:
         return False
-    scopes_list = token.scopes.split(",")
-    return required_scope in scopes_list
+    return required_scope in scopes
+
+
+@tracer.wrap()
+async def verify_token(key: str, path: str) -> bool:
+    """Verify that the given API key has access to the given path."""
+    scopes = cached_token_scopes(key)
+    if scopes is None:
+        scopes = await load_token_scopes(key)
+    return scopes_allow(scopes, path)
+
+
+async def invalidate_token(key: str) -> None:
+    """Forget the cached scopes for the given API key in this and every other process."""
+    token_cache.pop(key, None)
+    if not settings.REDIS_URL:
+        return
+    try:
+        redis = await get_redis()
+        await redis.publish(TOKEN_INVALIDATIONS_CHANNEL, key)
+    except RedisError:
+        logger.warning("failed to publish token invalidation", exc_info=True)
+
+
+@tracer.wrap()
+async def create_token(key: str, *, scopes: str = "*", note: str | None = None) -> TokenData:
+    """Create an API token with the given comma-separated scopes."""
+    token = Token(key=key, scopes=scopes, note=note)
+    DatabaseSession.add(token)
+    await DatabaseSession.commit()
+    await invalidate_token(key)
+    return token.to_data()
+
+
+@tracer.wrap()
+async def delete_token(key: str) -> bool:
+    """Delete the given API token, returning False if there was no such token."""
+    result = await DatabaseSession.execute(
+        update(Token)
+        .where(Token.key == key, Token.deleted_at.is_(None))
+        .values(deleted_at=datetime.now(tz=UTC)),
+    )
+    await DatabaseSession.commit()
+    await invalidate_token(key)
+    return bool(result.rowcount)
+
+
+async def watch_token_invalidations() -> None:
+    """Clear cached tokens as other processes create or delete them, until cancelled."""
+    while True:
+        try:
+            redis = await get_redis()
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(TOKEN_INVALIDATIONS_CHANNEL)
+                # Entries cached before now may have missed invalidations.
+                token_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        token_cache.pop(message["data"].decode(), None)
+        except RedisError:
+            logger.warning("lost the token invalidations subscription", exc_info=True)
+            await asyncio.sleep(RESUBSCRIBE_DELAY_S)
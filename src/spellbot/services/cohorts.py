@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Final
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from spellbot.database import DatabaseSession
+from spellbot.models import UserPlayWeek
+from spellbot.services.rollups import range_filters
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy.sql import ColumnElement
+
+    from spellbot.web.dashboard_filters import GuildFilter
+
+# Cohort retention counts keyed by (cohort week, play week): how many of the users who
+# first played in the cohort week also played in the play week.
+Cells = dict[tuple[datetime, datetime], int]
+
+
+@dataclass(frozen=True)
+class CohortMatrix:
+    """The cells of a cohort matrix for every play week before `complete_until`."""
+
+    cells: Cells
+    complete_until: datetime
+    expires: float
+
+
+# The completed weeks of each guild filter's cohort matrix, kept in this process.
+cohort_cache: dict[GuildFilter, CohortMatrix] = {}
+
+# Completed weeks only change when the owner moves a user's plays to another user.
+# That clears the cache of the process it runs in; others count everything again
+# this often.
+COHORT_CACHE_TTL_S: Final = 24 * 60 * 60.0
+
+
+def week_start(moment: datetime) -> datetime:
+    """Return midnight on the Monday starting `moment`'s week, as `date_trunc('week')` does."""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def play_week_guild_filter(opts: GuildFilter) -> list[ColumnElement[bool]]:
+    """Build the play week equivalent of `services.dashboard.game_guild_filter`."""
+    if not opts.applies:
+        return []
+    assert opts.xid is not None
+    if opts.mode == "include":
+        return [UserPlayWeek.guild_xid == opts.xid]
+    return [UserPlayWeek.guild_xid != opts.xid]
+
+
+async def record_play_weeks(
+    guild_xid: int,
+    user_xids: Iterable[int],
+    started_at: datetime,
+) -> None:
+    """Record that the users played a game in the guild started at `started_at`."""
+    week = week_start(started_at)
+    await DatabaseSession.execute(
+        insert(UserPlayWeek)
+        .values([{"user_xid": xid, "week": week, "guild_xid": guild_xid} for xid in user_xids])
+        .on_conflict_do_nothing(),
+    )
+
+
+async def cohort_cells(
+    opts: GuildFilter,
+    since: datetime | None,
+    until: datetime | None,
+) -> Cells:
+    """
+    Count the cohort matrix cells for the play weeks in `[since, until)`.
+
+    A user's cohort is the first week they played in at all, which can be before
+    `since`; it is only looked up for the users who played in the range.
+    """
+    scope = play_week_guild_filter(opts)
+    played = (
+        select(UserPlayWeek.user_xid, UserPlayWeek.week)
+        .where(*scope, *range_filters(UserPlayWeek.week, since, until))
+        .distinct()
+        .cte("played")
+    )
+    first_weeks = (
+        select(UserPlayWeek.user_xid, func.min(UserPlayWeek.week).label("cohort"))
+        .where(*scope, UserPlayWeek.user_xid.in_(select(played.c.user_xid)))
+        .group_by(UserPlayWeek.user_xid)
+        .subquery("first_weeks")
+    )
+    rows = await DatabaseSession.execute(
+        select(first_weeks.c.cohort, played.c.week, func.count())
+        .join_from(played, first_weeks, played.c.user_xid == first_weeks.c.user_xid)
+        .group_by(first_weeks.c.cohort, played.c.week),
+    )
+    return {(cohort, week): count for cohort, week, count in rows.all()}
+
+
+async def cohort_matrix(opts: GuildFilter) -> Cells:
+    """
+    Return every cell of the cohort matrix for the games matching `opts`.
+
+    Plays are recorded in the week they happen, so once a week is over its cells
+    barely change. Those are cached per guild filter for `COHORT_CACHE_TTL_S` and
+    extended by the weeks that ended since, leaving only the current week to be
+    counted each time.
+    """
+    this_week = week_start(datetime.now(tz=UTC)).replace(tzinfo=None)
+    now = time.monotonic()
+    cached = cohort_cache.get(opts)
+    if cached is None or cached.complete_until > this_week or now >= cached.expires:
+        cells = await cohort_cells(opts, None, this_week)
+        cached = CohortMatrix(cells, this_week, now + COHORT_CACHE_TTL_S)
+    elif cached.complete_until < this_week:
+        ended = await cohort_cells(opts, cached.complete_until, this_week)
+        cached = CohortMatrix({**cached.cells, **ended}, this_week, cached.expires)
+    cohort_cache[opts] = cached
+    return {**cached.cells, **await cohort_cells(opts, this_week, None)}
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from collections import Counter
+from collections import Counter, defaultdict
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import case, distinct, extract, func, or_, select, text
+from sqlalchemy import Integer, case, cast, distinct, extract, func, or_, select, text
 from sqlalchemy.exc import SQLAlchemyError
 
-from spellbot.database import DatabaseSession, any_of, engine
+from spellbot.database import DatabaseSession, any_of, read_only_engine
 from spellbot.enums import (
     GAME_BRACKET_ORDER,
     GAME_FORMAT_ORDER,
@@ -15,18 +15,18 @@ from spellbot.enums import (
     GameFormat,
     GameService,
 )
-from spellbot.models import Block, Channel, Game, Guild, Play, Queue, User
-from spellbot.services.plays import extract_ngrams, normalize_rule
+from spellbot.models import Block, Channel, Game, Guild, GuildDailyRollup, Play, Queue, User
+from spellbot.services.cohorts import cohort_matrix
+from spellbot.services.plays import rule_frequencies
+from spellbot.services.rollups import RollupMetric, as_utc, rollup_window, windowed_sums
 
 if TYPE_CHECKING:
     from sqlalchemy.sql import ColumnElement
 
+    from spellbot.services.rollups import Sums
     from spellbot.web.dashboard_filters import GuildFilter, PeriodSpec
 
-SERVICE_LABEL = case(
-    *((Game.service == s.value, s.title) for s in GameService),
-    else_="Unknown",
-).label("service")
+SERVICE_NAMES: dict[int, str] = {s.value: s.title for s in GameService}
 
 # Formats considered "bracketable" for the bracket adoption rate.
 BRACKETABLE_FORMATS: frozenset[int] = frozenset(
@@ -82,6 +82,27 @@ def iso_str(value: Any) -> str:
     return str(value)
 
 
+def rollup_bucket(bucket: str) -> Any:
+    """Truncate rollup days to `bucket`, to line up with `trunc_date` on a game timestamp."""
+    return trunc_date(GuildDailyRollup.day, bucket)
+
+
+def day_of_week(column: Any) -> Any:
+    """Postgres' `extract('dow', ...)` as an integer: 0=Sunday .. 6=Saturday."""
+    return cast(extract("dow", column), Integer)
+
+
+def hour_of_day(column: Any) -> Any:
+    return cast(extract("hour", column), Integer)
+
+
+def dated_points(sums: Sums) -> list[dict[str, Any]]:
+    """Convert `(bucket,) -> count` sums into `{date, count}` points in date order."""
+    return [
+        {"date": iso_str(bucket), "count": int(count)} for (bucket,), count in sorted(sums.items())
+    ]
+
+
 async def dashboard_guilds(*, top_n: int = 100) -> list[dict[str, Any]]:
     """
     Return the top `top_n` guilds (xid + name) for the filter dropdown.
@@ -106,29 +127,39 @@ async def dashboard_guilds(*, top_n: int = 100) -> list[dict[str, Any]]:
 
 
 async def dashboard_summary(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
-    """Return the headline totals shown across the top of the dashboard."""
-    game_filters = [Game.started_at.isnot(None), *game_guild_filter(opts)]
+    """
+    Return the headline totals shown across the top of the dashboard.
+
+    Game, expiry and bracket counts come from the daily rollups. Distinct
+    players and servers can't be added up across days, so they are counted live.
+    """
+    window = await rollup_window(period.start_dt)
+    started_filters = [Game.started_at.isnot(None), *game_guild_filter(opts)]
+    game_filters = list(started_filters)
     if period.start_dt is not None:
         game_filters.append(Game.started_at >= period.start_dt)
 
-    games = int(
-        (await DatabaseSession.execute(select(func.count(Game.id)).where(*game_filters))).scalar()
-        or 0,
+    started = await windowed_sums(
+        window,
+        opts,
+        select(func.count(Game.id)).where(*started_filters),
+        Game.started_at,
+        RollupMetric.STARTED,
     )
-
-    expired_filters = [
-        Game.started_at.is_(None),
-        Game.deleted_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        expired_filters.append(Game.deleted_at >= period.start_dt)
-    expired = int(
-        (
-            await DatabaseSession.execute(select(func.count(Game.id)).where(*expired_filters))
-        ).scalar()
-        or 0,
+    games = int(started[()])
+
+    expired_sums = await windowed_sums(
+        window,
+        opts,
+        select(func.count(Game.id)).where(
+            Game.started_at.is_(None),
+            Game.deleted_at.isnot(None),
+            *game_guild_filter(opts),
+        ),
+        Game.deleted_at,
+        RollupMetric.EXPIRED,
     )
+    expired = int(expired_sums[()])
 
     total_attempted = games + expired
     fill_rate = round(100.0 * games / total_attempted, 1) if total_attempted else 0.0
@@ -157,14 +188,17 @@ async def dashboard_summary(period: PeriodSpec, opts: GuildFilter) -> dict[str,
         or 0,
     )
 
-    bracket_rows = (
-        await DatabaseSession.execute(
-            select(Game.bracket, func.count(Game.id))  # type: ignore[arg-type]
-            .where(*game_filters)
-            .group_by(Game.bracket),
-        )
-    ).all()
-    bracket_counts = {int(value): int(count) for value, count in bracket_rows}
+    bracket_sums = await windowed_sums(
+        window,
+        opts,
+        select(Game.bracket, func.count(Game.id))  # type: ignore[arg-type]
+        .where(*started_filters)
+        .group_by(Game.bracket),
+        Game.started_at,
+        RollupMetric.BRACKET,
+        GuildDailyRollup.key,
+    )
+    bracket_counts = {int(value): int(count) for (value,), count in bracket_sums.items()}
     brackets = {b.name: bracket_counts.get(b.value, 0) for b in GameBracket}
 
     return {
@@ -189,10 +223,14 @@ async def dashboard_totals(period: PeriodSpec, opts: GuildFilter) -> dict[str, A
     """
     del period
     game_filters = [Game.started_at.isnot(None), *game_guild_filter(opts)]
-    games = int(
-        (await DatabaseSession.execute(select(func.count(Game.id)).where(*game_filters))).scalar()
-        or 0,
+    started = await windowed_sums(
+        await rollup_window(None),
+        opts,
+        select(func.count(Game.id)).where(*game_filters),
+        Game.started_at,
+        RollupMetric.STARTED,
     )
+    games = int(started[()])
     players = int(
         (
             await DatabaseSession.execute(
@@ -268,11 +306,30 @@ async def active_user_bucket_series(
     Activity is defined as having a `Play` row tied to a `Game` whose
     `started_at` falls in the bucket. `COUNT(DISTINCT user_xid)` per bucket
     gives a true per-period active-user count. Honors the guild filter.
+
+    Daily counts for a single guild come from the daily rollups; other
+    combinations would count a player once per guild or per day they played,
+    so they are always counted live.
     """
     filters: list[ColumnElement[bool]] = [
         Game.started_at.isnot(None),
         *game_guild_filter(opts),
     ]
+    if bucket == "day" and opts.applies and opts.mode == "include":
+        day_col = trunc_date(Game.started_at, bucket)
+        players = await windowed_sums(
+            await rollup_window(period.start_dt),
+            opts,
+            select(day_col, func.count(distinct(Play.user_xid)))
+            .select_from(Play)
+            .join(Game, Play.game_id == Game.id)  # type: ignore[arg-type]
+            .where(*filters)
+            .group_by(day_col),
+            Game.started_at,
+            RollupMetric.PLAYERS,
+            rollup_bucket(bucket),
+        )
+        return dated_points(players)
     if period.start_dt is not None:
         filters.append(Game.started_at >= period.start_dt)
     bucket_col = trunc_date(Game.started_at, bucket).label("bucket")
@@ -331,38 +388,31 @@ async def dashboard_users_activity(period: PeriodSpec, opts: GuildFilter) -> dic
 
 async def dashboard_games(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return bucketed counts of started and expired games for the period."""
+    window = await rollup_window(period.start_dt)
     guild_clauses = game_guild_filter(opts)
-
-    started_filters = [Game.started_at.isnot(None), *guild_clauses]
-    if period.start_dt is not None:
-        started_filters.append(Game.created_at >= period.start_dt)
-    started_bucket = trunc_date(Game.created_at, period.bucket).label("bucket")
-    started_rows = (
-        await DatabaseSession.execute(
-            select(started_bucket, func.count(Game.id))
-            .where(*started_filters)
-            .group_by(started_bucket)
-            .order_by(started_bucket),
-        )
-    ).all()
-
-    expired_filters = [Game.deleted_at.isnot(None), *guild_clauses]
-    if period.start_dt is not None:
-        expired_filters.append(Game.created_at >= period.start_dt)
-    expired_bucket = trunc_date(Game.created_at, period.bucket).label("bucket")
-    expired_rows = (
-        await DatabaseSession.execute(
-            select(expired_bucket, func.count(Game.id))
-            .where(*expired_filters)
-            .group_by(expired_bucket)
-            .order_by(expired_bucket),
-        )
-    ).all()
-
-    return {
-        "started": [{"date": iso_str(r[0]), "count": int(r[1])} for r in started_rows],
-        "expired": [{"date": iso_str(r[0]), "count": int(r[1])} for r in expired_rows],
-    }
+    bucket_col = trunc_date(Game.created_at, period.bucket)
+
+    started = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, func.count(Game.id))
+        .where(Game.started_at.isnot(None), *guild_clauses)
+        .group_by(bucket_col),
+        Game.created_at,
+        RollupMetric.CREATED_STARTED,
+        rollup_bucket(period.bucket),
+    )
+    expired = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, func.count(Game.id))
+        .where(Game.deleted_at.isnot(None), *guild_clauses)
+        .group_by(bucket_col),
+        Game.created_at,
+        RollupMetric.CREATED_EXPIRED,
+        rollup_bucket(period.bucket),
+    )
+    return {"started": dated_points(started), "expired": dated_points(expired)}
 
 
 async def dashboard_player_growth(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
@@ -493,29 +543,24 @@ async def dashboard_server_popularity(
 
 async def dashboard_service_popularity(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return bucketed game counts grouped by game service."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.created_at >= period.start_dt)
-
-    bucket_col = trunc_date(Game.created_at, period.bucket).label("bucket")
-    rows = (
-        await DatabaseSession.execute(
-            select(SERVICE_LABEL, bucket_col, func.count(Game.id))
-            .where(*filters)
-            .group_by(SERVICE_LABEL, bucket_col)
-            .order_by(bucket_col),
-        )
-    ).all()
+    bucket_col = trunc_date(Game.created_at, period.bucket)
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(bucket_col, Game.service, func.count(Game.id))  # type: ignore[arg-type]
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(bucket_col, Game.service),
+        Game.created_at,
+        RollupMetric.SERVICE,
+        rollup_bucket(period.bucket),
+        GuildDailyRollup.key,
+    )
 
-    by_service: dict[str, list[dict[str, Any]]] = {}
-    for service, bucket, count in rows:
-        by_service.setdefault(service, []).append(
-            {"date": iso_str(bucket), "count": int(count)},
-        )
-    series = [{"name": name, "points": pts} for name, pts in by_service.items()]
+    by_service: dict[str, Sums] = {}
+    for (bucket, service), count in sorted(sums.items()):
+        name = SERVICE_NAMES.get(service, "Unknown")
+        by_service.setdefault(name, defaultdict(float))[(bucket,)] += count
+    series = [{"name": name, "points": dated_points(counts)} for name, counts in by_service.items()]
     series.sort(key=lambda s: sum(p["count"] for p in s["points"]), reverse=True)
     return {"series": series}
 
@@ -630,43 +675,35 @@ async def dashboard_hour_of_day(period: PeriodSpec, opts: GuildFilter) -> dict[s
     The histogram is computed in UTC; the client shifts the bucket labels
     by the browser's timezone offset to display local hours.
     """
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    hour_col = extract("hour", Game.started_at).label("hour")
-    rows = (
-        await DatabaseSession.execute(
-            select(hour_col, func.count(Game.id))
-            .where(*filters)
-            .group_by(hour_col)
-            .order_by(hour_col),
-        )
-    ).all()
-    counts = {int(h): int(c) for h, c in rows}
+    hour_col = hour_of_day(Game.started_at)
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(hour_col, func.count(Game.id))
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(hour_col),
+        Game.started_at,
+        RollupMetric.HOUR,
+        GuildDailyRollup.key,
+    )
+    counts = {int(h): int(c) for (h,), c in sums.items()}
     return {"hours": [{"hour": h, "count": counts.get(h, 0)} for h in range(24)]}
 
 
 async def dashboard_day_of_week(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return counts of started games per UTC day of the week (0=Sun..6=Sat)."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    dow_col = extract("dow", Game.started_at).label("dow")
-    rows = (
-        await DatabaseSession.execute(
-            select(dow_col, func.count(Game.id))
-            .where(*filters)
-            .group_by(dow_col)
-            .order_by(dow_col),
-        )
-    ).all()
-    counts = {int(d): int(c) for d, c in rows}
+    dow_col = day_of_week(Game.started_at)
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(dow_col, func.count(Game.id))
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(dow_col),
+        Game.started_at,
+        RollupMetric.STARTED,
+        day_of_week(GuildDailyRollup.day),
+    )
+    counts = {int(d): int(c) for (d,), c in sums.items()}
     return {"days": [{"dow": d, "count": counts.get(d, 0)} for d in range(7)]}
 
 
@@ -681,45 +718,45 @@ BRACKET_LABEL = case(
     else_="Unknown",
 ).label("bracket")
 
+FORMAT_NAMES: dict[int, str] = {f.value: str(f) for f in GAME_FORMAT_ORDER}
+
 
 async def dashboard_popular_formats(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return counts of started games grouped by format, descending."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    count_col = func.count(Game.id)
-    rows = (
-        await DatabaseSession.execute(
-            select(FORMAT_LABEL, count_col)
-            .where(*filters)
-            .group_by(FORMAT_LABEL)
-            .order_by(count_col.desc(), FORMAT_LABEL),
-        )
-    ).all()
-    return {"rows": [{"format": row[0], "count": int(row[1])} for row in rows]}
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(Game.format, func.count(Game.id))  # type: ignore[arg-type]
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(Game.format),
+        Game.started_at,
+        RollupMetric.FORMAT,
+        GuildDailyRollup.key,
+    )
+    counts: Counter[str] = Counter()
+    for (value,), count in sums.items():
+        counts[FORMAT_NAMES.get(value, "Unknown")] += int(count)
+    rows = sorted(counts.items(), key=lambda row: (-row[1], row[0]))
+    return {"rows": [{"format": name, "count": count} for name, count in rows]}
 
 
 async def dashboard_popular_seats(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return counts of started games grouped by seat count, descending."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    count_col = func.count(Game.id)
-    rows = (
-        await DatabaseSession.execute(
-            select(Game.seats, count_col)  # type: ignore[arg-type]
-            .where(*filters)
-            .group_by(Game.seats)
-            .order_by(count_col.desc(), Game.seats),
-        )
-    ).all()
-    return {"rows": [{"seats": int(row[0]), "count": int(row[1])} for row in rows]}
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(Game.seats, func.count(Game.id))  # type: ignore[arg-type]
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(Game.seats),
+        Game.started_at,
+        RollupMetric.SEATS,
+        GuildDailyRollup.key,
+    )
+    rows = sorted(
+        ((int(seats), int(count)) for (seats,), count in sums.items()),
+        key=lambda row: (-row[1], row[0]),
+    )
+    return {"rows": [{"seats": seats, "count": count} for seats, count in rows]}
 
 
 async def dashboard_bracket_adoption(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
@@ -799,24 +836,30 @@ async def dashboard_bracket_adoption(period: PeriodSpec, opts: GuildFilter) -> d
 
 async def dashboard_avg_wait_time(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return bucketed average wait time (in minutes) between `created_at` and `started_at`."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    bucket_col = trunc_date(Game.started_at, period.bucket).label("bucket")
-    avg_col = func.avg(
-        extract("epoch", Game.started_at) - extract("epoch", Game.created_at),
-    ).label("avg_seconds")
-    rows = (
-        await DatabaseSession.execute(
-            select(bucket_col, avg_col).where(*filters).group_by(bucket_col).order_by(bucket_col),
-        )
-    ).all()
+    window = await rollup_window(period.start_dt)
+    filters = [Game.started_at.isnot(None), *game_guild_filter(opts)]
+    bucket_col = trunc_date(Game.started_at, period.bucket)
+    wait_seconds = func.sum(extract("epoch", Game.started_at) - extract("epoch", Game.created_at))
+    waits = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, wait_seconds).where(*filters).group_by(bucket_col),
+        Game.started_at,
+        RollupMetric.WAIT_SECONDS,
+        rollup_bucket(period.bucket),
+    )
+    games = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, func.count(Game.id)).where(*filters).group_by(bucket_col),
+        Game.started_at,
+        RollupMetric.STARTED,
+        rollup_bucket(period.bucket),
+    )
     return {
         "series": [
-            {"date": iso_str(r[0]), "minutes": round(float(r[1] or 0) / 60.0, 1)} for r in rows
+            {"date": iso_str(bucket), "minutes": round(waits[(bucket,)] / count / 60.0, 1)}
+            for (bucket,), count in sorted(games.items())
         ],
     }
 
@@ -935,24 +978,7 @@ async def dashboard_rules(period: PeriodSpec, opts: GuildFilter) -> dict[str, An
     ]
     if period.start_dt is not None:
         filters.append(Game.started_at >= period.start_dt)
-    rules_rows = (await DatabaseSession.execute(select(Game.rules).where(*filters))).all()
-    rules_list = [r[0] for r in rules_rows if r[0]]
-    rule_counter: Counter[str] = Counter()
-    ngram_counter: Counter[str] = Counter()
-    for rule in rules_list:
-        normalized = normalize_rule(rule)
-        if not normalized:
-            continue
-        rule_counter[normalized] += 1
-        for bigram in extract_ngrams(normalized, 2):
-            ngram_counter[bigram] += 1
-        for trigram in extract_ngrams(normalized, 3):
-            ngram_counter[trigram] += 1
-    top_rules = [{"rule": rule, "count": count} for rule, count in rule_counter.most_common(20)]
-    rule_ngrams = [
-        {"phrase": phrase, "count": count} for phrase, count in ngram_counter.most_common(75)
-    ]
-    return {"top_rules": top_rules, "rule_ngrams": rule_ngrams}
+    return await rule_frequencies(filters, rules=20, ngrams=75)
 
 
 async def dashboard_cohort_retention(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
@@ -967,51 +993,15 @@ async def dashboard_cohort_retention(period: PeriodSpec, opts: GuildFilter) -> d
     The result includes one cohort row per distinct first-play week within
     the (optional) period bound, ordered ascending by cohort. `max_weeks`
     is the largest week offset seen across all cohorts (>= 0), useful for
-    sizing the heatmap on the client.
+    sizing the heatmap on the client. The counts come from `user_play_weeks`, see
+    `services.cohorts.cohort_matrix`.
     """
-    inner_filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
+    cells = await cohort_matrix(opts)
+    rows = [
+        (cohort_dt, play_week, returners)
+        for (cohort_dt, play_week), returners in sorted(cells.items())
+        if period.start_dt is None or as_utc(cohort_dt) >= period.start_dt
     ]
-    first_play = (
-        select(
-            Play.user_xid.label("user_xid"),
-            func.min(func.date_trunc("week", Game.started_at)).label("cohort"),
-        )
-        .select_from(Play)
-        .join(Game, Play.game_id == Game.id)  # type: ignore[arg-type]
-        .where(*inner_filters)
-        .group_by(Play.user_xid)
-        .subquery()
-    )
-    play_weeks = (
-        select(
-            Play.user_xid.label("user_xid"),
-            func.date_trunc("week", Game.started_at).label("play_week"),
-        )
-        .select_from(Play)
-        .join(Game, Play.game_id == Game.id)  # type: ignore[arg-type]
-        .where(*inner_filters)
-        .distinct()
-        .subquery()
-    )
-    outer_filters: list[ColumnElement[bool]] = []
-    if period.start_dt is not None:
-        outer_filters.append(first_play.c.cohort >= period.start_dt)
-    rows = (
-        await DatabaseSession.execute(
-            select(
-                first_play.c.cohort,
-                play_weeks.c.play_week,
-                func.count(distinct(play_weeks.c.user_xid)).label("returners"),
-            )
-            .select_from(first_play)
-            .join(play_weeks, first_play.c.user_xid == play_weeks.c.user_xid)
-            .where(*outer_filters)
-            .group_by(first_play.c.cohort, play_weeks.c.play_week)
-            .order_by(first_play.c.cohort, play_weeks.c.play_week),
-        )
-    ).all()
 
     grouped: dict[Any, dict[int, int]] = {}
     max_offset = 0
@@ -1040,24 +1030,24 @@ async def dashboard_activity_heatmap(period: PeriodSpec, opts: GuildFilter) -> d
     timezone offset to produce a local-time heatmap. `dow` follows Postgres'
     `extract('dow', ...)` convention: 0=Sunday .. 6=Saturday.
     """
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    dow_col = extract("dow", Game.started_at).label("dow")
-    hour_col = extract("hour", Game.started_at).label("hour")
-    rows = (
-        await DatabaseSession.execute(
-            select(dow_col, hour_col, func.count(Game.id))
-            .where(*filters)
-            .group_by(dow_col, hour_col)
-            .order_by(dow_col, hour_col),
-        )
-    ).all()
+    dow_col = day_of_week(Game.started_at)
+    hour_col = hour_of_day(Game.started_at)
+    sums = await windowed_sums(
+        await rollup_window(period.start_dt),
+        opts,
+        select(dow_col, hour_col, func.count(Game.id))
+        .where(Game.started_at.isnot(None), *game_guild_filter(opts))
+        .group_by(dow_col, hour_col),
+        Game.started_at,
+        RollupMetric.HOUR,
+        day_of_week(GuildDailyRollup.day),
+        GuildDailyRollup.key,
+    )
     return {
-        "cells": [{"dow": int(r[0]), "hour": int(r[1]), "count": int(r[2])} for r in rows],
+        "cells": [
+            {"dow": int(dow), "hour": int(hour), "count": int(count)}
+            for (dow, hour), count in sorted(sums.items())
+        ],
     }
 
 
@@ -1101,20 +1091,36 @@ async def dashboard_wait_time_distribution(
     }
 
 
-def bucketed_adoption_rate(
+async def bucketed_adoption_rate(
     period: PeriodSpec,
-    filters: list[ColumnElement[bool]],
+    opts: GuildFilter,
     adopted_predicate: ColumnElement[bool],
-) -> Any:
-    """Build a `(bucket, adopted_pct)` query for a started-game adoption rate."""
-    bucket_col = trunc_date(Game.started_at, period.bucket).label("bucket")
-    adopted = func.sum(case((adopted_predicate, 1), else_=0))
-    total = func.count(Game.id)
-    return (
-        select(bucket_col, adopted.label("adopted"), total.label("total"))
-        .where(*filters)
-        .group_by(bucket_col)
-        .order_by(bucket_col)
+    metric: RollupMetric,
+) -> list[dict[str, Any]]:
+    """Return bucketed `{date, count}` percent points for a started-game adoption rate."""
+    window = await rollup_window(period.start_dt)
+    filters = [Game.started_at.isnot(None), *game_guild_filter(opts)]
+    bucket_col = trunc_date(Game.started_at, period.bucket)
+    adopted = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, func.count(Game.id))
+        .where(*filters, adopted_predicate)
+        .group_by(bucket_col),
+        Game.started_at,
+        metric,
+        rollup_bucket(period.bucket),
+    )
+    totals = await windowed_sums(
+        window,
+        opts,
+        select(bucket_col, func.count(Game.id)).where(*filters).group_by(bucket_col),
+        Game.started_at,
+        RollupMetric.STARTED,
+        rollup_bucket(period.bucket),
+    )
+    return adoption_points(
+        (bucket, adopted[(bucket,)], total) for (bucket,), total in sorted(totals.items())
     )
 
 
@@ -1129,34 +1135,14 @@ def adoption_points(rows: Any) -> list[dict[str, Any]]:
 
 async def dashboard_voice_adoption(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return bucketed adoption rate (percent) of started games with a voice channel."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    rows = (
-        await DatabaseSession.execute(
-            bucketed_adoption_rate(period, filters, Game.voice_xid.isnot(None)),
-        )
-    ).all()
-    return {"rate": adoption_points(rows)}
+    voiced = Game.voice_xid.isnot(None)
+    return {"rate": await bucketed_adoption_rate(period, opts, voiced, RollupMetric.VOICE)}
 
 
 async def dashboard_blind_adoption(period: PeriodSpec, opts: GuildFilter) -> dict[str, Any]:
     """Return bucketed adoption rate (percent) of started games created as blind."""
-    filters: list[ColumnElement[bool]] = [
-        Game.started_at.isnot(None),
-        *game_guild_filter(opts),
-    ]
-    if period.start_dt is not None:
-        filters.append(Game.started_at >= period.start_dt)
-    rows = (
-        await DatabaseSession.execute(
-            bucketed_adoption_rate(period, filters, Game.blind.is_(True)),
-        )
-    ).all()
-    return {"rate": adoption_points(rows)}
+    blind = Game.blind.is_(True)
+    return {"rate": await bucketed_adoption_rate(period, opts, blind, RollupMetric.BLIND)}
 
 
 async def dashboard_mythic_verification(
@@ -1320,12 +1306,16 @@ JS_SAFE_INT = 2**53
 
 
 def json_cell(value: Any) -> Any:
-    """Coerce a single result cell into a JSON-serializable value."""
-    if value is None or isinstance(value, (bool, str, float)):
-        return value
-    if isinstance(value, int):
+    """
+    Make a single result cell safe to send to the browser.
+
+    Integers beyond JavaScript's safe range become strings. Everything else
+    (timestamps, decimals, UUIDs, ...) is left to the web app's JSON encoder, which
+    writes dates and times as ISO strings and anything else via `str()`.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
         return value if -JS_SAFE_INT < value < JS_SAFE_INT else str(value)
-    return str(value)
+    return value
 
 
 async def dashboard_run_sql(query: str) -> dict[str, Any]:
@@ -1337,7 +1327,8 @@ async def dashboard_run_sql(query: str) -> dict[str, Any]:
     cannot modify data even if a write statement slips through. A dedicated
     connection (rather than the request's `DatabaseSession`) is required because
     the shared engine runs in `AUTOCOMMIT` mode, where a per-statement
-    `SET TRANSACTION READ ONLY` would not hold. Results are capped at
+    `SET TRANSACTION READ ONLY` would not hold. The connection comes from the
+    read replica when one is configured. Results are capped at
     `SQL_CONSOLE_MAX_ROWS` rows.
 
     Returns `{"columns", "rows", "row_count", "truncated"}` on success, or
@@ -1347,7 +1338,7 @@ async def dashboard_run_sql(query: str) -> dict[str, Any]:
     if not query:
         return {"error": "Empty query."}
     try:
-        async with engine.connect() as raw_conn:
+        async with read_only_engine.connect() as raw_conn:
             # Override the engine's AUTOCOMMIT default so we get a real
             # transaction that `SET TRANSACTION READ ONLY` can pin down.
             conn = await raw_conn.execution_options(isolation_level="READ COMMITTED")
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from datetime import UTC, datetime, timedelta
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Final, cast
 
 from dateutil import tz
 from ddtrace.trace import tracer
-from sqlalchemy import TIMESTAMP, delete, func, select, update
+from redis.exceptions import RedisError
+from sqlalchemy import JSON, TIMESTAMP, delete, extract, func, select, update
 from sqlalchemy import cast as sql_cast
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import and_, asc, column, or_
 from sqlalchemy.sql.functions import count
@@ -29,6 +32,10 @@ from spellbot.models import (
     UserAward,
     Watch,
 )
+from spellbot.redis_client import get_redis
+from spellbot.services.apps import RESUBSCRIBE_DELAY_S
+from spellbot.services.cohorts import record_play_weeks
+from spellbot.services.queue_events import QueueEventType, game_changed
 from spellbot.settings import settings
 
 if TYPE_CHECKING:
@@ -92,6 +99,7 @@ async def set_metadata(game_id: int, metadata: dict[str, Any]) -> bool:
         update(Game).where(*conditions).values(game_metadata=metadata),
     )
     await DatabaseSession.commit()
+    await forget_game_detail(game_id)
     if result.rowcount:
         return True
     # No row was updated: either the game does not exist, or a newer report already
@@ -124,72 +132,157 @@ def to_ms(dt: datetime | None) -> float | None:
     return dt.replace(tzinfo=tz.UTC).timestamp() * 1000
 
 
+# Started games only change when their voice channel is set or a post-game report
+# arrives. The bot sets voice channels and the web process takes reports, so each change
+# is published through Redis and every web process drops its cached view of the game.
+# Without Redis a change made by the bot would go unheard, so nothing is cached.
+GAME_DETAIL_TTL_S: Final = 300.0
+GAME_DETAIL_CACHE_SIZE: Final = 1024
+GAME_DETAIL_INVALIDATIONS_CHANNEL: Final = "game_detail_invalidations"
+game_detail_cache: dict[int, tuple[dict[str, Any], float]] = {}
+
+
+def epoch_ms(col: Any) -> Any:
+    """Return SQL for `to_ms` of a naive UTC timestamp column."""
+    return extract("epoch", col) * 1000
+
+
+async def forget_game_detail(game_id: int) -> None:
+    """Drop the cached detail view of the given game in this and every other process."""
+    game_detail_cache.pop(game_id, None)
+    if not settings.REDIS_URL:
+        return
+    try:
+        redis = await get_redis()
+        await redis.publish(GAME_DETAIL_INVALIDATIONS_CHANNEL, str(game_id))
+    except RedisError:
+        logger.warning("failed to publish game detail invalidation", exc_info=True)
+
+
+async def watch_game_detail_invalidations() -> None:
+    """Drop cached detail views as other processes change their games, until cancelled."""
+    while True:
+        try:
+            redis = await get_redis()
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(GAME_DETAIL_INVALIDATIONS_CHANNEL)
+                # Views cached before now may have missed invalidations.
+                game_detail_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        game_detail_cache.pop(int(message["data"]), None)
+        except RedisError:
+            logger.warning("lost the game detail invalidations subscription", exc_info=True)
+            await asyncio.sleep(RESUBSCRIBE_DELAY_S)
+
+
+def remember_game_detail(game_id: int, detail: dict[str, Any]) -> None:
+    while len(game_detail_cache) >= GAME_DETAIL_CACHE_SIZE:
+        del game_detail_cache[next(iter(game_detail_cache))]
+    game_detail_cache[game_id] = (detail, time.monotonic() + GAME_DETAIL_TTL_S)
+
+
 @tracer.wrap()
 async def game_detail_view(game_id: int) -> dict[str, Any] | None:
     """
     Return a rich dictionary of all information associated with a game.
 
     Intended for the public game detail web page. Excludes the game `password`
-    and per-play `pin` (both are secrets that gate verification).
+    and per-play `pin` (both are secrets that gate verification). The game, its
+    guild and channel, and its posts, plays and queued players (as `json_agg`
+    subqueries) are all read in a single statement. Started games are cached for
+    `GAME_DETAIL_TTL_S` or until they change; the returned dictionary must not be
+    modified.
     """
-    game = (
-        await DatabaseSession.execute(select(Game).where(Game.id == game_id))
-    ).scalar_one_or_none()
-    if game is None:
-        return None
-
-    guild = (
-        await DatabaseSession.execute(select(Guild).where(Guild.xid == game.guild_xid))
-    ).scalar_one_or_none()
-    channel = (
-        await DatabaseSession.execute(select(Channel).where(Channel.xid == game.channel_xid))
-    ).scalar_one_or_none()
+    entry = game_detail_cache.get(game_id)
+    if entry is not None and time.monotonic() < entry[1]:
+        return entry[0]
 
     posts = (
-        (
-            await DatabaseSession.execute(
-                select(Post).where(Post.game_id == game_id).order_by(Post.message_xid),
-            )
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "guild_xid",
+                        Post.guild_xid,
+                        "channel_xid",
+                        Post.channel_xid,
+                        "message_xid",
+                        Post.message_xid,
+                        "created_at",
+                        Post.created_at,
+                        "updated_at",
+                        Post.updated_at,
+                    ),
+                    Post.message_xid,
+                ),
+                type_=JSON,
+            ),
         )
-        .scalars()
-        .all()
+        .where(Post.game_id == Game.id)
+        .scalar_subquery()
     )
-
     plays = (
-        (
-            await DatabaseSession.execute(
-                select(Play).where(Play.game_id == game_id).order_by(Play.user_xid),  # type: ignore
-            )
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "user_xid",
+                        Play.user_xid,
+                        "user_name",
+                        User.name,
+                        "og_guild_xid",
+                        Play.og_guild_xid,
+                        "created_at",
+                        epoch_ms(Play.created_at),
+                        "updated_at",
+                        epoch_ms(Play.updated_at),
+                    ),
+                    Play.user_xid,
+                ),
+                type_=JSON,
+            ),
         )
-        .scalars()
-        .all()
+        .select_from(Play)
+        .outerjoin(User, User.xid == Play.user_xid)
+        .where(Play.game_id == Game.id)
+        .scalar_subquery()
     )
-
-    queues = (
-        (
-            await DatabaseSession.execute(
-                select(Queue).where(Queue.game_id == game_id).order_by(Queue.user_xid),
-            )
+    queued = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "user_xid",
+                        Queue.user_xid,
+                        "user_name",
+                        User.name,
+                        "og_guild_xid",
+                        Queue.og_guild_xid,
+                    ),
+                    Queue.user_xid,
+                ),
+                type_=JSON,
+            ),
         )
-        .scalars()
-        .all()
+        .select_from(Queue)
+        .outerjoin(User, User.xid == Queue.user_xid)
+        .where(Queue.game_id == Game.id)
+        .scalar_subquery()
     )
-
-    user_xids = {p.user_xid for p in plays} | {q.user_xid for q in queues}
-    user_names: dict[int, str | None] = {}
-    if user_xids:
-        users = (
-            (
-                await DatabaseSession.execute(
-                    select(User).where(User.xid.in_(user_xids)),
-                )
-            )
-            .scalars()
-            .all()
+    row = (
+        await DatabaseSession.execute(
+            select(Game, Guild.name, Guild.show_links, Channel.name, posts, plays, queued)
+            .outerjoin(Guild, Guild.xid == Game.guild_xid)
+            .outerjoin(Channel, Channel.xid == Game.channel_xid)  # type: ignore
+            .where(Game.id == game_id),
         )
-        user_names = {u.xid: u.name for u in users}
+    ).one_or_none()
+    if row is None:
+        return None
+    game, guild_name, show_links, channel_name, post_rows, play_rows, queue_rows = row
 
-    return {
+    detail = {
         "id": game.id,
         "status": GameStatus(game.status).name,
         "format": str(GameFormat(game.format)),
@@ -210,43 +303,28 @@ async def game_detail_view(game_id: int) -> dict[str, Any] | None:
         "deleted_at": to_ms(game.deleted_at),
         "metadata": game.game_metadata,
         "guild": {
-            "xid": guild.xid if guild else game.guild_xid,
-            "name": guild.name if guild else None,
-            "show_links": guild.show_links if guild else False,
+            "xid": game.guild_xid,
+            "name": guild_name,
+            "show_links": bool(show_links),
         },
         "channel": {
-            "xid": channel.xid if channel else game.channel_xid,
-            "name": channel.name if channel else None,
+            "xid": game.channel_xid,
+            "name": channel_name,
         },
         "posts": [
             {
-                "guild_xid": post.guild_xid,
-                "channel_xid": post.channel_xid,
-                "message_xid": post.message_xid,
-                "created_at": post.created_at,
-                "updated_at": post.updated_at,
+                **post,
+                "created_at": datetime.fromisoformat(post["created_at"]),
+                "updated_at": datetime.fromisoformat(post["updated_at"]),
             }
-            for post in posts
-        ],
-        "plays": [
-            {
-                "user_xid": play.user_xid,
-                "user_name": user_names.get(play.user_xid),
-                "og_guild_xid": play.og_guild_xid,
-                "created_at": to_ms(play.created_at),
-                "updated_at": to_ms(play.updated_at),
-            }
-            for play in plays
-        ],
-        "queued": [
-            {
-                "user_xid": queue.user_xid,
-                "user_name": user_names.get(queue.user_xid),
-                "og_guild_xid": queue.og_guild_xid,
-            }
-            for queue in queues
+            for post in post_rows or []
         ],
+        "plays": play_rows or [],
+        "queued": queue_rows or [],
     }
+    if settings.REDIS_URL and game.status == GameStatus.STARTED.value:
+        remember_game_detail(game_id, detail)
+    return detail
 
 
 async def guild_detail_view(guild_xid: int) -> dict[str, Any] | None:
@@ -344,6 +422,7 @@ async def add_player(game_data: GameData, player_xid: int) -> GameData | None:
     result = await DatabaseSession.execute(query)
     updated_game: Game = result.scalars().one()
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.SEAT, [game_data.id])
     return await updated_game.to_data()
 
 
@@ -423,6 +502,8 @@ async def upsert(
         .on_conflict_do_nothing(),
     )
     await DatabaseSession.commit()
+    kind = QueueEventType.CREATED if new else QueueEventType.SEAT
+    await game_changed(kind, [cast("int", game.id)])
 
     return new, await game.to_data()
 
@@ -584,6 +665,7 @@ async def shrink_game(game_data: GameData) -> GameData:
     result = await DatabaseSession.execute(query)
     updated_game: Game = result.scalars().one()
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.SEAT, [game_data.id])
     return await updated_game.to_data()
 
 
@@ -612,10 +694,12 @@ async def make_ready(
     game.game_link = game_link  # type: ignore  # column is "game_link" for legacy reasons
     game.password = password  # type: ignore
     game.status = GameStatus.STARTED.value
-    game.started_at = datetime.now(tz=UTC)  # type: ignore
+    started_at = datetime.now(tz=UTC)
+    game.started_at = started_at  # type: ignore
 
     if not queues:  # Not sure this is possible, but just in case.
         await DatabaseSession.commit()
+        await game_changed(QueueEventType.STARTED, [game_data.id])
         return await game.to_data()
 
     # upsert into plays
@@ -650,8 +734,11 @@ async def make_ready(
         .on_conflict_do_nothing(),
     )
 
-    # drop the players from any other queues
+    # record the week played in for cohort retention
     player_xids = [queue.user_xid for queue in queues]
+    await record_play_weeks(cast("int", game.guild_xid), player_xids, started_at)
+
+    # drop the players from any other queues
     await DatabaseSession.execute(
         delete(Queue)
         .where(any_of(Queue.user_xid, player_xids))
@@ -659,6 +746,7 @@ async def make_ready(
     )
 
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.STARTED, [game_data.id])
     return await game.to_data()
 
 
@@ -702,6 +790,7 @@ async def set_voice(
     result = await DatabaseSession.execute(query)
     updated_game: Game = result.scalars().one()
     await DatabaseSession.commit()
+    await forget_game_detail(game_data.id)
     return await updated_game.to_data()
 
 
@@ -809,6 +898,7 @@ async def delete_games(game_ids: list[int]) -> int:
     dequeued = result.rowcount
     logger.info("dequeued %s players from games %s", dequeued, game_ids)
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.EXPIRED, game_ids)
     return dequeued
 
 
@@ -838,6 +928,7 @@ async def dequeue_players(player_xids: list[int]) -> list[int]:
     for queue in queues:
         await DatabaseSession.delete(queue)
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.SEAT, game_ids)
     return list(game_ids)
 
 
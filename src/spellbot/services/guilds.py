@@ -4,7 +4,7 @@ from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 import httpx
-from sqlalchemy import select, update
+from sqlalchemy import BigInteger, String, column, select, update, values
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.expression import and_, or_
 
@@ -14,6 +14,8 @@ from spellbot.models import Channel, Guild, GuildAward, web_editable_columns
 from spellbot.settings import settings
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
     import discord
 
     from spellbot.data import GuildAwardData, GuildData
@@ -82,13 +84,23 @@ async def upsert(guild: discord.Guild, locale: str | None = None) -> GuildData |
     return await result.to_data() if guild else None
 
 
-async def set_icon(guild_xid: int, icon: str | None) -> None:
-    """Update the cached Discord icon URL for the given guild."""
+async def set_icons(icons: Mapping[int, str | None]) -> None:
+    """Update the cached Discord icon URLs for the given guilds in a single statement."""
+    if not icons:
+        return
+    new_icons = values(
+        column("xid", BigInteger),
+        column("icon", String),
+        name="new_icons",
+    ).data(list(icons.items()))
     await DatabaseSession.execute(
-        update(Guild).where(Guild.xid == guild_xid).values(icon=icon),  # type: ignore
+        update(Guild)
+        .where(Guild.xid == new_icons.c.xid)  # type: ignore
+        .values(icon=new_icons.c.icon),
     )
     await DatabaseSession.commit()
-    guild_cache.pop(guild_xid, None)
+    for guild_xid in icons:
+        guild_cache.pop(guild_xid, None)
 
 
 async def fetch_icon_url(guild_xid: int) -> str | None:
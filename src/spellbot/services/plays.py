@@ -1,25 +1,36 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+import time
 from collections import Counter, defaultdict
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final, NamedTuple
 
 from dateutil import tz
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import select
+from sqlalchemy import select, true, union_all
 from sqlalchemy.sql.expression import and_, extract, func, text
 
-from spellbot.database import DatabaseSession
+from spellbot.database import DatabaseSession, read_only_engine
 from spellbot.enums import GameBracket, GameFormat, GameService
 from spellbot.models import Block, Channel, Game, Guild, GuildMember, Play, User
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncIterator
+    from collections.abc import AsyncGenerator
+
+    from sqlalchemy.engine import Row
+    from sqlalchemy.sql import ColumnElement
 
 USER_PAGE_SIZE = 25
 CHANNEL_PAGE_SIZE = 10
 
+# Rows fetched from the server-side cursor per round trip while streaming an export.
+EXPORT_YIELD_PER: Final = 1000
+
 # Whitelisted columns the records pages may sort by. The values are interpolated
 # directly into the SQL so they must never come from user input verbatim; only
 # keys from these maps are accepted.
@@ -27,7 +38,9 @@ USER_RECORDS_SORT_COLUMNS: dict[str, tuple[str, str]] = {
     # key -> (inner-CTE expression, outer-query expression)
     "id": ("games.id", "game_plays.game_id"),
     "updated_at": ("games.updated_at", "game_plays.updated_at"),
-    "guild_name": ("guilds.name", "game_plays.guild_name"),
+    # Guild names are nullable; sort a missing name as "" so the keyset comparison
+    # in `keyset_sql` never has to reason about NULLs.
+    "guild_name": ("COALESCE(guilds.name, '')", "COALESCE(game_plays.guild_name, '')"),
     "format": ("games.format", "game_plays.format"),
     "seats": ("games.seats", "game_plays.seats"),
     "bracket": ("games.bracket", "game_plays.bracket"),
@@ -107,10 +120,164 @@ def sort_direction(opts: RecordFilters) -> str:
     return "DESC" if opts.sort_dir == "desc" else "ASC"
 
 
+@dataclass(frozen=True)
+class RecordCursor:
+    """
+    A position in a records listing: the sort value and game id of a boundary row.
+
+    Pages are fetched by seeking past the cursor (keyset pagination) rather than
+    by skipping rows with `OFFSET`, so every page costs the same as the first one.
+    A `before` cursor pages backwards, towards the start of the listing.
+    """
+
+    sort_by: str
+    sort_dir: str
+    value: Any
+    game_id: int
+    before: bool = False
+
+
+def encode_cursor(cursor: RecordCursor) -> str:
+    """Encode `cursor` as an opaque, URL-safe token."""
+    value = cursor.value.isoformat() if isinstance(cursor.value, datetime) else cursor.value
+    data = [cursor.sort_by, cursor.sort_dir, value, cursor.game_id, int(cursor.before)]
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, opts: RecordFilters) -> RecordCursor | None:
+    """
+    Decode a token from `encode_cursor`, or return None if it is not usable.
+
+    A cursor only makes sense for the sort it was taken from, so a token for any
+    other sort (say, from a link made before the viewer re-sorted) is ignored.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_by, sort_dir, value, game_id, before = json.loads(raw)
+    except binascii.Error, ValueError, TypeError:
+        return None
+    if sort_by != opts.sort_by or sort_dir != opts.sort_dir or not isinstance(game_id, int):
+        return None
+    try:
+        if sort_by == "updated_at":
+            value = datetime.fromisoformat(value)
+        elif sort_by == "guild_name":
+            value = str(value)
+        else:
+            value = int(value)
+    except TypeError, ValueError:
+        return None
+    return RecordCursor(sort_by, sort_dir, value, game_id, before=bool(before))
+
+
+def keyset_sql(inner_col: str, opts: RecordFilters, cursor: RecordCursor) -> str:
+    """
+    Build the WHERE fragment that seeks past `cursor` in the listing's sort order.
+
+    Listings are ordered by the sort column and then always by `games.id DESC`, so
+    the tie-breaker compares the other way to the sort column on ascending sorts.
+    """
+    forward = (opts.sort_dir == "desc") != cursor.before
+    col_op = "<" if forward else ">"
+    id_op = ">" if cursor.before else "<"
+    return (
+        f"({inner_col} {col_op} :cursor_value "
+        f"OR ({inner_col} = :cursor_value AND games.id {id_op} :cursor_id))"
+    )
+
+
+def paging_sql(
+    inner_col: str,
+    opts: RecordFilters,
+    cursor: RecordCursor | None,
+) -> tuple[str, str, dict[str, Any]]:
+    """Return the keyset WHERE fragment (if any), inner ORDER BY and params for a page."""
+    direction = sort_direction(opts)
+    if cursor is None:
+        return "", f"{inner_col} {direction}, games.id DESC", {}
+    params = {"cursor_value": cursor.value, "cursor_id": cursor.game_id}
+    if cursor.before:
+        # Walk backwards from the cursor; the outer query restores the listing order.
+        direction = "ASC" if direction == "DESC" else "DESC"
+        return keyset_sql(inner_col, opts, cursor), f"{inner_col} {direction}, games.id ASC", params
+    return keyset_sql(inner_col, opts, cursor), f"{inner_col} {direction}, games.id DESC", params
+
+
+class RecordsPage(NamedTuple):
+    """One page of a records listing with the cursors for its neighbouring pages."""
+
+    rows: list[dict[str, Any]]
+    total: int
+    prev_cursor: str | None
+    next_cursor: str | None
+
+
+# Counting every matching game is the one part of a records page that still scales
+# with history, and the total barely moves while someone pages through it, so it is
+# cached per query for a short while.
+RECORD_COUNT_TTL_S: Final = 60.0
+RECORD_COUNT_CACHE_SIZE: Final = 1024
+record_count_cache: dict[tuple[str, tuple[tuple[str, Any], ...]], tuple[int, float]] = {}
+
+
+async def cached_count(sql: str, params: dict[str, Any]) -> int:
+    key = (
+        sql,
+        tuple(
+            sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()),
+        ),
+    )
+    entry = record_count_cache.get(key)
+    if entry is not None and time.monotonic() < entry[1]:
+        return entry[0]
+    total = int((await DatabaseSession.execute(text(sql), params)).scalar() or 0)
+    now = time.monotonic()
+    # Every entry lives as long, so keeping them in insertion order keeps the ones
+    # that expire first at the front: drop those, and the oldest when it's full.
+    record_count_cache.pop(key, None)
+    while record_count_cache and (
+        len(record_count_cache) >= RECORD_COUNT_CACHE_SIZE
+        or next(iter(record_count_cache.values()))[1] <= now
+    ):
+        del record_count_cache[next(iter(record_count_cache))]
+    record_count_cache[key] = (total, now + RECORD_COUNT_TTL_S)
+    return total
+
+
+def page_cursors(
+    rows: list[Any],
+    opts: RecordFilters,
+    cursor: RecordCursor | None,
+    page_size: int,
+) -> tuple[list[Any], str | None, str | None]:
+    """
+    Trim a page fetched with one extra row and work out its prev/next cursors.
+
+    The extra row only tells us whether there is another page in the direction we
+    were paging. Each row must start with its game id and end with its sort value.
+    """
+
+    def token(row: Any, *, before: bool) -> str:
+        return encode_cursor(RecordCursor(opts.sort_by, opts.sort_dir, row[-1], row[0], before))
+
+    has_more = len(rows) > page_size
+    if cursor is not None and cursor.before:
+        rows = rows[-page_size:]
+        has_prev, has_next = has_more, bool(rows)
+    else:
+        rows = rows[:page_size]
+        has_prev, has_next = cursor is not None and bool(rows), has_more
+    prev_cursor = token(rows[0], before=True) if has_prev else None
+    next_cursor = token(rows[-1], before=False) if has_next else None
+    return rows, prev_cursor, next_cursor
+
+
 def build_user_records_sql(
     opts: RecordFilters,
     *,
     paginated: bool,
+    cursor: RecordCursor | None = None,
 ) -> tuple[str, dict[str, Any]]:
     inner_clauses = ["plays.user_xid = :user_xid"]
     shared, params = shared_filter_sql(opts, include_guild=True)
@@ -120,7 +287,11 @@ def build_user_records_sql(
         USER_RECORDS_SORT_COLUMNS["updated_at"],
     )
     direction = sort_direction(opts)
-    paging = "OFFSET :offset LIMIT :page_size" if paginated else ""
+    keyset, inner_order, keyset_params = paging_sql(inner_col, opts, cursor)
+    if keyset:
+        inner_clauses.append(keyset)
+        params.update(keyset_params)
+    paging = "LIMIT :page_size" if paginated else ""
     sql = f"""
         WITH game_plays AS (
             SELECT
@@ -135,7 +306,8 @@ def build_user_records_sql(
                 games.seats,
                 games.bracket,
                 games.locale,
-                guilds.name AS guild_name
+                guilds.name AS guild_name,
+                {inner_col} AS sort_value
             FROM games
             JOIN plays ON plays.game_id = games.id
             JOIN posts ON posts.game_id = games.id
@@ -143,7 +315,7 @@ def build_user_records_sql(
                 AND posts.channel_xid = games.channel_xid
             JOIN guilds ON guilds.xid = games.guild_xid
             WHERE {" AND ".join(inner_clauses)}
-            ORDER BY {inner_col} {direction}, games.id DESC
+            ORDER BY {inner_order}
             {paging}
         )
         SELECT
@@ -168,7 +340,8 @@ def build_user_records_sql(
                 ),
                 '@'
                 ORDER BY users.xid
-            )
+            ),
+            game_plays.sort_value
         FROM game_plays
         JOIN plays ON plays.game_id = game_plays.game_id
         JOIN users ON users.xid = plays.user_xid
@@ -186,6 +359,7 @@ def build_user_records_sql(
             game_plays.bracket,
             game_plays.locale,
             game_plays.guild_name,
+            game_plays.sort_value,
             channels.name
         ORDER BY {outer_col} {direction}, game_plays.game_id DESC
         ;
@@ -214,6 +388,7 @@ def build_channel_records_sql(
     opts: RecordFilters,
     *,
     paginated: bool,
+    cursor: RecordCursor | None = None,
 ) -> tuple[str, dict[str, Any]]:
     clauses = [
         "games.guild_xid = :guild_xid",
@@ -226,7 +401,11 @@ def build_channel_records_sql(
         CHANNEL_RECORDS_SORT_COLUMNS["updated_at"],
     )
     direction = sort_direction(opts)
-    paging = "OFFSET :offset LIMIT :page_size" if paginated else ""
+    keyset, inner_order, keyset_params = paging_sql(inner_col, opts, cursor)
+    if keyset:
+        clauses.append(keyset)
+        params.update(keyset_params)
+    paging = "LIMIT :page_size" if paginated else ""
     # Page the lean rows (no plays/users join) first, then STRING_AGG only for
     # the surviving page. All player-related filters in `shared_filter_sql` are
     # already EXISTS subqueries so the inner CTE does not need `plays`/`users`.
@@ -241,13 +420,14 @@ def build_channel_records_sql(
                 games.service,
                 games.seats,
                 games.bracket,
-                games.locale
+                games.locale,
+                {inner_col} AS sort_value
             FROM games
             JOIN posts ON posts.game_id = games.id
                 AND posts.guild_xid = games.guild_xid
                 AND posts.channel_xid = games.channel_xid
             WHERE {" AND ".join(clauses)}
-            ORDER BY {inner_col} {direction}, games.id DESC
+            ORDER BY {inner_order}
             {paging}
         )
         SELECT
@@ -268,7 +448,8 @@ def build_channel_records_sql(
                 ),
                 '@'
                 ORDER BY users.xid
-            )
+            ),
+            page.sort_value
         FROM page
         JOIN plays ON plays.game_id = page.id
         JOIN users ON users.xid = plays.user_xid
@@ -281,7 +462,8 @@ def build_channel_records_sql(
             page.service,
             page.seats,
             page.bracket,
-            page.locale
+            page.locale,
+            page.sort_value
         ORDER BY {outer_col} {direction}, page.id DESC
         ;
     """  # noqa: S608
@@ -398,14 +580,15 @@ async def count(user_xid: int) -> int:
 
 async def user_records(
     user_xid: int,
-    page: int = 0,
+    cursor: RecordCursor | None = None,
     opts: RecordFilters | None = None,
-) -> tuple[list[dict[str, Any]], int] | None:
+) -> RecordsPage | None:
     """
-    Fetch paginated game records for a user across all guilds.
+    Fetch one page of game records for a user across all guilds.
 
-    Returns a `(rows, total_count)` tuple where `total_count` is the total number
-    of distinct matching games before pagination, or `None` if the user is unknown.
+    Returns the page starting at `cursor` (the first page when None), where `total`
+    is the (briefly cached) number of distinct matching games, or `None` if the
+    user is unknown.
     """
     user = (
         await DatabaseSession.execute(select(User).where(User.xid == user_xid))
@@ -414,25 +597,23 @@ async def user_records(
         return None
 
     opts = opts or RecordFilters()
-    page_sql, page_params = build_user_records_sql(opts, paginated=True)
+    page_sql, page_params = build_user_records_sql(opts, paginated=True, cursor=cursor)
     count_sql, count_params = build_user_records_count_sql(opts)
     base_params: dict[str, Any] = {"user_xid": user_xid}
 
-    total = int(
-        (await DatabaseSession.execute(text(count_sql), {**base_params, **count_params})).scalar()
-        or 0,
-    )
+    total = await cached_count(count_sql, {**base_params, **count_params})
 
-    rows = await DatabaseSession.execute(
+    result = await DatabaseSession.execute(
         text(page_sql),
-        {
-            **base_params,
-            **page_params,
-            "offset": page * USER_PAGE_SIZE,
-            "page_size": USER_PAGE_SIZE,
-        },
+        {**base_params, **page_params, "page_size": USER_PAGE_SIZE + 1},
+    )
+    rows, prev_cursor, next_cursor = page_cursors(
+        list(result),
+        opts,
+        cursor,
+        USER_PAGE_SIZE,
     )
-    return [
+    records = [
         {
             "id": row[0],
             "updated_at": row[1].replace(tzinfo=tz.UTC).timestamp() * 1000,
@@ -450,21 +631,22 @@ async def user_records(
             "scores": make_scores(row[13]),
         }
         for row in rows
-    ], total
+    ]
+    return RecordsPage(records, total, prev_cursor, next_cursor)
 
 
 async def channel_records(
     guild_xid: int,
     channel_xid: int,
-    page: int = 0,
+    cursor: RecordCursor | None = None,
     opts: RecordFilters | None = None,
-) -> tuple[list[dict[str, Any]], int] | None:
+) -> RecordsPage | None:
     """
-    Fetch paginated game records for a channel.
+    Fetch one page of game records for a channel, one row per player.
 
-    Returns a `(rows, total_count)` tuple where `total_count` is the total number
-    of distinct matching games (not players) before pagination, or `None` if the
-    guild or channel is unknown.
+    Returns the page starting at `cursor` (the first page when None), where `total`
+    is the (briefly cached) number of distinct matching games (not players), or
+    `None` if the guild or channel is unknown.
     """
     guild = (
         await DatabaseSession.execute(select(Guild).where(Guild.xid == guild_xid))  # type: ignore
@@ -478,26 +660,24 @@ async def channel_records(
         return None
 
     opts = opts or RecordFilters()
-    page_sql, page_params = build_channel_records_sql(opts, paginated=True)
+    page_sql, page_params = build_channel_records_sql(opts, paginated=True, cursor=cursor)
     count_sql, count_params = build_channel_records_count_sql(opts)
     base_params: dict[str, Any] = {
         "guild_xid": guild_xid,
         "channel_xid": channel_xid,
     }
 
-    total = int(
-        (await DatabaseSession.execute(text(count_sql), {**base_params, **count_params})).scalar()
-        or 0,
-    )
+    total = await cached_count(count_sql, {**base_params, **count_params})
 
-    rows = await DatabaseSession.execute(
+    result = await DatabaseSession.execute(
         text(page_sql),
-        {
-            **base_params,
-            **page_params,
-            "offset": page * CHANNEL_PAGE_SIZE,
-            "page_size": CHANNEL_PAGE_SIZE,
-        },
+        {**base_params, **page_params, "page_size": CHANNEL_PAGE_SIZE + 1},
+    )
+    rows, prev_cursor, next_cursor = page_cursors(
+        list(result),
+        opts,
+        cursor,
+        CHANNEL_PAGE_SIZE,
     )
     combined_data = [
         {
@@ -518,7 +698,7 @@ async def channel_records(
         }
         for row in rows
     ]
-    return decomposed(combined_data), total
+    return RecordsPage(decomposed(combined_data), total, prev_cursor, next_cursor)
 
 
 async def user_export_target_exists(user_xid: int) -> bool:
@@ -541,9 +721,33 @@ async def channel_export_target_exists(guild_xid: int, channel_xid: int) -> bool
     ).scalar_one_or_none() is not None
 
 
+async def stream_rows(sql: str, params: dict[str, Any]) -> AsyncGenerator[Row[*tuple[Any, ...]]]:
+    """
+    Stream the rows of a large read through a server-side cursor.
+
+    `DatabaseSession.execute()` buffers the whole result client-side before the first
+    row is returned, which for a big export means hundreds of MB per request. This
+    instead declares a cursor on a dedicated read-only connection and fetches it
+    `EXPORT_YIELD_PER` rows at a time, so memory stays flat however many rows there
+    are. The transaction is `REPEATABLE READ` so the export is one consistent snapshot.
+    """
+    async with read_only_engine.connect() as raw_conn:
+        # Server-side cursors need a real transaction, so override the engine's AUTOCOMMIT.
+        conn = await raw_conn.execution_options(isolation_level="REPEATABLE READ")
+        async with conn.begin():
+            await conn.execute(text("SET TRANSACTION READ ONLY"))
+            result = await conn.stream(
+                text(sql),
+                params,
+                execution_options={"yield_per": EXPORT_YIELD_PER},
+            )
+            async for row in result:
+                yield row
+
+
 async def stream_user_records(
     user_xid: int,
-) -> AsyncIterator[dict[str, Any]]:
+) -> AsyncGenerator[dict[str, Any]]:
     """Stream all game records for a user across all guilds without pagination."""
     user_exists = (
         await DatabaseSession.execute(
@@ -553,33 +757,31 @@ async def stream_user_records(
     if user_exists is None:
         return
 
-    result = await DatabaseSession.execute(
-        text(USER_RECORDS_EXPORT_SQL),
-        {"user_xid": user_xid},
-    )
-    for row in result:
-        yield {
-            "id": row[0],
-            "updated_at": row[1].replace(tzinfo=tz.UTC).timestamp() * 1000,
-            "guild": row[2],
-            "channel": row[3],
-            "message": row[4],
-            "link": row[5],
-            "format": str(GameFormat(row[6])),
-            "service": str(GameService(row[7])),
-            "seats": row[8],
-            "bracket": str(GameBracket(row[9])),
-            "locale": row[10],
-            "guild_name": row[11],
-            "channel_name": row[12],
-            "scores": make_scores(row[13]),
-        }
+    rows = stream_rows(USER_RECORDS_EXPORT_SQL, {"user_xid": user_xid})
+    async with aclosing(rows):
+        async for row in rows:
+            yield {
+                "id": row[0],
+                "updated_at": row[1].replace(tzinfo=tz.UTC).timestamp() * 1000,
+                "guild": row[2],
+                "channel": row[3],
+                "message": row[4],
+                "link": row[5],
+                "format": str(GameFormat(row[6])),
+                "service": str(GameService(row[7])),
+                "seats": row[8],
+                "bracket": str(GameBracket(row[9])),
+                "locale": row[10],
+                "guild_name": row[11],
+                "channel_name": row[12],
+                "scores": make_scores(row[13]),
+            }
 
 
 async def stream_channel_records(
     guild_xid: int,
     channel_xid: int,
-) -> AsyncIterator[dict[str, Any]]:
+) -> AsyncGenerator[dict[str, Any]]:
     """Stream all game records for a channel without pagination, one row per player."""
     guild_name = (
         await DatabaseSession.execute(
@@ -596,29 +798,28 @@ async def stream_channel_records(
     if channel_name is None:
         return
 
-    result = await DatabaseSession.execute(
-        text(CHANNEL_RECORDS_EXPORT_SQL),
-        {"guild_xid": guild_xid, "channel_xid": channel_xid},
-    )
-    for row in result:
-        combined = {
-            "id": row[0],
-            "updated_at": row[1].replace(tzinfo=tz.UTC).timestamp() * 1000,
-            "guild": guild_xid,
-            "channel": channel_xid,
-            "message": row[2],
-            "link": row[3],
-            "format": str(GameFormat(row[4])),
-            "service": str(GameService(row[5])),
-            "seats": row[6],
-            "bracket": str(GameBracket(row[7])),
-            "locale": row[8],
-            "guild_name": guild_name,
-            "channel_name": channel_name,
-            "scores": make_scores(row[9]),
-        }
-        for player_row in decomposed([combined]):
-            yield player_row
+    params = {"guild_xid": guild_xid, "channel_xid": channel_xid}
+    rows = stream_rows(CHANNEL_RECORDS_EXPORT_SQL, params)
+    async with aclosing(rows):
+        async for row in rows:
+            combined = {
+                "id": row[0],
+                "updated_at": row[1].replace(tzinfo=tz.UTC).timestamp() * 1000,
+                "guild": guild_xid,
+                "channel": channel_xid,
+                "message": row[2],
+                "link": row[3],
+                "format": str(GameFormat(row[4])),
+                "service": str(GameService(row[5])),
+                "seats": row[6],
+                "bracket": str(GameBracket(row[7])),
+                "locale": row[8],
+                "guild_name": guild_name,
+                "channel_name": channel_name,
+                "scores": make_scores(row[9]),
+            }
+            for player_row in decomposed([combined]):
+                yield player_row
 
 
 async def top_records(
@@ -1390,11 +1591,89 @@ def extract_ngrams(text: str, n: int) -> list[str]:
     return [" ".join(words[i : i + n]) for i in range(len(words) - n + 1)]
 
 
+def normalized_rule_sql(rules: ColumnElement[str]) -> ColumnElement[str]:
+    """Build the SQL equivalent of `normalize_rule` for a rules column."""
+    collapsed = func.btrim(func.regexp_replace(func.lower(rules), r"\s+", " ", "g"))
+    return func.btrim(func.regexp_replace(collapsed, "[.!?,;:]+$", ""))
+
+
+async def rule_frequencies(
+    filters: list[ColumnElement[bool]],
+    *,
+    rules: int,
+    ngrams: int,
+) -> dict[str, Any]:
+    """
+    Return the most common rules and rule n-grams among the games matching `filters`.
+
+    Everything is counted in the database so only the top `rules` rules and top
+    `ngrams` bigrams / trigrams come back, however many games there are. Rules are
+    normalized as by `normalize_rule` and split into words as by `extract_ngrams`;
+    the n-grams are each word joined to the next one or two kept words of the same
+    game's rules. Ties are broken alphabetically.
+    """
+    normalized = (
+        select(Game.id.label("game_id"), normalized_rule_sql(Game.rules).label("rule"))
+        .where(*filters)
+        .cte("rule_texts")
+    )
+    count = func.count().label("count")
+    rule_rows = await DatabaseSession.execute(
+        select(normalized.c.rule, count)
+        .where(normalized.c.rule != "")
+        .group_by(normalized.c.rule)
+        .order_by(count.desc(), normalized.c.rule)
+        .limit(rules),
+    )
+
+    split = (
+        func.regexp_split_to_table(normalized.c.rule, " ")
+        .table_valued("word", with_ordinality="position")
+        .render_derived(name="words")
+    )
+    word = func.btrim(split.c.word, ".,!?;:\"'()[]")
+    words = (
+        select(normalized.c.game_id, word.label("word"), split.c.position)
+        .select_from(normalized)
+        .join(split, true())
+        .where(func.length(word) > 1)
+        .subquery("rule_words")
+    )
+    following = [
+        func.lead(words.c.word, offset).over(
+            partition_by=words.c.game_id,
+            order_by=words.c.position,
+        )
+        for offset in (1, 2)
+    ]
+    grams = select(
+        (words.c.word + " " + following[0]).label("bigram"),
+        (words.c.word + " " + following[0] + " " + following[1]).label("trigram"),
+    ).cte("rule_grams")
+    # The last words of each game have no bigram / trigram, which leaves them NULL.
+    phrases = union_all(
+        select(grams.c.bigram.label("phrase")),
+        select(grams.c.trigram.label("phrase")),
+    ).subquery("rule_phrases")
+    ngram_rows = await DatabaseSession.execute(
+        select(phrases.c.phrase, count)
+        .where(phrases.c.phrase.isnot(None))
+        .group_by(phrases.c.phrase)
+        .order_by(count.desc(), phrases.c.phrase)
+        .limit(ngrams),
+    )
+
+    return {
+        "top_rules": [{"rule": rule, "count": n} for rule, n in rule_rows.all()],
+        "rule_ngrams": [{"phrase": phrase, "count": n} for phrase, n in ngram_rows.all()],
+    }
+
+
 async def analytics_rules(guild_xid: int, *, all_time: bool = False) -> dict[str, Any]:
     """Return top rules and n-gram frequencies for word cloud."""
     thirty_days_ago = datetime.now(tz=UTC) + relativedelta(days=-30)
 
-    filters = [
+    filters: list[ColumnElement[bool]] = [
         Game.guild_xid == guild_xid,
         Game.started_at.isnot(None),
         Game.deleted_at.is_(None),
@@ -1404,36 +1683,5 @@ async def analytics_rules(guild_xid: int, *, all_time: bool = False) -> dict[str
     if not all_time:
         filters.append(Game.started_at >= thirty_days_ago)
 
-    rules_result = await DatabaseSession.execute(
-        select(Game.rules).where(*filters),
-    )
-    rules_list = [row[0] for row in rules_result.all() if row[0]]
-
-    # Count normalized full rules
-    rule_counter: Counter[str] = Counter()
-    for rule in rules_list:
-        normalized = normalize_rule(rule)
-        if normalized:
-            rule_counter[normalized] += 1
-
-    # Get top 10 rules
-    top_rules = [{"rule": rule, "count": count} for rule, count in rule_counter.most_common(10)]
-
-    # Extract bigrams and trigrams for word cloud
-    ngram_counter: Counter[str] = Counter()
-    for rule in rules_list:
-        normalized = normalize_rule(rule)
-        if normalized:
-            # Add bigrams
-            for bigram in extract_ngrams(normalized, 2):
-                ngram_counter[bigram] += 1
-            # Add trigrams
-            for trigram in extract_ngrams(normalized, 3):
-                ngram_counter[trigram] += 1
-
-    # Get top 50 n-grams for word cloud
-    rule_ngrams = [
-        {"phrase": phrase, "count": count} for phrase, count in ngram_counter.most_common(50)
-    ]
-
-    return {"top_rules": top_rules, "rule_ngrams": rule_ngrams}
+    # Top 10 rules, and the top 50 n-grams for the word cloud
+    return await rule_frequencies(filters, rules=10, ngrams=50)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import logging
+from enum import StrEnum
+from typing import TYPE_CHECKING, Final
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+
+from spellbot.database import DatabaseSession, any_of
+from spellbot.i18n import language_name
+from spellbot.models import Game, Guild, Queue
+from spellbot.redis_client import get_redis
+from spellbot.services.queues import BRACKET_LABEL, FORMAT_LABEL
+from spellbot.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel the bot publishes queue changes on for the web process.
+QUEUE_EVENTS_CHANNEL: Final = "queue_events"
+
+
+class QueueEventType(StrEnum):
+    """A change to a game that the public /queues page shows."""
+
+    CREATED = "created"
+    SEAT = "seat"
+    STARTED = "started"
+    EXPIRED = "expired"
+
+
+async def game_changed(kind: QueueEventType, game_ids: Iterable[int]) -> None:
+    """
+    Publish a `kind` event for each of the given games, if Redis is configured.
+
+    Each event carries the game's guild, seats and queued players as of now, so
+    call this after committing the change, along with the format, bracket and
+    language labels /queues filters by. Publishing is best effort: a Redis
+    failure is logged and never fails the write that triggered it.
+    """
+    if not settings.REDIS_URL:
+        return
+    ids = list(game_ids)
+    if not ids:
+        return
+    rows = await DatabaseSession.execute(
+        select(
+            Game.id,
+            Game.guild_xid,
+            Guild.locale,
+            FORMAT_LABEL,
+            BRACKET_LABEL,
+            Game.seats,  # type: ignore
+            func.count(Queue.user_xid),
+        )
+        .join(Guild, Guild.xid == Game.guild_xid)
+        .outerjoin(Queue, Queue.game_id == Game.id)
+        .where(any_of(Game.id, ids))
+        .group_by(Game.id, Guild.xid),
+    )
+    events = [
+        {
+            "type": kind.value,
+            "game_id": int(game_id),
+            "guild_xid": int(guild_xid),
+            "format": format_label,
+            "bracket": bracket_label,
+            "language": language_name(locale),
+            "seats": int(seats),
+            "players": int(players),
+        }
+        for game_id, guild_xid, locale, format_label, bracket_label, seats, players in rows.all()
+    ]
+    try:
+        redis = await get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for event in events:
+            pipe.publish(QUEUE_EVENTS_CHANNEL, json.dumps(event))
+        await pipe.execute()
+    except RedisError:
+        logger.warning("failed to publish queue events for games %s", ids, exc_info=True)
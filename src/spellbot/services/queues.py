@@ -81,6 +81,7 @@ async def public_active_games(
         channel_xid = str(int(row[5]))
         out.append(
             {
+                "game_id": int(row[0]),
                 "guild_xid": guild_xid_int,
                 "guild_name": row[2] or "",
                 "guild_locale": row[3] or "en",
@@ -188,6 +189,7 @@ async def public_active_queues(
             jump_url = f"https://discord.com/channels/{guild_xid}/{channel_xid}"
         out.append(
             {
+                "game_id": int(row[0]),
                 "guild_xid": guild_xid_int,
                 "guild_name": row[2] or "",
                 "guild_locale": row[3] or "en",
@@ -207,6 +209,22 @@ async def public_active_queues(
     return out
 
 
+async def public_guild_xids() -> set[int]:
+    """Return the guilds whose games are listed publicly: promoted and not banned."""
+    rows = await DatabaseSession.execute(
+        select(Guild.xid).where(Guild.banned.is_(False), Guild.promote.is_(True)),  # type: ignore
+    )
+    return {int(xid) for xid in rows.scalars()}
+
+
+async def member_guild_xids(user_xid: int) -> set[int]:
+    """Return the guilds the given user is a member of, as `only_member_of` matches them."""
+    rows = await DatabaseSession.execute(
+        select(GuildMember.guild_xid).where(GuildMember.user_xid == user_xid),
+    )
+    return {int(xid) for xid in rows.scalars()}
+
+
 async def viewer_played_guilds(
     user_xid: int,
     *,
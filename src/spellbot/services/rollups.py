@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any, Final
+
+from ddtrace.trace import tracer
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    cast,
+    delete,
+    distinct,
+    extract,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy import union_all as sql_union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from spellbot.database import DatabaseSession, transaction_session_manager
+from spellbot.models import Game, GuildDailyRollup, Play, RollupState
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Select
+    from sqlalchemy.sql import ColumnElement
+
+    from spellbot.web.dashboard_filters import GuildFilter
+
+logger = logging.getLogger(__name__)
+
+# Name of the dashboard rollups' row in `rollup_state`.
+ROLLUP_NAME: Final = "dashboard"
+
+# Key for the advisory lock that keeps two processes from refreshing at the same time.
+ROLLUP_LOCK_KEY: Final = 0x5B_D0_11_0B
+
+# Days are recomputed at most this many at a time, so a first backfill is done in pieces.
+REFRESH_CHUNK_DAYS: Final = 31
+
+# Games updated this long before a refresh started are looked at again on the next one,
+# in case a transaction that changed them had not committed yet when this one ran.
+REFRESH_OVERLAP: Final = timedelta(minutes=5)
+
+ONE_DAY: Final = timedelta(days=1)
+
+# Totals keyed by the values they are grouped by.
+Sums = defaultdict[tuple[Any, ...], float]
+
+
+class RollupMetric(StrEnum):
+    """
+    A daily per-guild total kept in `guild_daily_rollups`.
+
+    Each metric is attributed to the day of one timestamp, the same one the
+    dashboard buckets it by: most use `started_at`, the `CREATED_*` ones and
+    `SERVICE` use `created_at` and `EXPIRED` uses `deleted_at`.
+    """
+
+    STARTED = "started"
+    EXPIRED = "expired"
+    CREATED_STARTED = "created_started"
+    CREATED_EXPIRED = "created_expired"
+    PLAYERS = "players"
+    WAIT_SECONDS = "wait_seconds"
+    FORMAT = "format"
+    BRACKET = "bracket"
+    SEATS = "seats"
+    SERVICE = "service"
+    HOUR = "hour"
+    VOICE = "voice"
+    BLIND = "blind"
+
+
+def midnight(value: datetime) -> datetime:
+    """Return UTC midnight at the start of `value`'s day."""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Mark a naive UTC timestamp read from the database as UTC."""
+    return value.replace(tzinfo=UTC)
+
+
+def range_filters(
+    column: Any,
+    lo: datetime | None,
+    hi: datetime | None,
+) -> list[ColumnElement[bool]]:
+    """Build filters restricting `column` to `[lo, hi)`, where a None bound is open."""
+    filters: list[ColumnElement[bool]] = []
+    if lo is not None:
+        filters.append(column >= lo)
+    if hi is not None:
+        filters.append(column < hi)
+    return filters
+
+
+def rollup_guild_filter(opts: GuildFilter) -> list[ColumnElement[bool]]:
+    """Build the rollup equivalent of `services.dashboard.game_guild_filter`."""
+    if not opts.applies:
+        return []
+    assert opts.xid is not None
+    if opts.mode == "include":
+        return [GuildDailyRollup.guild_xid == opts.xid]
+    return [GuildDailyRollup.guild_xid != opts.xid]
+
+
+@dataclass(frozen=True)
+class RollupWindow:
+    """
+    How a dashboard period splits between rolled-up days and live queries.
+
+    Whole days from `first_day` (the start of history when None) up to
+    `covered_until` are read from the rollups. The rest of the period, which is
+    the partial day it starts in and everything since the last refresh, is
+    counted from `games` directly. Without rollups the whole period is live.
+    """
+
+    start: datetime | None
+    first_day: datetime | None = None
+    covered_until: datetime | None = None
+
+    def raw_ranges(self) -> list[tuple[datetime | None, datetime | None]]:
+        """Return the `[lo, hi)` ranges of the period that aren't covered by rollups."""
+        if self.covered_until is None:
+            return [(self.start, None)]
+        ranges: list[tuple[datetime | None, datetime | None]] = [(self.covered_until, None)]
+        if self.start is not None and self.first_day is not None and self.start < self.first_day:
+            ranges.insert(0, (self.start, self.first_day))
+        return ranges
+
+
+async def rollup_window(start: datetime | None) -> RollupWindow:
+    """Split a period starting at `start` (None for all time) around the current rollups."""
+    covered = (
+        await DatabaseSession.execute(
+            select(RollupState.covered_until).where(RollupState.name == ROLLUP_NAME),
+        )
+    ).scalar()
+    if covered is None:
+        return RollupWindow(start)
+    covered_until = as_utc(covered)
+    if start is None:
+        return RollupWindow(start, None, covered_until)
+    first_day = midnight(start)
+    if first_day < start:
+        first_day += ONE_DAY
+    if first_day >= covered_until:
+        return RollupWindow(start)
+    return RollupWindow(start, first_day, covered_until)
+
+
+async def raw_sums(
+    window: RollupWindow,
+    query: Select[*tuple[Any, ...]],
+    column: Any,
+) -> Sums:
+    """
+    Run a grouped `query` over each live range of `window`, filtering on `column`.
+
+    The query's last column is the value summed and the others form the key.
+    """
+    sums: Sums = defaultdict(float)
+    for lo, hi in window.raw_ranges():
+        rows = await DatabaseSession.execute(query.where(*range_filters(column, lo, hi)))
+        for row in rows:
+            if row[-1] is not None:
+                sums[tuple(row[:-1])] += float(row[-1])
+    return sums
+
+
+async def rollup_sums(
+    window: RollupWindow,
+    opts: GuildFilter,
+    metric: RollupMetric,
+    *by: Any,
+) -> Sums:
+    """Sum `metric` over the rolled-up days of `window`, grouped by the `by` expressions."""
+    if window.covered_until is None:
+        return defaultdict(float)
+    filters = [
+        GuildDailyRollup.metric == metric.value,
+        GuildDailyRollup.day < window.covered_until,
+        *rollup_guild_filter(opts),
+    ]
+    if window.first_day is not None:
+        filters.append(GuildDailyRollup.day >= window.first_day)
+    rows = await DatabaseSession.execute(
+        select(*by, func.sum(GuildDailyRollup.value)).where(*filters).group_by(*by),
+    )
+    sums: Sums = defaultdict(float)
+    for row in rows:
+        if row[-1] is not None:
+            sums[tuple(row[:-1])] += float(row[-1])
+    return sums
+
+
+async def windowed_sums(
+    window: RollupWindow,
+    opts: GuildFilter,
+    query: Select[*tuple[Any, ...]],
+    column: Any,
+    metric: RollupMetric,
+    *by: Any,
+) -> Sums:
+    """
+    Total a dashboard figure over `window`, from the rollups and live queries combined.
+
+    `query` computes the figure from `games` grouped the same way as the `by`
+    expressions group `metric`, and `column` is the timestamp the metric is
+    attributed to. Keys must compare equal across both sources.
+    """
+    sums = await raw_sums(window, query, column)
+    for key, value in (await rollup_sums(window, opts, metric, *by)).items():
+        sums[key] += value
+    return sums
+
+
+def rollup_day(column: Any) -> Any:
+    return func.date_trunc("day", column)
+
+
+def daily(
+    metric: RollupMetric,
+    column: Any,
+    value: Any,
+    filters: list[ColumnElement[bool]],
+    key: Any = None,
+) -> Select[*tuple[Any, ...]]:
+    """Build a per-day, per-guild select of `value` attributed to `column`'s day."""
+    day = rollup_day(column)
+    groups = [day, Game.guild_xid, *([key] if key is not None else [])]
+    return (
+        select(
+            literal(metric.value, String),
+            day,
+            Game.guild_xid,
+            key if key is not None else literal(0, Integer),
+            cast(value, Float),
+        )
+        .where(*filters)
+        .group_by(*groups)
+    )
+
+
+def metric_selects(lo: datetime, hi: datetime) -> list[Select[*tuple[Any, ...]]]:
+    """Build the selects that compute every metric for the days in `[lo, hi)`."""
+    started = [Game.started_at.isnot(None), *range_filters(Game.started_at, lo, hi)]
+    created = range_filters(Game.created_at, lo, hi)
+    games = func.count(Game.id)
+    wait = func.sum(extract("epoch", Game.started_at) - extract("epoch", Game.created_at))
+    hour = cast(extract("hour", Game.started_at), Integer)
+    return [
+        daily(RollupMetric.STARTED, Game.started_at, games, started),
+        daily(
+            RollupMetric.EXPIRED,
+            Game.deleted_at,
+            games,
+            [Game.started_at.is_(None), *range_filters(Game.deleted_at, lo, hi)],
+        ),
+        daily(
+            RollupMetric.CREATED_STARTED,
+            Game.created_at,
+            games,
+            [Game.started_at.isnot(None), *created],
+        ),
+        daily(
+            RollupMetric.CREATED_EXPIRED,
+            Game.created_at,
+            games,
+            [Game.deleted_at.isnot(None), *created],
+        ),
+        daily(
+            RollupMetric.PLAYERS,
+            Game.started_at,
+            func.count(distinct(Play.user_xid)),
+            started,
+        ).join_from(Game, Play, Play.game_id == Game.id),
+        daily(RollupMetric.WAIT_SECONDS, Game.started_at, wait, started),
+        daily(RollupMetric.FORMAT, Game.started_at, games, started, Game.format),
+        daily(RollupMetric.BRACKET, Game.started_at, games, started, Game.bracket),
+        daily(RollupMetric.SEATS, Game.started_at, games, started, Game.seats),
+        daily(
+            RollupMetric.SERVICE,
+            Game.created_at,
+            games,
+            [Game.started_at.isnot(None), *created],
+            Game.service,
+        ),
+        daily(RollupMetric.HOUR, Game.started_at, games, started, hour),
+        daily(RollupMetric.VOICE, Game.started_at, games, [*started, Game.voice_xid.isnot(None)]),
+        daily(RollupMetric.BLIND, Game.started_at, games, [*started, Game.blind.is_(True)]),
+    ]
+
+
+async def refresh_range(lo: datetime, hi: datetime) -> None:
+    """Recompute every metric for the days in `[lo, hi)`, within the caller's transaction."""
+    await DatabaseSession.execute(
+        delete(GuildDailyRollup).where(*range_filters(GuildDailyRollup.day, lo, hi)),
+    )
+    await DatabaseSession.execute(
+        insert(GuildDailyRollup).from_select(
+            ["metric", "day", "guild_xid", "key", "value"],
+            sql_union_all(*metric_selects(lo, hi)),
+        ),
+    )
+
+
+def day_runs(days: Iterable[datetime]) -> list[tuple[datetime, datetime]]:
+    """Collapse days into `[lo, hi)` runs of consecutive days, each `REFRESH_CHUNK_DAYS` or less."""
+    runs: list[tuple[datetime, datetime]] = []
+    for day in sorted(set(days)):
+        if runs and runs[-1][1] == day and day - runs[-1][0] < REFRESH_CHUNK_DAYS * ONE_DAY:
+            runs[-1] = (runs[-1][0], day + ONE_DAY)
+        else:
+            runs.append((day, day + ONE_DAY))
+    return runs
+
+
+def days_between(lo: datetime, hi: datetime) -> list[datetime]:
+    return [lo + i * ONE_DAY for i in range(max((hi - lo).days, 0))]
+
+
+async def changed_days(since: datetime, until: datetime) -> set[datetime]:
+    """Return the days before `until` touched by games updated at or after `since`."""
+    touched = [
+        select(rollup_day(column)).where(Game.updated_at >= since, column < until)
+        for column in (Game.created_at, Game.started_at, Game.deleted_at)
+    ]
+    rows = await DatabaseSession.execute(sql_union_all(*touched))
+    return {as_utc(row[0]) for row in rows}
+
+
+async def days_to_refresh(today: datetime) -> list[datetime]:
+    """Return every day that must be recomputed to bring the rollups up to `today`."""
+    state = await DatabaseSession.get(RollupState, ROLLUP_NAME)
+    if state is None:
+        first = (await DatabaseSession.execute(select(func.min(Game.created_at)))).scalar()
+        return days_between(midnight(as_utc(first)), today) if first is not None else []
+    covered_until = as_utc(state.covered_until)
+    changed = await changed_days(as_utc(state.refreshed_at), covered_until)
+    return sorted(changed | set(days_between(covered_until, today)))
+
+
+@tracer.wrap()
+async def refresh(now: datetime | None = None) -> int:
+    """
+    Bring the dashboard rollups up to date, returning how many days were recomputed.
+
+    Only whole days before today are rolled up. The first refresh backfills every
+    day since the first game. Later ones recompute the days that have since ended,
+    plus any earlier day that a game updated since the last refresh was created,
+    started or deleted on. A refresh already running elsewhere makes this a no-op.
+    """
+    now = now or datetime.now(tz=UTC)
+    # One transaction: it holds the lock throughout and readers never see a day
+    # whose rollups were deleted but not yet recomputed.
+    async with transaction_session_manager():
+        locked = (
+            await DatabaseSession.execute(select(func.pg_try_advisory_xact_lock(ROLLUP_LOCK_KEY)))
+        ).scalar()
+        if not locked:
+            logger.info("dashboard rollups are already being refreshed")
+            return 0
+
+        today = midnight(now)
+        days = await days_to_refresh(today)
+        for lo, hi in day_runs(days):
+            await refresh_range(lo, hi)
+
+        values = {
+            "name": ROLLUP_NAME,
+            "refreshed_at": now - REFRESH_OVERLAP,
+            "covered_until": today,
+        }
+        upsert = insert(RollupState).values(**values)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[RollupState.name],
+            set_={
+                "refreshed_at": upsert.excluded.refreshed_at,
+                "covered_until": upsert.excluded.covered_until,
+            },
+        )
+        await DatabaseSession.execute(upsert)
+    logger.info("refreshed dashboard rollups for %s days", len(days))
+    return len(days)
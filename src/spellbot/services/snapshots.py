@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Final
+
+from ddtrace.trace import tracer
+from sqlalchemy import delete, exists, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from spellbot.database import DatabaseSession, advisory_lock, read_only_session_manager
+from spellbot.models import Game, GuildAnalyticsSnapshot
+from spellbot.settings import settings
+
+from . import plays
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Key for the advisory lock that keeps two processes from refreshing at the same time.
+SNAPSHOT_LOCK_KEY: Final = 0x5B_D0_11_0C
+
+# Snapshots of guilds whose analytics page hasn't been opened for this long are dropped.
+SNAPSHOT_IDLE: Final = timedelta(days=30)
+
+# The periods the analytics page can be switched between.
+SNAPSHOT_PERIODS: Final = ("30d", "all")
+
+# Every analytics panel kept in a snapshot, by the name of its endpoint.
+SNAPSHOT_PANELS: Final[dict[str, Callable[..., Awaitable[dict[str, Any]]]]] = {
+    "summary": plays.analytics_summary,
+    "activity": plays.analytics_activity,
+    "wait-time": plays.analytics_wait_time,
+    "brackets": plays.analytics_brackets,
+    "retention": plays.analytics_retention,
+    "growth": plays.analytics_growth,
+    "histogram": plays.analytics_histogram,
+    "formats": plays.analytics_formats,
+    "languages": plays.analytics_languages,
+    "channels": plays.analytics_channels,
+    "channel-players": plays.analytics_channel_players,
+    "services": plays.analytics_services,
+    "players": plays.analytics_players,
+    "blocked": plays.analytics_blocked,
+    "hour-of-day": plays.analytics_hour_of_day,
+    "day-of-week": plays.analytics_day_of_week,
+    "rules": plays.analytics_rules,
+}
+
+
+def snapshot_period(all_time: bool) -> str:
+    return "all" if all_time else "30d"
+
+
+async def mark_viewed(guild_xid: int) -> None:
+    """Record that a guild's analytics page was opened, asking for a snapshot if it has none."""
+    upsert = insert(GuildAnalyticsSnapshot).values(
+        guild_xid=guild_xid,
+        viewed_at=datetime.now(tz=UTC),
+    )
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[GuildAnalyticsSnapshot.guild_xid],
+        set_={"viewed_at": upsert.excluded.viewed_at},
+    )
+    await DatabaseSession.execute(upsert)
+
+
+async def panel(guild_xid: int, panel: str, *, all_time: bool = False) -> dict[str, Any] | None:
+    """
+    Return one panel's data from the guild's snapshot, or None if it hasn't got one yet.
+
+    The data carries a `snapshot_at` timestamp so the page can show how old it is.
+    """
+    row = (
+        await DatabaseSession.execute(
+            select(
+                GuildAnalyticsSnapshot.data[snapshot_period(all_time)][panel],
+                GuildAnalyticsSnapshot.computed_at,
+            ).where(
+                GuildAnalyticsSnapshot.guild_xid == guild_xid,
+                GuildAnalyticsSnapshot.computed_at.isnot(None),
+            ),
+        )
+    ).one_or_none()
+    if row is None or row[0] is None:
+        return None
+    computed_at: datetime = row[1]
+    return {**row[0], "snapshot_at": computed_at.replace(tzinfo=UTC).isoformat()}
+
+
+async def compute(guild_xid: int) -> dict[str, dict[str, Any]]:
+    """Compute every analytics panel for both periods."""
+    return {
+        period: {
+            name: await fetch(guild_xid, all_time=period == "all")
+            for name, fetch in SNAPSHOT_PANELS.items()
+        }
+        for period in SNAPSHOT_PERIODS
+    }
+
+
+async def due_guilds(now: datetime) -> list[int]:
+    """Return the guilds whose snapshots are missing, too old, or behind a changed game."""
+    changed = exists().where(
+        Game.guild_xid == GuildAnalyticsSnapshot.guild_xid,
+        Game.updated_at >= GuildAnalyticsSnapshot.computed_at,
+    )
+    max_age = timedelta(minutes=settings.ANALYTICS_SNAPSHOT_MAX_AGE_M)
+    rows = await DatabaseSession.execute(
+        select(GuildAnalyticsSnapshot.guild_xid)
+        .where(
+            or_(
+                GuildAnalyticsSnapshot.computed_at.is_(None),
+                GuildAnalyticsSnapshot.computed_at < now - max_age,
+                changed,
+            ),
+        )
+        .order_by(GuildAnalyticsSnapshot.guild_xid),
+    )
+    return list(rows.scalars().all())
+
+
+@tracer.wrap()
+async def refresh(now: datetime | None = None) -> int:
+    """
+    Recompute the analytics snapshots that are due, returning how many were.
+
+    Only guilds whose analytics page has been opened in the last `SNAPSHOT_IDLE`
+    have snapshots. One is due when it has never been computed, once it is older
+    than `ANALYTICS_SNAPSHOT_MAX_AGE_M`, or as soon as a game in the guild has
+    started, expired or otherwise changed since. Running this every few minutes
+    debounces those changes: however many games start in between, each guild is
+    recomputed at most once, reading from the replica if one is configured. A
+    refresh already running elsewhere makes this a no-op.
+    """
+    now = now or datetime.now(tz=UTC)
+    async with advisory_lock(SNAPSHOT_LOCK_KEY) as locked:
+        if not locked:
+            logger.info("analytics snapshots are already being refreshed")
+            return 0
+
+        idle = GuildAnalyticsSnapshot.viewed_at < now - SNAPSHOT_IDLE
+        await DatabaseSession.execute(delete(GuildAnalyticsSnapshot).where(idle))
+        await DatabaseSession.commit()
+        refreshed = 0
+        for guild_xid in await due_guilds(now):
+            # Each guild is committed on its own, so pages pick up new snapshots as
+            # they're written and one guild failing doesn't cost the others theirs.
+            try:
+                async with read_only_session_manager():
+                    data = await compute(guild_xid)
+                await DatabaseSession.execute(
+                    update(GuildAnalyticsSnapshot)
+                    .where(GuildAnalyticsSnapshot.guild_xid == guild_xid)
+                    .values(data=data, computed_at=now),
+                )
+                await DatabaseSession.commit()
+            except Exception:
+                logger.exception("failed to refresh the analytics snapshot of guild %s", guild_xid)
+                await DatabaseSession.rollback()
+            else:
+                refreshed += 1
+    logger.info("refreshed analytics snapshots for %s guilds", refreshed)
+    return refreshed
@@ -5,7 +5,7 @@ from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any, cast
 
 from ddtrace.trace import tracer
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import BigInteger, delete, func, literal, select, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.expression import and_
 
@@ -19,9 +19,12 @@ from spellbot.models import (
     Queue,
     User,
     UserAward,
+    UserPlayWeek,
     Verify,
     Watch,
 )
+from spellbot.services.cohorts import cohort_cache
+from spellbot.services.queue_events import QueueEventType, game_changed
 from spellbot.settings import settings
 
 if TYPE_CHECKING:
@@ -241,6 +244,7 @@ async def leave_game(user_data: UserData, channel_xid: int) -> list[GameData]:
     result = (await DatabaseSession.execute(query)).scalars()
     updated_games: list[GameData] = [await g.to_data() for g in result.all()]
     await DatabaseSession.commit()
+    await game_changed(QueueEventType.SEAT, left_game_ids)
     return updated_games
 
 
@@ -545,6 +549,28 @@ async def move_user(  # pragma: no cover
             )
             await DatabaseSession.execute(play_upsert, play_values)
 
+        # upsert play weeks for the moved plays
+        logger.info("upsert play weeks: %s", to_user_xid)
+        await DatabaseSession.execute(
+            insert(UserPlayWeek)
+            .from_select(
+                ["user_xid", "week", "guild_xid"],
+                select(
+                    literal(to_user_xid, BigInteger),
+                    func.date_trunc("week", Game.started_at),
+                    Game.guild_xid,
+                )
+                .join(Game, Play.game_id == Game.id)
+                .where(
+                    Play.user_xid == from_user_xid,
+                    Game.guild_xid == guild_xid,
+                    Game.started_at.isnot(None),
+                )
+                .distinct(),
+            )
+            .on_conflict_do_nothing(),
+        )
+
         # upsert user awards
         for award in (
             (
@@ -579,6 +605,8 @@ async def move_user(  # pragma: no cover
             await DatabaseSession.execute(award_upsert, award_values)
 
         await DatabaseSession.commit()
+        # The moved plays add to weeks the cohort matrix treats as complete.
+        cohort_cache.clear()
     except Exception:
         logger.exception("error moving user")
         await DatabaseSession.rollback()
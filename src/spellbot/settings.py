@@ -57,13 +57,18 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str | None = None
+    DATABASE_REPLICA_URL: str | None = None
     DATABASE_POOL_SIZE: int = 20
     DATABASE_POOL_MAX_OVERFLOW: int = 40
     DATABASE_POOL_RECYCLE_S: int = 1800
     DATABASE_ECHO: bool = False
+    # Panels an analytics batch request computes at once, each on its own pooled session.
+    ANALYTICS_BATCH_CONCURRENCY: int = 4
 
     # Cache
     REDIS_URL: str | None = None
+    # Guild icons the web process asks Discord for at once when backfilling them.
+    ICON_FETCH_CONCURRENCY: int = 4
 
     # TableStream
     TABLESTREAM_ROOT: str = "https://api.table-stream.com"
@@ -109,6 +114,9 @@ class Settings(BaseSettings):
     SHARD_STATUS_UPDATE_INTERVAL_S: int = 30
     NOTIFY_GAMES_LOOP_M: int = 1
     NOTIFY_GAMES_DELAY_M: int = 5
+    DASHBOARD_ROLLUP_LOOP_M: int = 15
+    ANALYTICS_SNAPSHOT_LOOP_M: int = 5
+    ANALYTICS_SNAPSHOT_MAX_AGE_M: int = 60
 
     # DM rate limiting (self-imposed to stay well within Discord's informal
     # bot-DM ceiling; counters are kept in Redis via a sliding window).
@@ -138,13 +146,11 @@ class Settings(BaseSettings):
 
     # Not from environment - set during validation
     _database_url_resolved: str | None = None
+    _database_replica_url_resolved: str | None = None
 
-    @model_validator(mode="after")
-    def resolve_derived_urls(self) -> Settings:
-        """Build derived URLs from base URLs."""
-        # Resolve database URL with proper driver prefix
-        url = self.DATABASE_URL or f"postgresql://postgres@{self.HOST}:5432/postgres"
-
+    @staticmethod
+    def resolve_database_url(url: str) -> str:
+        """Apply the test database suffix and psycopg3 driver prefix to a database URL."""
         # Always use a separate test database when running in pytest
         if running_in_pytest() and not url.endswith("-test"):  # pragma: no cover
             url += "-test"
@@ -155,8 +161,22 @@ class Settings(BaseSettings):
         # Ensure that we're asking for the psycopg3+ driver (and not psycopg2)
         if url.startswith("postgresql://"):  # pragma: no cover
             url = url.replace("postgresql://", "postgresql+psycopg://", 1)
+        return url
+
+    @model_validator(mode="after")
+    def resolve_derived_urls(self) -> Settings:
+        """Build derived URLs from base URLs."""
+        # Resolve database URL with proper driver prefix
+        url = self.DATABASE_URL or f"postgresql://postgres@{self.HOST}:5432/postgres"
+        object.__setattr__(self, "_database_url_resolved", self.resolve_database_url(url))
 
-        object.__setattr__(self, "_database_url_resolved", url)
+        # The read replica is optional; without it read-only sessions use the primary
+        if self.DATABASE_REPLICA_URL:
+            object.__setattr__(
+                self,
+                "_database_replica_url_resolved",
+                self.resolve_database_url(self.DATABASE_REPLICA_URL),
+            )
 
         # Derive TABLESTREAM_CREATE if not explicitly set
         if not self.TABLESTREAM_CREATE:
@@ -182,6 +202,12 @@ class Settings(BaseSettings):
         """The database URL with proper driver prefix applied."""
         return self._database_url_resolved or ""
 
+    @computed_field
+    @property
+    def RESOLVED_DATABASE_REPLICA_URL(self) -> str | None:
+        """The read replica database URL with proper driver prefix applied, if configured."""
+        return self._database_replica_url_resolved
+
     def workaround_over_eager_caching(self, url: str) -> str:
         return f"{url}?{datetime.now(tz=UTC).date().strftime('%Y-%m-%d')}"
 
@@ -2,18 +2,22 @@ from __future__ import annotations
 
 import json
 import logging
+from collections import Counter
 from dataclasses import asdict, dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
 from packaging.version import parse as parse_version
 
 from spellbot import __version__
+from spellbot.pool_stats import pool_snapshots
 from spellbot.redis_client import get_redis
 
 from .settings import settings
 
 if TYPE_CHECKING:
+    from redis.typing import EncodableT, FieldT
+
     from spellbot import SpellBot
 
 logger = logging.getLogger(__name__)
@@ -22,6 +26,25 @@ logger = logging.getLogger(__name__)
 SHARD_STATUS_PREFIX = "shard_status:"
 # TTL for shard status keys (2 minutes - if not updated, considered stale)
 SHARD_STATUS_TTL = 120
+# Metadata about the whole bot (newest version, shard count, total guilds)
+SHARD_STATUS_METADATA_KEY = f"{SHARD_STATUS_PREFIX}metadata"
+# Sorted set of bot versions currently publishing, scored by last publish time
+SHARD_STATUS_VERSIONS_KEY = f"{SHARD_STATUS_PREFIX}versions"
+
+
+def shard_status_key(version: str) -> str:
+    """
+    Return the Redis hash holding every shard status for the given bot version.
+
+    Each field is a shard id and each value is that shard's JSON status. The
+    version is part of the key so multiple versions can coexist during rolling
+    deployments.
+    """
+    return f"{SHARD_STATUS_PREFIX}{version}"
+
+
+def as_str(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
 
 
 @dataclass
@@ -51,8 +74,27 @@ class ShardStatus:
         )
 
 
+def is_stale(status: ShardStatus, now: datetime) -> bool:
+    """
+    Check if a shard status has not been refreshed within the TTL.
+
+    Redis can only expire a whole hash, so while any process on a version keeps
+    publishing, fields written by a shard that has since gone away linger.
+    """
+    try:
+        last_updated = datetime.fromisoformat(status.last_updated)
+    except ValueError:
+        return True
+    return now - last_updated > timedelta(seconds=SHARD_STATUS_TTL)
+
+
 async def update_shard_status(bot: SpellBot) -> None:
-    """Update shard status information in Redis."""
+    """
+    Update shard status information in Redis.
+
+    Guild counts for every shard are computed in a single pass over the guild
+    cache and all of the writes are sent in one pipelined round trip.
+    """
     if not settings.REDIS_URL:
         logger.debug("REDIS_URL not configured, skipping shard status update")
         return
@@ -70,6 +112,9 @@ async def update_shard_status(bot: SpellBot) -> None:
             bot.ready_shards,
         )
 
+        now = datetime.now(tz=UTC)
+        guild_counts = Counter(g.shard_id for g in bot.guilds)
+        shard_statuses: dict[FieldT, EncodableT] = {}
         for shard_id in shard_ids:
             # Get shard info
             shard_info = bot.get_shard(shard_id)
@@ -79,9 +124,6 @@ async def update_shard_status(bot: SpellBot) -> None:
             if shard_info is not None and shard_info.latency is not None:
                 latency_ms = round(shard_info.latency * 1000, 2)
 
-            # Count guilds for this shard
-            guild_count = sum(1 for g in bot.guilds if g.shard_id == shard_id)
-
             # Check if shard is connected and operational
             # Use is_closed() as primary indicator - this checks if the websocket is connected
             # Also consider ready_shards for initial ready state tracking
@@ -94,22 +136,18 @@ async def update_shard_status(bot: SpellBot) -> None:
             status = ShardStatus(
                 shard_id=shard_id,
                 latency_ms=latency_ms,
-                guild_count=guild_count,
+                guild_count=guild_counts.get(shard_id, 0),
                 is_ready=is_ready,
-                last_updated=datetime.now(tz=UTC).isoformat(),
+                last_updated=now.isoformat(),
                 version=__version__,
             )
-
-            # Include version in key so multiple versions can coexist during rolling deployments
-            key = f"{SHARD_STATUS_PREFIX}{shard_id}:{__version__}"
-            await redis.set(key, json.dumps(status.to_dict()), ex=SHARD_STATUS_TTL)
+            shard_statuses[str(shard_id)] = json.dumps(status.to_dict())
 
         # Also store metadata about total shards
         # Only update version if current version is greater than stored version
         # This prevents version flip-flopping during rolling deployments
         current_version = parse_version(__version__)
-        metadata_key = f"{SHARD_STATUS_PREFIX}metadata"
-        existing_metadata_raw = await redis.get(metadata_key)
+        existing_metadata_raw = await redis.get(SHARD_STATUS_METADATA_KEY)
         existing_version_str = None
         if existing_metadata_raw:
             existing_metadata = json.loads(existing_metadata_raw)
@@ -131,9 +169,21 @@ async def update_shard_status(bot: SpellBot) -> None:
             "version": version_to_write,
             "shard_count": shard_count,
             "total_guilds": len(bot.guilds),
-            "last_updated": datetime.now(tz=UTC).isoformat(),
+            "last_updated": now.isoformat(),
+            # Database pool statistics for this bot process, shown on the status page
+            "pools": pool_snapshots(),
         }
-        await redis.set(metadata_key, json.dumps(metadata), ex=SHARD_STATUS_TTL)
+
+        timestamp = now.timestamp()
+        key = shard_status_key(__version__)
+        pipe = redis.pipeline(transaction=False)
+        pipe.hset(key, mapping=shard_statuses)
+        pipe.expire(key, SHARD_STATUS_TTL)
+        pipe.zadd(SHARD_STATUS_VERSIONS_KEY, {__version__: timestamp})
+        pipe.zremrangebyscore(SHARD_STATUS_VERSIONS_KEY, "-inf", timestamp - SHARD_STATUS_TTL)
+        pipe.expire(SHARD_STATUS_VERSIONS_KEY, SHARD_STATUS_TTL)
+        pipe.set(SHARD_STATUS_METADATA_KEY, json.dumps(metadata), ex=SHARD_STATUS_TTL)
+        await pipe.execute()
 
         logger.debug("Updated shard status for %d shards", shard_count)
 
@@ -145,6 +195,10 @@ async def get_all_shard_statuses() -> tuple[list[ShardStatus], dict[str, object]
     """
     Retrieve all shard statuses from Redis.
 
+    Costs two pipelined round trips no matter how many shards there are: one for
+    the metadata and the set of live versions, and one `HGETALL` per live version
+    (usually one, two during a rolling deployment).
+
     Returns a tuple of (list of ShardStatus, metadata dict or None).
     """
     if not settings.REDIS_URL:
@@ -152,19 +206,29 @@ async def get_all_shard_statuses() -> tuple[list[ShardStatus], dict[str, object]
 
     try:
         redis = await get_redis()
-
-        # Get metadata first
-        metadata_raw = await redis.get(f"{SHARD_STATUS_PREFIX}metadata")
+        now = datetime.now(tz=UTC)
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.get(SHARD_STATUS_METADATA_KEY)
+        pipe.zrangebyscore(
+            SHARD_STATUS_VERSIONS_KEY,
+            now.timestamp() - SHARD_STATUS_TTL,
+            "+inf",
+        )
+        metadata_raw, versions = await pipe.execute()
         metadata = json.loads(metadata_raw) if metadata_raw else None
 
-        # Get all shard status keys (pattern: shard_status:{shard_id}:{version})
-        keys = [key async for key in redis.scan_iter(match=f"{SHARD_STATUS_PREFIX}[0-9]*:*")]
+        pipe = redis.pipeline(transaction=False)
+        for version in versions:
+            pipe.hgetall(shard_status_key(as_str(version)))
+        hashes = await pipe.execute() if versions else []
 
         statuses: list[ShardStatus] = []
-        for key in keys:
-            data = await redis.get(key)
-            if data:
-                statuses.append(ShardStatus.from_dict(json.loads(data)))
+        for shard_hash in hashes:
+            for data in shard_hash.values():
+                status = ShardStatus.from_dict(json.loads(data))
+                if not is_stale(status, now):
+                    statuses.append(status)
 
         # Sort by shard_id, then by version (newest first)
         statuses.sort(
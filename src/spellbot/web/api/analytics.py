@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final
 
 import aiohttp_jinja2
 import httpx
@@ -11,12 +12,14 @@ from ddtrace.trace import tracer
 from sqlalchemy import delete, select
 
 from spellbot import services
-from spellbot.database import DatabaseSession, db_session_manager
+from spellbot.database import DatabaseSession, db_session_manager, read_only_session_manager
 from spellbot.metrics import add_span_request_id, generate_request_id
 from spellbot.models import Guild, GuildMember
 from spellbot.settings import settings
 from spellbot.utils import generate_signed_url, validate_signature
 from spellbot.web.api.record import login_url, request_is_moderator, viewer_access
+from spellbot.web.json_encoding import dumps, json_body_response
+from spellbot.web.response_cache import RESPONSE_CACHE_TTL_S, cached_response, response_cache_key
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
@@ -72,11 +75,51 @@ async def validate_analytics_request(
     return guild_xid, None
 
 
+async def panel_data(
+    guild_xid: int,
+    all_time: bool,
+    panel: str | None,
+    fetch_fn: Callable[[int, bool], Awaitable[dict[str, Any]]],
+) -> dict[str, Any]:
+    """Return a panel's data from the guild's analytics snapshot, or fetch it live."""
+    if panel and (data := await services.snapshots.panel(guild_xid, panel, all_time=all_time)):
+        return data
+    return await fetch_fn(guild_xid, all_time)
+
+
+async def panel_json(
+    guild_xid: int,
+    all_time: bool,
+    panel: str | None,
+    fetch_fn: Callable[[int, bool], Awaitable[dict[str, Any]]],
+) -> str:
+    """Return a panel's data as JSON, cached per guild and period when the panel is named."""
+
+    async def compute() -> str:
+        async with read_only_session_manager():
+            return dumps(await panel_data(guild_xid, all_time, panel, fetch_fn)).decode()
+
+    if panel is None:
+        return await compute()
+    period = services.snapshots.snapshot_period(all_time)
+    key = response_cache_key("analytics", panel, period, guild_xid)
+    # Panels are charted by day; all-time ones barely move with each new game.
+    ttl = RESPONSE_CACHE_TTL_S["week" if all_time else "day"]
+    return await cached_response(key, ttl, compute)
+
+
 async def analytics_json_endpoint(
     request: web.Request,
     fetch_fn: Callable[[int, bool], Awaitable[dict[str, Any]]],
+    panel: str | None = None,
 ) -> web.Response:
-    """Return analytics JSON data using the provided fetch function."""
+    """
+    Return analytics JSON data for one panel.
+
+    The data comes from the guild's precomputed snapshot when there is one, and
+    otherwise from the provided fetch function. Either way it is briefly cached, so
+    moderators opening the page together share one lookup.
+    """
     guild_xid, error = await validate_analytics_request(request)
     if error:
         return error
@@ -86,16 +129,11 @@ async def analytics_json_endpoint(
     period = request.query.get("period", "30d")
     all_time = period == "all"
 
-    async with db_session_manager():
+    async with read_only_session_manager():
         if not await services.plays.guild_exists(guild_xid):
             return web.Response(status=404, text="Guild not found.")
-        data = await fetch_fn(guild_xid, all_time)
 
-    return web.Response(
-        status=200,
-        content_type="application/json",
-        text=json.dumps(data),
-    )
+    return json_body_response(await panel_json(guild_xid, all_time, panel, fetch_fn))
 
 
 @routes.get(r"/g/{guild}/analytics")
@@ -125,6 +163,8 @@ async def analytics_endpoint(request: web.Request) -> web.StreamResponse:
 
     async with db_session_manager():
         guild_name = await get_guild_name()
+        if guild_name is not None:
+            await services.snapshots.mark_viewed(guild_xid)
 
     if guild_name is None:
         return web.Response(status=404, text="Guild not found.")
@@ -172,6 +212,7 @@ async def analytics_summary_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_summary(g, all_time=a),
+        "summary",
     )
 
 
@@ -183,6 +224,7 @@ async def analytics_activity_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_activity(g, all_time=a),
+        "activity",
     )
 
 
@@ -194,6 +236,7 @@ async def analytics_wait_time_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_wait_time(g, all_time=a),
+        "wait-time",
     )
 
 
@@ -205,6 +248,7 @@ async def analytics_brackets_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_brackets(g, all_time=a),
+        "brackets",
     )
 
 
@@ -216,6 +260,7 @@ async def analytics_retention_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_retention(g, all_time=a),
+        "retention",
     )
 
 
@@ -227,6 +272,7 @@ async def analytics_growth_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_growth(g, all_time=a),
+        "growth",
     )
 
 
@@ -238,6 +284,7 @@ async def analytics_histogram_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_histogram(g, all_time=a),
+        "histogram",
     )
 
 
@@ -249,6 +296,7 @@ async def analytics_formats_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_formats(g, all_time=a),
+        "formats",
     )
 
 
@@ -260,6 +308,7 @@ async def analytics_languages_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_languages(g, all_time=a),
+        "languages",
     )
 
 
@@ -271,6 +320,7 @@ async def analytics_channels_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_channels(g, all_time=a),
+        "channels",
     )
 
 
@@ -282,6 +332,7 @@ async def analytics_channel_players_endpoint(request: web.Request) -> web.Respon
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_channel_players(g, all_time=a),
+        "channel-players",
     )
 
 
@@ -293,6 +344,7 @@ async def analytics_services_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_services(g, all_time=a),
+        "services",
     )
 
 
@@ -304,6 +356,7 @@ async def analytics_hour_of_day_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_hour_of_day(g, all_time=a),
+        "hour-of-day",
     )
 
 
@@ -315,6 +368,7 @@ async def analytics_day_of_week_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_day_of_week(g, all_time=a),
+        "day-of-week",
     )
 
 
@@ -326,6 +380,7 @@ async def analytics_rules_endpoint(request: web.Request) -> web.Response:
     return await analytics_json_endpoint(
         request,
         lambda g, a: services.plays.analytics_rules(g, all_time=a),
+        "rules",
     )
 
 
@@ -400,6 +455,23 @@ async def check_membership_and_update(
     return results
 
 
+# Panels listing players, by the key of their list: before they are sent, players
+# who have left the guild are marked as such and their stale membership forgotten.
+MEMBERSHIP_CHECKED_PANELS: Final = {"players": "top_players", "blocked": "top_blocked"}
+
+
+async def with_membership_checked(guild_xid: int, panel: str, text: str) -> str:
+    """Return a panel's JSON with membership status added to the players it lists."""
+    if (key := MEMBERSHIP_CHECKED_PANELS.get(panel)) is None:
+        return text
+    data = json.loads(text)
+    if data.get(key):
+        # Stale members are deleted on the primary.
+        async with db_session_manager():
+            data[key] = await check_membership_and_update(guild_xid, data[key])
+    return dumps(data).decode()
+
+
 @routes.get(r"/g/{guild}/analytics/players")
 @tracer.wrap(name="web", resource="analytics_players")
 async def analytics_players_endpoint(request: web.Request) -> web.Response:
@@ -414,23 +486,16 @@ async def analytics_players_endpoint(request: web.Request) -> web.Response:
     period = request.query.get("period", "30d")
     all_time = period == "all"
 
-    async with db_session_manager():
+    async with read_only_session_manager():
         if not await services.plays.guild_exists(guild_xid):
             return web.Response(status=404, text="Guild not found.")
-        data = await services.plays.analytics_players(guild_xid, all_time=all_time)
-
-        # Check membership status for each player
-        if data.get("top_players"):
-            data["top_players"] = await check_membership_and_update(
-                guild_xid,
-                data["top_players"],
-            )
-
-    return web.Response(
-        status=200,
-        content_type="application/json",
-        text=json.dumps(data),
+    text = await panel_json(
+        guild_xid,
+        all_time,
+        "players",
+        lambda g, a: services.plays.analytics_players(g, all_time=a),
     )
+    return json_body_response(await with_membership_checked(guild_xid, "players", text))
 
 
 @routes.get(r"/g/{guild}/analytics/blocked")
@@ -447,20 +512,94 @@ async def analytics_blocked_endpoint(request: web.Request) -> web.Response:
     period = request.query.get("period", "30d")
     all_time = period == "all"
 
-    async with db_session_manager():
+    async with read_only_session_manager():
         if not await services.plays.guild_exists(guild_xid):
             return web.Response(status=404, text="Guild not found.")
-        data = await services.plays.analytics_blocked(guild_xid, all_time=all_time)
+    text = await panel_json(
+        guild_xid,
+        all_time,
+        "blocked",
+        lambda g, a: services.plays.analytics_blocked(g, all_time=a),
+    )
+    return json_body_response(await with_membership_checked(guild_xid, "blocked", text))
 
-        # Check membership status for each blocked user
-        if data.get("top_blocked"):
-            data["top_blocked"] = await check_membership_and_update(
-                guild_xid,
-                data["top_blocked"],
-            )
 
-    return web.Response(
+def requested_panels(value: str | None) -> list[str] | None:
+    """
+    Parse the batch endpoint's `panels` parameter, a comma separated list of panels.
+
+    Returns every panel when it is missing or empty, and None if it names an unknown one.
+    """
+    if not value:
+        return list(services.snapshots.SNAPSHOT_PANELS)
+    panels = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    if any(name not in services.snapshots.SNAPSHOT_PANELS for name in panels):
+        return None
+    return panels
+
+
+async def batch_panel_line(guild_xid: int, all_time: bool, panel: str) -> bytes:
+    """Return one line of a batch response: a panel's data, or that it failed."""
+    fetch = services.snapshots.SNAPSHOT_PANELS[panel]
+    try:
+        text = await panel_json(guild_xid, all_time, panel, lambda g, a: fetch(g, all_time=a))
+        text = await with_membership_checked(guild_xid, panel, text)
+    except Exception:
+        logger.exception("error: analytics batch panel %s failed for %s", panel, guild_xid)
+        return json.dumps({"panel": panel, "error": "Failed to load"}).encode() + b"\n"
+    # The panel's JSON is spliced in as is rather than parsed just to be dumped again.
+    return f'{{"panel": {json.dumps(panel)}, "data": {text}}}\n'.encode()
+
+
+@routes.get(r"/g/{guild}/analytics/batch")
+@tracer.wrap(name="web", resource="analytics_batch")
+async def analytics_batch_endpoint(request: web.Request) -> web.StreamResponse:
+    """
+    Stream several analytics panels' data as newline delimited JSON.
+
+    Access and the guild are checked once for the whole batch. Up to
+    `ANALYTICS_BATCH_CONCURRENCY` panels are then computed at once, each on its own
+    session, and every panel is sent as soon as it is ready, in whatever order they
+    finish, as a line of `{"panel": name, "data": {...}}` (or `"error"` instead).
+    """
+    add_span_request_id(generate_request_id())
+
+    guild_xid, error = await validate_analytics_request(request)
+    if error:
+        return error
+    assert guild_xid is not None
+
+    panels = requested_panels(request.query.get("panels"))
+    if panels is None:
+        return web.Response(status=400, text="Unknown analytics panel.")
+    all_time = request.query.get("period", "30d") == "all"
+
+    async with read_only_session_manager():
+        if not await services.plays.guild_exists(guild_xid):
+            return web.Response(status=404, text="Guild not found.")
+
+    response = web.StreamResponse(
         status=200,
-        content_type="application/json",
-        text=json.dumps(data),
+        headers={"Content-Type": "application/x-ndjson; charset=utf-8"},
     )
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+
+    limit = asyncio.Semaphore(settings.ANALYTICS_BATCH_CONCURRENCY)
+
+    async def run(panel: str) -> bytes:
+        async with limit:
+            return await batch_panel_line(guild_xid, all_time, panel)
+
+    tasks = [asyncio.create_task(run(panel)) for panel in panels]
+    try:
+        for done in asyncio.as_completed(tasks):
+            await response.write(await done)
+        await response.write_eof()
+    except ConnectionResetError, ConnectionError:
+        logger.info("client disconnected during analytics batch for %s", guild_xid)
+    finally:
+        # Panels still running when the client goes away are no longer wanted.
+        for task in tasks:
+            task.cancel()
+    return response
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 from typing import TYPE_CHECKING, Any
 
 import aiohttp_jinja2
@@ -9,10 +8,17 @@ from aiohttp_session import get_session
 from ddtrace.trace import tracer
 
 from spellbot import services
-from spellbot.database import db_session_manager
+from spellbot.database import read_only_session_manager
 from spellbot.metrics import add_span_request_id, generate_request_id
 from spellbot.web.api.admin_auth import is_owner_session
 from spellbot.web.dashboard_filters import GuildFilter, PeriodSpec, parse_guild, parse_period
+from spellbot.web.json_encoding import dumps, json_body_response, json_response
+from spellbot.web.response_cache import (
+    LIVE_RESPONSE_CACHE_TTL_S,
+    RESPONSE_CACHE_TTL_S,
+    cached_response,
+    response_cache_key,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
@@ -47,14 +53,9 @@ async def dashboard_sql_endpoint(request: web.Request) -> web.Response:
     if not isinstance(query, str):
         return web.json_response({"error": "Missing 'query' string."}, status=400)
     # `dashboard_run_sql` opens its own dedicated read-only connection, so no
-    # surrounding `db_session_manager()` is needed here.
+    # surrounding `read_only_session_manager()` is needed here.
     data = await services.dashboard.dashboard_run_sql(query)
-    status = 400 if "error" in data else 200
-    return web.Response(
-        status=status,
-        content_type="application/json",
-        text=json.dumps(data),
-    )
+    return json_response(data, status=400 if "error" in data else 200)
 
 
 def dashboard_query(request: web.Request) -> tuple[PeriodSpec, GuildFilter]:
@@ -65,15 +66,27 @@ def dashboard_query(request: web.Request) -> tuple[PeriodSpec, GuildFilter]:
 async def dashboard_json_endpoint(
     request: web.Request,
     fetch_fn: Callable[[PeriodSpec, GuildFilter], Awaitable[dict[str, Any]]],
+    *,
+    ttl: int | None = None,
 ) -> web.Response:
-    """Run `fetch_fn` inside a DB session and return its result as JSON."""
+    """
+    Run `fetch_fn` inside a read-only DB session and return its result as JSON.
+
+    Results are cached per endpoint, period and guild filter, so admins opening the
+    dashboard together share them: for `ttl` seconds if given, otherwise for longer
+    the coarser the period's buckets are.
+    """
     period, opts = dashboard_query(request)
-    async with db_session_manager():
-        data = await fetch_fn(period, opts)
-    return web.Response(
-        status=200,
-        content_type="application/json",
-        text=json.dumps(data),
+    if ttl is None:
+        ttl = RESPONSE_CACHE_TTL_S[period.bucket]
+
+    async def compute() -> str:
+        async with read_only_session_manager():
+            return dumps(await fetch_fn(period, opts)).decode()
+
+    key = response_cache_key("dashboard", request.path, period.period, opts.mode, opts.xid)
+    return json_body_response(
+        await cached_response(key, ttl, compute),
     )
 
 
@@ -312,7 +325,11 @@ async def dashboard_mythic_verification_endpoint(request: web.Request) -> web.Re
 async def dashboard_queue_depth_endpoint(request: web.Request) -> web.Response:
     """Return the current number of users waiting in pending games, by format."""
     add_span_request_id(generate_request_id())
-    return await dashboard_json_endpoint(request, services.dashboard.dashboard_queue_depth)
+    return await dashboard_json_endpoint(
+        request,
+        services.dashboard.dashboard_queue_depth,
+        ttl=LIVE_RESPONSE_CACHE_TTL_S,
+    )
 
 
 @routes.get("/admin/dashboard/active-queues")
@@ -320,7 +337,11 @@ async def dashboard_queue_depth_endpoint(request: web.Request) -> web.Response:
 async def dashboard_active_queues_endpoint(request: web.Request) -> web.Response:
     """Return one row per pending game with at least one player queued."""
     add_span_request_id(generate_request_id())
-    return await dashboard_json_endpoint(request, services.dashboard.dashboard_active_queues)
+    return await dashboard_json_endpoint(
+        request,
+        services.dashboard.dashboard_active_queues,
+        ttl=LIVE_RESPONSE_CACHE_TTL_S,
+    )
 
 
 @routes.get("/admin/dashboard/guilds")
@@ -329,10 +350,6 @@ async def dashboard_guilds_endpoint(request: web.Request) -> web.Response:
     """Return all known guilds for the dashboard's filter dropdown."""
     add_span_request_id(generate_request_id())
     del request
-    async with db_session_manager():
+    async with read_only_session_manager():
         data = await services.dashboard.dashboard_guilds()
-    return web.Response(
-        status=200,
-        content_type="application/json",
-        text=json.dumps({"guilds": data}),
-    )
+    return json_response({"guilds": data})
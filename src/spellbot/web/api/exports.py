@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Final, Protocol
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+    from aiohttp import web
+
+# Text exports are sent in blocks of roughly this many bytes rather than one write per row.
+EXPORT_CHUNK_SIZE: Final = 64 * 1024
+
+# Rows per Parquet row group. Only one group's rows are held in memory at a time.
+PARQUET_ROW_GROUP_SIZE: Final = 10_000
+
+
+class ExportFormat(Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+EXPORT_CONTENT_TYPES: Final = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson; charset=utf-8",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+
+class ExportWriter(Protocol):
+    rows: int
+
+    async def writerow(self, row: Any) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class ChunkedTextWriter(ABC):
+    """
+    Write a text export to a streaming response in large blocks.
+
+    Rows are serialized into one reused buffer that is only written out (and
+    gzipped) once it holds `EXPORT_CHUNK_SIZE` characters. Each flush yields to
+    the event loop, so even an export whose rows are all already fetched can't
+    hold up other requests for long.
+    """
+
+    def __init__(self, response: web.StreamResponse) -> None:
+        self.response = response
+        self.buffer = io.StringIO()
+        self.rows = 0
+
+    @abstractmethod
+    def serialize(self, row: Any) -> None: ...
+
+    async def writerow(self, row: Any) -> None:
+        self.serialize(row)
+        self.rows += 1
+        if self.buffer.tell() >= EXPORT_CHUNK_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        if data:
+            await self.response.write(data.encode("utf-8"))
+        await asyncio.sleep(0)
+
+    async def close(self) -> None:
+        await self.flush()
+
+
+class ChunkedCsvWriter(ChunkedTextWriter):
+    """Write CSV rows (lists of values) through one reused `csv.writer`."""
+
+    def __init__(self, response: web.StreamResponse, header: list[str]) -> None:
+        super().__init__(response)
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(header)
+
+    def serialize(self, row: list[Any]) -> None:
+        self.writer.writerow(row)
+
+
+def json_default(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+class ChunkedNdjsonWriter(ChunkedTextWriter):
+    """Write one JSON object per line, for exports that keep nested data structured."""
+
+    def serialize(self, row: dict[str, Any]) -> None:
+        self.buffer.write(json.dumps(row, default=json_default, separators=(",", ":")))
+        self.buffer.write("\n")
+
+
+class ExportSink(io.RawIOBase):
+    """A write-only file that holds what was written until it is taken for sending."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Buffer) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ParquetExportWriter:
+    """
+    Write a Parquet export incrementally, one row group at a time.
+
+    Rows are collected until there are `PARQUET_ROW_GROUP_SIZE` of them, then
+    written as a row group and sent, so memory stays bounded however long the
+    export is. Closing the writer sends the file footer.
+    """
+
+    def __init__(
+        self,
+        response: web.StreamResponse,
+        schema: pa.Schema,
+    ) -> None:
+        self.response = response
+        self.schema = schema
+        self.sink = ExportSink()
+        self.writer = pq.ParquetWriter(
+            pa.PythonFile(self.sink, mode="w"),
+            schema,
+            compression="zstd",
+        )
+        self.batch: list[dict[str, Any]] = []
+        self.rows = 0
+
+    async def writerow(self, row: dict[str, Any]) -> None:
+        self.batch.append(row)
+        self.rows += 1
+        if len(self.batch) >= PARQUET_ROW_GROUP_SIZE:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self.batch:
+            table = pa.Table.from_pylist(self.batch, schema=self.schema)
+            self.writer.write_table(table, row_group_size=len(self.batch))
+            self.batch.clear()
+        await self.send()
+
+    async def send(self) -> None:
+        if data := self.sink.take():
+            await self.response.write(data)
+        await asyncio.sleep(0)
+
+    async def close(self) -> None:
+        await self.flush()
+        self.writer.close()
+        await self.send()
@@ -1,42 +1,41 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime, timedelta
-from typing import TYPE_CHECKING, Any
+import json
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Final
 
 import aiohttp_jinja2
 from aiohttp import web
-from babel import Locale, UnknownLocaleError
 from ddtrace.trace import tracer
 
 from spellbot import services
 from spellbot.database import db_session_manager
 from spellbot.enums import GAME_BRACKET_ORDER, GAME_FORMAT_ORDER
-from spellbot.i18n import normalize_locale
+from spellbot.i18n import language_name
 from spellbot.metrics import add_span_request_id, generate_request_id
 from spellbot.settings import settings
 from spellbot.web.api.viewer_auth import get_viewer
+from spellbot.web.icon_refresher import icon_refresher
+from spellbot.web.queue_stream import queue_event_hub
+from spellbot.web.response_cache import cached_response, etag_response, response_cache_key
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
 SPELLBOT_DEFAULT_LOGO = "https://spellbot.io/assets/img/avatar-icon.png"
-ICON_FETCH_TTL = timedelta(hours=6)
 STARTED_GAMES_WINDOW = timedelta(hours=2)
 PLAYED_GUILDS_WINDOW = timedelta(days=365)
 
-_icon_fetch_attempts: dict[int, datetime] = {}
-
-routes = web.RouteTableDef()
+# How long the queues and games shown to every visitor of /queues are reused for.
+QUEUES_SNAPSHOT_TTL_S: Final = 5
 
+# Browsers reconnect to /queues/stream this long after losing it, and an idle stream
+# is sent a comment this often so proxies don't close it.
+QUEUES_STREAM_RETRY_MS: Final = 5000
+QUEUES_STREAM_KEEPALIVE_S: Final = 15.0
 
-def language_name(locale: str | None) -> str:
-    """Return an English display name for `locale` (e.g., `ja` -> `Japanese`)."""
-    code = normalize_locale(locale or "en")
-    try:
-        return Locale.parse(code).get_display_name("en") or code
-    except UnknownLocaleError, ValueError:
-        return code
+routes = web.RouteTableDef()
 
 
 def format_wait(seconds: int) -> str:
@@ -52,27 +51,42 @@ def format_wait(seconds: int) -> str:
     return f"{hours}h {minutes}m"
 
 
-async def _resolve_icons(rows: list[dict[str, Any]]) -> dict[int, str | None]:
-    """Return a `{guild_xid: icon_url}` map, backfilling missing entries from Discord."""
-    now = datetime.now(UTC)
-    candidates = {row["guild_xid"] for row in rows if not row.get("guild_icon")}
-    missing = [
-        xid
-        for xid in candidates
-        if (last := _icon_fetch_attempts.get(xid)) is None or now - last >= ICON_FETCH_TTL
-    ]
-    if not missing:
-        return {}
-    fetched = await asyncio.gather(
-        *(services.guilds.fetch_icon_url(xid) for xid in missing),
-    )
-    results: dict[int, str | None] = {}
-    for xid, icon in zip(missing, fetched, strict=True):
-        _icon_fetch_attempts[xid] = now
-        if icon is not None:
-            await services.guilds.set_icon(xid, icon)
-        results[xid] = icon
-    return results
+def with_logos(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Add each row's guild logo: its cached icon, or the default while it has none.
+
+    Guilds without an icon are handed to the icon refresher, which fetches them from
+    Discord in the background rather than holding up the page.
+    """
+    icon_refresher.request(row["guild_xid"] for row in rows if not row.get("guild_icon"))
+    return [{**row, "logo": row.get("guild_icon") or SPELLBOT_DEFAULT_LOGO} for row in rows]
+
+
+async def active_snapshot(*, only_mythic_track: bool = False) -> dict[str, Any]:
+    """
+    Return the pending queues and recently started games every visitor sees.
+
+    The queries behind them run at most once per
+    `QUEUES_SNAPSHOT_TTL_S` seconds, shared by every request in that time (see
+    `response_cache.cached_response`); each request only adds what depends on
+    its viewer.
+    """
+
+    async def compute() -> str:
+        async with db_session_manager():
+            raw_rows = await services.queues.public_active_queues(
+                only_mythic_track=only_mythic_track,
+            )
+            raw_games = await services.queues.public_active_games(
+                STARTED_GAMES_WINDOW,
+                only_mythic_track=only_mythic_track,
+            )
+        return json.dumps(
+            {"queues": with_logos(raw_rows), "games": with_logos(raw_games)},
+        )
+
+    key = response_cache_key("queues", only_mythic_track)
+    return json.loads(await cached_response(key, QUEUES_SNAPSHOT_TTL_S, compute))
 
 
 @routes.get("/queues")
@@ -82,56 +96,31 @@ async def queues_endpoint(request: web.Request) -> web.Response:
     add_span_request_id(generate_request_id())
     viewer_xid, viewer_name = await get_viewer(request)
     my_filter_on = request.query.get("my") == "1" and viewer_xid is not None
-    member_of = viewer_xid if my_filter_on else None
-    async with db_session_manager():
-        raw_rows = await services.queues.public_active_queues(only_member_of=member_of)
-        raw_games = await services.queues.public_active_games(
-            STARTED_GAMES_WINDOW,
-            only_member_of=member_of,
-        )
-        raw_played_guilds = (
-            await services.queues.viewer_played_guilds(
+    snapshot = await active_snapshot()
+    raw_rows = snapshot["queues"]
+    raw_games = snapshot["games"]
+    raw_played_guilds: list[dict[str, Any]] = []
+    alert_guild_xids: set[int] = set()
+    member_of: set[int] = set()
+    if viewer_xid is not None:
+        async with db_session_manager():
+            if my_filter_on:
+                member_of = await services.queues.member_guild_xids(viewer_xid)
+                raw_rows = [row for row in raw_rows if row["guild_xid"] in member_of]
+                raw_games = [game for game in raw_games if game["guild_xid"] in member_of]
+            raw_played_guilds = await services.queues.viewer_played_guilds(
                 viewer_xid,
                 played_within=PLAYED_GUILDS_WINDOW,
             )
-            if viewer_xid is not None
-            else []
-        )
-        alert_guild_xids = (
-            await services.alerts.get_guild_xids_for_user(viewer_xid)
-            if viewer_xid is not None
-            else set()
-        )
-        backfilled = await _resolve_icons(raw_rows + raw_games + raw_played_guilds)
-    rows = [
-        {
-            **row,
-            "logo": row.get("guild_icon")
-            or backfilled.get(row["guild_xid"])
-            or SPELLBOT_DEFAULT_LOGO,
-            "language": language_name(row["guild_locale"]),
-        }
-        for row in raw_rows
-    ]
-    games = [
-        {
-            **game,
-            "logo": game.get("guild_icon")
-            or backfilled.get(game["guild_xid"])
-            or SPELLBOT_DEFAULT_LOGO,
-            "language": language_name(game["guild_locale"]),
-        }
-        for game in raw_games
-    ]
+            alert_guild_xids = await services.alerts.get_guild_xids_for_user(viewer_xid)
+    rows = [{**row, "language": language_name(row["guild_locale"])} for row in raw_rows]
+    games = [{**game, "language": language_name(game["guild_locale"])} for game in raw_games]
     played_guilds = [
         {
             **pg,
-            "logo": pg.get("guild_icon")
-            or backfilled.get(pg["guild_xid"])
-            or SPELLBOT_DEFAULT_LOGO,
             "notifications_on": pg["guild_xid"] in alert_guild_xids,
         }
-        for pg in raw_played_guilds
+        for pg in with_logos(raw_played_guilds)
     ]
     formats = sorted({r["format"] for r in rows} | {g["format"] for g in games})
     brackets = sorted({r["bracket"] for r in rows} | {g["bracket"] for g in games})
@@ -147,6 +136,8 @@ async def queues_endpoint(request: web.Request) -> web.Response:
         "logged_in": viewer_xid is not None,
         "login_enabled": login_enabled,
         "my_filter_on": my_filter_on,
+        # Lets the live updates skip new games the "my servers" filter would hide.
+        "member_guilds": sorted(member_of),
     }
     context = {
         "rows": rows,
@@ -159,7 +150,8 @@ async def queues_endpoint(request: web.Request) -> web.Response:
         "stats": stats,
         "viewer": viewer,
     }
-    return aiohttp_jinja2.render_template("queues.html.j2", request, context)
+    text = aiohttp_jinja2.render_string("queues.html.j2", request, context)
+    return etag_response(request, text, content_type="text/html")
 
 
 @routes.get("/queues.json")
@@ -168,23 +160,13 @@ async def queues_json_endpoint(request: web.Request) -> web.Response:
     """Return the public list of pending queues and recently-started games as JSON."""
     add_span_request_id(generate_request_id())
     only_mythic_track = request.query.get("mythic_track") == "1"
-    async with db_session_manager():
-        raw_rows = await services.queues.public_active_queues(
-            only_mythic_track=only_mythic_track,
-        )
-        raw_games = await services.queues.public_active_games(
-            STARTED_GAMES_WINDOW,
-            only_mythic_track=only_mythic_track,
-        )
-        backfilled = await _resolve_icons(raw_rows + raw_games)
+    snapshot = await active_snapshot(only_mythic_track=only_mythic_track)
     queues = [
         {
             "guild_xid": row["guild_xid"],
             "guild_name": row["guild_name"],
             "guild_locale": row["guild_locale"],
-            "logo": row.get("guild_icon")
-            or backfilled.get(row["guild_xid"])
-            or SPELLBOT_DEFAULT_LOGO,
+            "logo": row["logo"],
             "format": row["format"],
             "bracket": row["bracket"],
             "service": row["service"],
@@ -193,16 +175,14 @@ async def queues_json_endpoint(request: web.Request) -> web.Response:
             "wait_seconds": row["wait_seconds"],
             "jump_url": row["jump_url"],
         }
-        for row in raw_rows
+        for row in snapshot["queues"]
     ]
     games = [
         {
             "guild_xid": game["guild_xid"],
             "guild_name": game["guild_name"],
             "guild_locale": game["guild_locale"],
-            "logo": game.get("guild_icon")
-            or backfilled.get(game["guild_xid"])
-            or SPELLBOT_DEFAULT_LOGO,
+            "logo": game["logo"],
             "format": game["format"],
             "bracket": game["bracket"],
             "service": game["service"],
@@ -210,15 +190,53 @@ async def queues_json_endpoint(request: web.Request) -> web.Response:
             "started_seconds_ago": game["started_seconds_ago"],
             "jump_url": game["jump_url"],
         }
-        for game in raw_games
+        for game in snapshot["games"]
     ]
-    return web.json_response(
-        {
-            "stats": {"active_games": len(raw_rows) + len(raw_games)},
-            "queues": queues,
-            "games": games,
+    payload = {
+        "stats": {"active_games": len(queues) + len(games)},
+        "queues": queues,
+        "games": games,
+    }
+    return etag_response(request, json.dumps(payload), content_type="application/json")
+
+
+@routes.get("/queues/stream")
+@tracer.wrap(name="web", resource="queues_stream")
+async def queues_stream_endpoint(request: web.Request) -> web.StreamResponse:
+    """
+    Stream changes to the public queues as Server-Sent Events.
+
+    Each event's data is a JSON object with a `type` from
+    `services.queue_events.QueueEventType` and the game's id, guild, seats and
+    players, or just `{"type": "reload"}` when events may have been missed. Without
+    Redis there is nothing to stream: the 204 tells `EventSource` not to reconnect.
+    """
+    add_span_request_id(generate_request_id())
+    if not settings.REDIS_URL:
+        return web.Response(status=204)
+    response = web.StreamResponse(
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
         },
     )
+    await response.prepare(request)
+    stream = queue_event_hub.connect()
+    try:
+        await response.write(f"retry: {QUEUES_STREAM_RETRY_MS}\n\n".encode())
+        while True:
+            try:
+                message = await asyncio.wait_for(stream.get(), QUEUES_STREAM_KEEPALIVE_S)
+            except TimeoutError:
+                await response.write(b": keepalive\n\n")
+            else:
+                await response.write(f"data: {message}\n\n".encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        queue_event_hub.disconnect(stream)
+    return response
 
 
 def notify_format_choices() -> list[dict[str, Any]]:
@@ -255,7 +273,6 @@ async def guild_notify_endpoint(request: web.Request) -> web.Response:
         guild = await services.queues.guild_summary(guild_xid)
         if guild is None:
             return web.Response(status=404)
-        backfilled = await _resolve_icons([guild])
         # Fetch soft-deleted alerts too so the viewer's prior preferences can be
         # re-displayed (and restored on save) after they previously turned
         # notifications off for this guild.
@@ -269,13 +286,8 @@ async def guild_notify_endpoint(request: web.Request) -> web.Response:
             guild_xid,
             played_within=PLAYED_GUILDS_WINDOW,
         )
-    guild_view = {
-        **guild,
-        "logo": guild.get("guild_icon")
-        or backfilled.get(guild["guild_xid"])
-        or SPELLBOT_DEFAULT_LOGO,
-        "language": language_name(guild["guild_locale"]),
-    }
+    [guild_view] = with_logos([guild])
+    guild_view["language"] = language_name(guild["guild_locale"])
     channel_choices = [
         {"value": c["channel_xid"], "label": c["channel_name"] or str(c["channel_xid"])}
         for c in played_channels
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
-import csv
-import io
 import logging
-from contextlib import suppress
+import time
+from contextlib import aclosing, suppress
 from datetime import UTC, date, datetime, timedelta
 from enum import Enum, auto
-from typing import Any, NamedTuple
+from typing import TYPE_CHECKING, Any, NamedTuple
 from urllib.parse import quote, urlencode
 
 import aiohttp_jinja2
+import pyarrow as pa
 from aiohttp import web
 from ddtrace.trace import tracer
 
 from spellbot import audit, services
-from spellbot.database import db_session_manager
+from spellbot.database import db_session_manager, read_only_session_manager
 from spellbot.enums import (
     GAME_BRACKET_ORDER,
     GAME_FORMAT_ORDER,
@@ -25,20 +25,33 @@ from spellbot.enums import (
     VALID_FORMATS,
     VALID_SERVICES,
 )
-from spellbot.metrics import add_span_request_id, generate_request_id
+from spellbot.metrics import add_span_export_stats, add_span_request_id, generate_request_id
 from spellbot.models import Channel, Guild, GuildAward, web_editable_docs
 from spellbot.services.plays import (
     CHANNEL_PAGE_SIZE,
     CHANNEL_RECORDS_SORT_COLUMNS,
     USER_PAGE_SIZE,
     USER_RECORDS_SORT_COLUMNS,
+    RecordCursor,
     RecordFilters,
+    decode_cursor,
 )
 from spellbot.web.api.admin_auth import is_owner_request
+from spellbot.web.api.exports import (
+    EXPORT_CONTENT_TYPES,
+    ChunkedCsvWriter,
+    ChunkedNdjsonWriter,
+    ExportFormat,
+    ExportWriter,
+    ParquetExportWriter,
+)
 from spellbot.web.api.moderation import viewer_is_moderator
 from spellbot.web.api.oauth import safe_relative_path
 from spellbot.web.api.viewer_auth import get_viewer
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 logger = logging.getLogger(__name__)
 
 routes = web.RouteTableDef()
@@ -83,7 +96,7 @@ class RecordKind(Enum):
 class Opts(NamedTuple):
     guild_xid: int | None
     target_xid: int
-    page: int
+    cursor: RecordCursor | None
     tz_offset: int | None
     tz_name: str | None
     filters: RecordFilters
@@ -201,8 +214,6 @@ async def parse_opts(request: web.Request, kind: RecordKind) -> Opts:
         guild_xid = None
         target_xid = int(request.match_info["user"])
 
-    page = max(int(request.query.get("page", 0)), 0)
-
     tz_offset_cookie = request.cookies.get("timezone_offset")
     tz_offset: int | None = None
     if tz_offset_cookie:
@@ -211,11 +222,13 @@ async def parse_opts(request: web.Request, kind: RecordKind) -> Opts:
 
     tz_name = request.cookies.get("timezone_name")
     filters, raw_filters = parse_filters(request, kind, tz_offset)
+    token = request.query.get("cursor")
+    cursor = decode_cursor(token, filters) if token else None
 
     return Opts(
         guild_xid=guild_xid,
         target_xid=target_xid,
-        page=page,
+        cursor=cursor,
         tz_offset=tz_offset,
         tz_name=tz_name,
         filters=filters,
@@ -223,8 +236,8 @@ async def parse_opts(request: web.Request, kind: RecordKind) -> Opts:
     )
 
 
-def build_query_string(raw_filters: dict[str, Any], *, page: int | None) -> str:
-    """Build a query string preserving filters, optionally setting `page`."""
+def build_query_string(raw_filters: dict[str, Any], *, cursor: str | None) -> str:
+    """Build a query string preserving filters, optionally setting the page `cursor`."""
     parts: list[tuple[str, str]] = []
     for key in ("with_player", "guild", "from", "to"):
         value = raw_filters.get(key)
@@ -236,8 +249,8 @@ def build_query_string(raw_filters: dict[str, Any], *, page: int | None) -> str:
         parts.append(("sort", raw_filters["sort"]))
     if raw_filters.get("dir") and raw_filters["dir"] != DEFAULT_SORT_DIR:
         parts.append(("dir", raw_filters["dir"]))
-    if page is not None and page > 0:
-        parts.append(("page", str(page)))
+    if cursor:
+        parts.append(("cursor", cursor))
     return f"?{urlencode(parts)}" if parts else ""
 
 
@@ -426,24 +439,28 @@ async def impl(request: web.Request, kind: RecordKind) -> web.Response:
     except ValueError:
         return web.Response(status=404)
 
-    if kind is RecordKind.CHANNEL:
-        assert opts.guild_xid is not None
-        result = await services.plays.channel_records(
-            guild_xid=opts.guild_xid,
-            channel_xid=opts.target_xid,
-            page=opts.page,
-            opts=opts.filters,
-        )
-    else:
-        result = await services.plays.user_records(
-            user_xid=opts.target_xid,
-            page=opts.page,
-            opts=opts.filters,
-        )
+    # The paged history is the expensive part of this page, so it reads from the replica.
+    # Settings and blocklist reads below stay on the primary so a redirect back here after
+    # a POST always reflects the change that was just made.
+    async with read_only_session_manager():
+        if kind is RecordKind.CHANNEL:
+            assert opts.guild_xid is not None
+            result = await services.plays.channel_records(
+                guild_xid=opts.guild_xid,
+                channel_xid=opts.target_xid,
+                cursor=opts.cursor,
+                opts=opts.filters,
+            )
+        else:
+            result = await services.plays.user_records(
+                user_xid=opts.target_xid,
+                cursor=opts.cursor,
+                opts=opts.filters,
+            )
 
     if result is None:
         return web.Response(status=404)
-    records, total = result
+    records, total, prev_cursor, next_cursor = result
 
     viewer_xid, _ = await get_viewer(request)
     channel = None
@@ -469,10 +486,9 @@ async def impl(request: web.Request, kind: RecordKind) -> web.Response:
         if is_own_profile:
             blocked_users = await services.users.blocklist(opts.target_xid)
 
-    has_next = (opts.page + 1) * page_size < total
-    prev_qs = build_query_string(opts.raw_filters, page=max(opts.page - 1, 0))
-    next_qs = build_query_string(opts.raw_filters, page=opts.page + 1)
-    export_qs = build_query_string(opts.raw_filters, page=None)
+    prev_qs = build_query_string(opts.raw_filters, cursor=prev_cursor)
+    next_qs = build_query_string(opts.raw_filters, cursor=next_cursor)
+    export_qs = build_query_string(opts.raw_filters, cursor=None)
 
     path = f"{'channel' if kind is RecordKind.CHANNEL else 'user'}_record.html.j2"
     context = {
@@ -485,10 +501,9 @@ async def impl(request: web.Request, kind: RecordKind) -> web.Response:
         "viewer_xid": viewer_xid,
         "target_xid": opts.target_xid,
         "target_name": target_name,
-        "page": opts.page,
         "page_size": page_size,
-        "has_prev": opts.page > 0,
-        "has_next": has_next,
+        "has_prev": prev_cursor is not None,
+        "has_next": next_cursor is not None,
         "prev_page": f"{request.path}{prev_qs}",
         "next_page": f"{request.path}{next_qs}",
         "export_url": f"{request.path}/export.csv{export_qs}",
@@ -959,13 +974,6 @@ async def channel_forget_endpoint(request: web.Request) -> web.StreamResponse:
         return await channel_forget_impl(request)
 
 
-def csv_line(values: list[Any]) -> bytes:
-    """Serialize a single CSV row to UTF-8 bytes."""
-    buf = io.StringIO()
-    csv.writer(buf).writerow(values)
-    return buf.getvalue().encode("utf-8")
-
-
 def iso_utc(updated_at_ms: float) -> str:
     """Format a millis-since-epoch float as an ISO-8601 UTC timestamp."""
     return datetime.fromtimestamp(updated_at_ms / 1000, tz=UTC).isoformat()
@@ -1005,7 +1013,91 @@ def format_channel_export_row(record: dict[str, Any]) -> list[Any]:
     ]
 
 
-async def export_impl(request: web.Request, kind: RecordKind) -> web.StreamResponse:
+def export_time(updated_at_ms: float) -> datetime:
+    return datetime.fromtimestamp(updated_at_ms / 1000, tz=UTC)
+
+
+def user_export_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Build the per-game structured record for a user NDJSON or Parquet export."""
+    return {
+        "game": record["id"],
+        "time": export_time(record["updated_at"]),
+        "guild_xid": record["guild"],
+        "guild": record["guild_name"],
+        "channel_xid": record["channel"],
+        "channel": record["channel_name"],
+        "format": record["format"],
+        "seats": record["seats"],
+        "bracket": record["bracket"],
+        "locale": record["locale"],
+        "link": record["link"],
+        "players": [{"name": name, "xid": int(data[0])} for name, data in record["scores"].items()],
+    }
+
+
+def channel_export_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Build the per-player structured record for a channel NDJSON or Parquet export."""
+    return {
+        "game": record["id"],
+        "time": export_time(record["updated_at"]),
+        "guild_xid": record["guild"],
+        "guild": record["guild_name"],
+        "channel_xid": record["channel"],
+        "channel": record["channel_name"],
+        "format": record["format"],
+        "seats": record["seats"],
+        "bracket": record["bracket"],
+        "locale": record["locale"],
+        "link": record["link"],
+        "user_name": record["user_name"],
+        "user_xid": int(record["user_xid"]),
+    }
+
+
+def export_schema(kind: RecordKind) -> pa.Schema:
+    """Build the Parquet schema matching `user_export_record` / `channel_export_record`."""
+    fields = [
+        ("game", pa.int64()),
+        ("time", pa.timestamp("ms", tz="UTC")),
+        ("guild_xid", pa.int64()),
+        ("guild", pa.string()),
+        ("channel_xid", pa.int64()),
+        ("channel", pa.string()),
+        ("format", pa.string()),
+        ("seats", pa.int32()),
+        ("bracket", pa.string()),
+        ("locale", pa.string()),
+        ("link", pa.string()),
+    ]
+    if kind is RecordKind.CHANNEL:
+        fields += [("user_name", pa.string()), ("user_xid", pa.int64())]
+    else:
+        player = pa.struct([("name", pa.string()), ("xid", pa.int64())])
+        fields.append(("players", pa.list_(player)))
+    return pa.schema(fields)
+
+
+def export_writer(
+    response: web.StreamResponse,
+    kind: RecordKind,
+    fmt: ExportFormat,
+) -> tuple[ExportWriter, Callable[[dict[str, Any]], Any]]:
+    """Build the writer for `fmt` along with the function that shapes each record for it."""
+    if fmt is ExportFormat.CSV:
+        if kind is RecordKind.CHANNEL:
+            return ChunkedCsvWriter(response, CHANNEL_EXPORT_HEADER), format_channel_export_row
+        return ChunkedCsvWriter(response, USER_EXPORT_HEADER), format_user_export_row
+    to_record = channel_export_record if kind is RecordKind.CHANNEL else user_export_record
+    if fmt is ExportFormat.NDJSON:
+        return ChunkedNdjsonWriter(response), to_record
+    return ParquetExportWriter(response, export_schema(kind)), to_record
+
+
+async def export_impl(
+    request: web.Request,
+    kind: RecordKind,
+    fmt: ExportFormat,
+) -> web.StreamResponse:
     try:
         if kind is RecordKind.CHANNEL:
             guild_xid = int(request.match_info["guild"])
@@ -1018,54 +1110,70 @@ async def export_impl(request: web.Request, kind: RecordKind) -> web.StreamRespo
     if kind is RecordKind.CHANNEL:
         if not await services.plays.channel_export_target_exists(guild_xid, target_xid):
             return web.Response(status=404)
-        header = CHANNEL_EXPORT_HEADER
         stream = services.plays.stream_channel_records(guild_xid, target_xid)
-        format_row = format_channel_export_row
         filename_part = f"channel-{target_xid}"
     else:
         if not await services.plays.user_export_target_exists(target_xid):
             return web.Response(status=404)
-        header = USER_EXPORT_HEADER
         stream = services.plays.stream_user_records(target_xid)
-        format_row = format_user_export_row
         filename_part = f"user-{target_xid}"
 
     today = datetime.now(tz=UTC).strftime("%Y%m%d")
-    filename = f"spellbot-{filename_part}-{today}.csv"
+    filename = f"spellbot-{filename_part}-{today}.{fmt.value}"
     response = web.StreamResponse(
         status=200,
         headers={
-            "Content-Type": "text/csv; charset=utf-8",
+            "Content-Type": EXPORT_CONTENT_TYPES[fmt],
             "Content-Disposition": f'attachment; filename="{filename}"',
         },
     )
-    response.enable_compression(force=web.ContentCoding.gzip)
+    if fmt is not ExportFormat.PARQUET:
+        # Parquet pages are already compressed; gzipping them again only costs CPU.
+        response.enable_compression(force=web.ContentCoding.gzip)
     response.enable_chunked_encoding()
     await response.prepare(request)
 
+    writer, shape = export_writer(response, kind, fmt)
+    start = time.perf_counter()
     try:
-        await response.write(csv_line(header))
-        async for record in stream:
-            await response.write(csv_line(format_row(record)))
+        # Close the stream promptly, even on disconnect, to release its database cursor.
+        async with aclosing(stream):
+            async for record in stream:
+                await writer.writerow(shape(record))
+        await writer.close()
         await response.write_eof()
     except ConnectionResetError, ConnectionError:
         # The client disconnected mid-export (closed the tab, timed out, etc.).
         # Nothing left to send, and it's not an error on our side.
         logger.info("client disconnected during %s export", kind.name.lower())
+        return response
+    duration_s = time.perf_counter() - start
+    rows_per_s = writer.rows / duration_s if duration_s > 0 else 0.0
+    add_span_export_stats(writer.rows, rows_per_s)
+    logger.info(
+        "exported %s %s %s rows in %.2fs (%.0f rows/s)",
+        writer.rows,
+        kind.name.lower(),
+        fmt.value,
+        duration_s,
+        rows_per_s,
+    )
     return response
 
 
-@routes.get(r"/g/{guild}/c/{channel}/export.csv")
+@routes.get(r"/g/{guild}/c/{channel}/export.{fmt:csv|ndjson|parquet}")
 @tracer.wrap(name="web", resource="channel_record_export")
 async def channel_export_endpoint(request: web.Request) -> web.StreamResponse:
     add_span_request_id(generate_request_id())
-    async with db_session_manager():
-        return await export_impl(request, RecordKind.CHANNEL)
+    fmt = ExportFormat(request.match_info["fmt"])
+    async with read_only_session_manager():
+        return await export_impl(request, RecordKind.CHANNEL, fmt)
 
 
-@routes.get(r"/u/{user}/export.csv")
+@routes.get(r"/u/{user}/export.{fmt:csv|ndjson|parquet}")
 @tracer.wrap(name="web", resource="user_record_export")
 async def user_export_endpoint(request: web.Request) -> web.StreamResponse:
     add_span_request_id(generate_request_id())
-    async with db_session_manager():
-        return await export_impl(request, RecordKind.USER)
+    fmt = ExportFormat(request.match_info["fmt"])
+    async with read_only_session_manager():
+        return await export_impl(request, RecordKind.USER, fmt)
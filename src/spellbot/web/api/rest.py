@@ -3,18 +3,21 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Final, cast
 
 import aiohttp
 import tenacity
 from aiohttp import web
 from dateutil import tz
 from ddtrace.trace import tracer
+from redis.exceptions import RedisError
 
 from spellbot import services
 from spellbot.database import db_session_manager
 from spellbot.metrics import add_span_request_id, generate_request_id
+from spellbot.redis_client import get_redis
 from spellbot.settings import settings
+from spellbot.web.json_encoding import json_response
 from spellbot.web.tools import rate_limited
 
 if TYPE_CHECKING:
@@ -28,6 +31,11 @@ routes = web.RouteTableDef()
 
 UNRECOVERABLE = {400, 401, 403, 404}
 
+# A user's DM channel with the bot doesn't change, so its id is kept for a long time
+# (shared through Redis) and only looked up again once Discord says it's gone.
+DM_CHANNEL_TTL_S: Final = 30 * 24 * 60 * 60
+DM_CHANNEL_KEY_PREFIX: Final = "dm_channel:"
+
 # Process-wide aiohttp client session, lazily created on first use and reused
 # for the lifetime of the process. aiohttp recommends a single long-lived
 # session per application rather than creating a new one per request.
@@ -57,8 +65,8 @@ def reply(
     data = data or {}
     status = status or (200 if error is None else 500)
     if error is None:
-        return web.json_response({"result": data}, status=status)
-    return web.json_response({"error": error}, status=status)
+        return json_response({"result": data}, status=status)
+    return json_response({"error": error}, status=status)
 
 
 @routes.post(r"/api/game/{game}/verify")
@@ -198,27 +206,73 @@ async def send_message(channel_xid: int, message: dict[str, Any]) -> dict[str, A
     return None
 
 
+async def cached_dm_channel(user_xid: int) -> str | None:
+    """Return the id of the user's DM channel if it is cached, or None."""
+    if not settings.REDIS_URL:
+        return None
+    try:
+        redis = await get_redis()
+        channel_xid = await redis.get(f"{DM_CHANNEL_KEY_PREFIX}{user_xid}")
+    except RedisError:
+        logger.warning("redis error reading dm channel for %s", user_xid, exc_info=True)
+        return None
+    return cast("bytes", channel_xid).decode() if channel_xid is not None else None
+
+
+async def cache_dm_channel(user_xid: int, channel_xid: str | None) -> None:
+    """Remember the id of the user's DM channel, or forget it when given None."""
+    if not settings.REDIS_URL:
+        return
+    key = f"{DM_CHANNEL_KEY_PREFIX}{user_xid}"
+    try:
+        redis = await get_redis()
+        if channel_xid is None:
+            await redis.delete(key)
+        else:
+            await redis.set(key, channel_xid, ex=DM_CHANNEL_TTL_S)
+    except RedisError:
+        logger.warning("redis error caching dm channel for %s", user_xid, exc_info=True)
+
+
+async def open_dm_channel(session: aiohttp.ClientSession, user_xid: int) -> str:
+    """Ask Discord for the user's DM channel and cache its id."""
+    dm_channel = await post_with_retry(
+        session,
+        "/users/@me/channels",
+        {"recipient_id": user_xid},
+    )
+    logger.info("DM channel to user %s created", user_xid)
+    channel_xid = str(dm_channel["id"])
+    await cache_dm_channel(user_xid, channel_xid)
+    return channel_xid
+
+
 @tracer.wrap(name="rest", resource="send_dm")
 async def send_dm(user_xid: int, message: dict[str, Any]) -> None:
     logger.info("Beginning DM send to user %s...", user_xid)
     try:
         session = get_http_session()
-        # create dm channel
-        dm_channel = await post_with_retry(
-            session,
-            "/users/@me/channels",
-            {"recipient_id": user_xid},
-        )
-        logger.info("DM channel to user %s created", user_xid)
-
-        # then send message to dm channel
-        channel_xid = dm_channel["id"]
-        logger.info("Sending DM to user %s...", user_xid)
-        dm_message = await post_with_retry(
-            session,
-            f"/channels/{channel_xid}/messages",
-            message,
-        )
+        dm_message = None
+        if (channel_xid := await cached_dm_channel(user_xid)) is not None:
+            try:
+                dm_message = await post_with_retry(
+                    session,
+                    f"/channels/{channel_xid}/messages",
+                    message,
+                )
+            except aiohttp.ClientResponseError as ex:
+                if ex.status != 404:
+                    raise
+                # The cached channel is gone, so forget it and open the DM channel again.
+                await cache_dm_channel(user_xid, None)
+        if dm_message is None:
+            channel_xid = await open_dm_channel(session, user_xid)
+            logger.info("Sending DM to user %s...", user_xid)
+            dm_message = await post_with_retry(
+                session,
+                f"/channels/{channel_xid}/messages",
+                message,
+            )
         logger.info("Sent DM to user %s with response: %s", user_xid, json.dumps(dm_message))
 
     except aiohttp.ClientResponseError as ex:
@@ -11,6 +11,7 @@ from ddtrace.trace import tracer
 from packaging.version import parse as parse_version
 
 from spellbot.metrics import add_span_request_id, generate_request_id
+from spellbot.pool_stats import format_ms, pool_snapshots
 from spellbot.shard_status import ShardStatus, get_all_shard_statuses
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,40 @@ class ShardData:
     version: str
 
 
+@dataclass
+class PoolData:
+    """Database connection pool statistics for one process."""
+
+    process: str
+    name: str
+    size: int
+    max_overflow: int
+    in_use: int
+    peak_in_use: int
+    overflow: int
+    peak_overflow: int
+    wait_p95_ms: float | None
+    wait_max_ms: float
+    age_max_s: float
+
+    @classmethod
+    def from_snapshot(cls, process: str, snapshot: dict[str, Any]) -> PoolData:
+        wait_p95_ms = snapshot.get("wait_p95_ms")
+        return cls(
+            process=process,
+            name=str(snapshot["name"]),
+            size=get_int(snapshot, "size"),
+            max_overflow=get_int(snapshot, "max_overflow"),
+            in_use=get_int(snapshot, "in_use"),
+            peak_in_use=get_int(snapshot, "peak_in_use"),
+            overflow=get_int(snapshot, "overflow"),
+            peak_overflow=get_int(snapshot, "peak_overflow"),
+            wait_p95_ms=float(wait_p95_ms) if wait_p95_ms is not None else None,
+            wait_max_ms=float(snapshot.get("wait_max_ms", 0.0)),
+            age_max_s=float(snapshot.get("age_max_s", 0.0)),
+        )
+
+
 @dataclass
 class StatusData:
     """Computed status data shared by HTML and JSON endpoints."""
@@ -66,6 +101,7 @@ class StatusData:
     version: str | None
     upgrade_in_progress: bool
     last_updated: str | None
+    pools: list[PoolData]
 
 
 def format_latency(latency_ms: float | None) -> str:
@@ -125,8 +161,14 @@ def get_str(metadata: dict[str, Any], key: str) -> str | None:
 def compute_status(
     statuses: list[ShardStatus],
     metadata: dict[str, Any] | None,
+    web_pools: list[dict[str, Any]] | None = None,
 ) -> StatusData:
-    """Compute overall status and shard data."""
+    """
+    Compute overall status and shard data.
+
+    Pool statistics come from the bot (published with the shard metadata) and,
+    when given, from this web process.
+    """
     total_shards = get_int(metadata, "shard_count") if metadata else 0
     ready_shards = sum(1 for s in statuses if s.is_ready)
     total_guilds = get_int(metadata, "total_guilds") if metadata else 0
@@ -162,6 +204,10 @@ def compute_status(
         for s in statuses
     ]
 
+    bot_pools = metadata.get("pools") if metadata else None
+    pools = [PoolData.from_snapshot("bot", p) for p in bot_pools or []]
+    pools.extend(PoolData.from_snapshot("web", p) for p in web_pools or [])
+
     return StatusData(
         indicator=indicator,
         total_shards=total_shards,
@@ -171,6 +217,7 @@ def compute_status(
         version=version,
         upgrade_in_progress=upgrade_in_progress,
         last_updated=last_updated,
+        pools=pools,
     )
 
 
@@ -217,6 +264,18 @@ def format_status_for_html(data: StatusData) -> dict[str, Any]:
         for shard in data.shards
     ]
 
+    pool_data = [
+        {
+            "label": f"{pool.process.capitalize()} · {pool.name}",
+            "in_use": f"{pool.in_use}/{pool.size} (peak {pool.peak_in_use})",
+            "overflow": f"{pool.overflow}/{pool.max_overflow} (peak {pool.peak_overflow})",
+            "wait": f"{format_ms(pool.wait_p95_ms)} / {format_ms(pool.wait_max_ms)}",
+            "age_max": f"{pool.age_max_s:g}s",
+            "status_class": "status-degraded" if pool.peak_overflow else "status-healthy",
+        }
+        for pool in data.pools
+    ]
+
     return {
         "overall_status": overall_status,
         "overall_status_class": f"status-{overall_status}",
@@ -229,6 +288,7 @@ def format_status_for_html(data: StatusData) -> dict[str, Any]:
         "upgrade_in_progress": data.upgrade_in_progress,
         "version_groups": version_groups,
         "last_updated": format_time_ago(data.last_updated) if data.last_updated else "never",
+        "pools": pool_data,
     }
 
 
@@ -238,7 +298,7 @@ async def endpoint(request: web.Request) -> web.Response:
     """Render the shard status page."""
     add_span_request_id(generate_request_id())
     statuses, metadata = await get_all_shard_statuses()
-    data = compute_status(statuses, metadata)
+    data = compute_status(statuses, metadata, pool_snapshots())
     context = format_status_for_html(data)
     return aiohttp_jinja2.render_template("status.html.j2", request, context)
 
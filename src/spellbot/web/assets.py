@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from aiohttp.typedefs import Handler
+
+# Each bundle is its source files concatenated in order. The `*_pure.js` helpers come
+# first so their top-level declarations are globals visible to the page's IIFE.
+JS_BUNDLES: Final = {
+    "analytics": ("analytics_pure.js", "analytics.js"),
+    "dashboard": ("dashboard_pure.js", "dashboard.js"),
+}
+
+JS_CONTENT_TYPE: Final = "application/javascript; charset=utf-8"
+
+# Hex digits of the content hash kept in a bundle's URL.
+FINGERPRINT_LENGTH: Final = 12
+
+# A fingerprinted URL only ever serves one body, so browsers may keep it forever.
+IMMUTABLE_CACHE_CONTROL: Final = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class JsBundle:
+    name: str
+    body: bytes
+    digest: str
+    # The body precompressed with gzip, which every browser accepts.
+    gzipped: bytes
+
+    @property
+    def url(self) -> str:
+        return f"/{self.name}.{self.digest}.js"
+
+    @property
+    def plain_url(self) -> str:
+        return f"/{self.name}.js"
+
+
+def build_bundle(root: Path, name: str, sources: tuple[str, ...]) -> JsBundle:
+    """Concatenate the given template-dir JS files, fingerprint and precompress them."""
+    text = "\n".join((root / source).read_text(encoding="utf-8") for source in sources)
+    body = text.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:FINGERPRINT_LENGTH]
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+    return JsBundle(name=name, body=body, digest=digest, gzipped=gzipped)
+
+
+def build_js_bundles(root: Path) -> dict[str, JsBundle]:
+    return {name: build_bundle(root, name, sources) for name, sources in JS_BUNDLES.items()}
+
+
+def accepted_codings(header: str) -> set[str]:
+    """Return the content-codings an `Accept-Encoding` header allows (ignoring `q=0`)."""
+    codings: set[str] = set()
+    for part in header.split(","):
+        coding, *params = (piece.strip() for piece in part.split(";"))
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                with suppress(ValueError):
+                    q = float(value)
+        if coding and q > 0:
+            codings.add(coding.lower())
+    return codings
+
+
+def bundle_response(request: web.Request, bundle: JsBundle, cache_control: str) -> web.Response:
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if any(tag.value == bundle.digest for tag in request.if_none_match or ()):
+        response = web.Response(status=304, headers=headers)
+        response.etag = bundle.digest
+        return response
+    accepted = accepted_codings(request.headers.get("Accept-Encoding", ""))
+    body = bundle.body
+    if "gzip" in accepted or "*" in accepted:
+        headers["Content-Encoding"] = "gzip"
+        body = bundle.gzipped
+    response = web.Response(body=body, headers={**headers, "Content-Type": JS_CONTENT_TYPE})
+    response.etag = bundle.digest
+    return response
+
+
+def bundle_handler(bundle: JsBundle, *, fingerprinted: bool) -> Handler:
+    """
+    Serve a bundle from memory, gzipped when the client accepts it.
+
+    The fingerprinted URL is cached as immutable since a deploy that changes the
+    bundle changes its URL too. The plain URL is kept for pages rendered before
+    the deploy; it must be revalidated, but unchanged bundles answer with a 304.
+    """
+    cache_control = IMMUTABLE_CACHE_CONTROL if fingerprinted else "no-cache"
+
+    async def serve(request: web.Request) -> web.StreamResponse:
+        return bundle_response(request, bundle, cache_control)
+
+    return serve
+
+
+def add_js_bundles(app: web.Application, root: Path) -> dict[str, str]:
+    """Add routes serving the JS bundles, returning each bundle's fingerprinted URL."""
+    urls: dict[str, str] = {}
+    for name, bundle in build_js_bundles(root).items():
+        app.router.add_get(bundle.url, bundle_handler(bundle, fingerprinted=True))
+        app.router.add_get(bundle.plain_url, bundle_handler(bundle, fingerprinted=False))
+        urls[name] = bundle.url
+    return urls
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import suppress
 from datetime import UTC, datetime, timedelta
@@ -31,15 +32,23 @@ from spellbot.web.api import (
     viewer_auth,
 )
 from spellbot.web.api.oauth import safe_relative_path
+from spellbot.web.assets import add_js_bundles
+from spellbot.web.icon_refresher import icon_refresher
+from spellbot.web.queue_stream import queue_event_hub
 from spellbot.web.tools import rate_limited
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from aiohttp.typedefs import Handler
 
 logger = logging.getLogger(__name__)
 
 TEMPLATES_ROOT = Path(__file__).resolve().parent / "templates"
 
+# Request storage key for the site-header identity, resolved once per request.
+NAV_CONTEXT_KEY = "nav_context"
+
 ALL_ROUTES = [
     ping.routes,
     status.routes,
@@ -85,13 +94,18 @@ async def nav_context(request: web.Request) -> dict[str, object]:
     lets the one shared header render a correct login/logout state on every public
     page. The `here` value carries the current path so both flows return the user to
     the page they were on, all through a single OAuth redirect URI.
+
+    The result is kept on the request, so every template rendered for it shares
+    one lookup of the session.
     """
+    if (cached := request.get(NAV_CONTEXT_KEY)) is not None:
+        return cached
     viewer_xid, viewer_name = await viewer_auth.get_viewer(request)
     is_admin = await admin_auth.get_admin_user_xid(request) is not None
     # Return-to path only (no query string): enough to send the viewer back to the
     # page they logged in from, without reflecting arbitrary query params into the page.
     here = safe_relative_path(request.path)
-    return {
+    nav: dict[str, object] = {
         "logged_in": viewer_xid is not None,
         "xid": viewer_xid,
         "name": viewer_name,
@@ -99,6 +113,8 @@ async def nav_context(request: web.Request) -> dict[str, object]:
         "login_enabled": bool(settings.BOT_APPLICATION_ID and settings.BOT_CLIENT_SECRET),
         "here": here or "/queues",
     }
+    request[NAV_CONTEXT_KEY] = nav
+    return nav
 
 
 @web.middleware
@@ -128,54 +144,19 @@ async def auth_middleware(request: web.Request, handler: Handler) -> web.StreamR
     token = auth_header.removeprefix("Bearer ").strip()
     if not token:
         return web.json_response({"error": "Missing or invalid Authorization header"}, status=401)
-    async with db_session_manager():
-        if not await services.apps.verify_token(token, request.rel_url.path):
-            if await rate_limited(request):
-                return web.json_response({"error": "Too many requests"}, status=429)
-            return web.json_response({"error": "Unauthorized"}, status=403)
+    # Tokens are cached, so usually only the handler's own session touches the database.
+    scopes = services.apps.cached_token_scopes(token)
+    if scopes is None:
+        async with db_session_manager():
+            scopes = await services.apps.load_token_scopes(token)
+    if not services.apps.scopes_allow(scopes, request.rel_url.path):
+        if await rate_limited(request):
+            return web.json_response({"error": "Too many requests"}, status=429)
+        return web.json_response({"error": "Unauthorized"}, status=403)
 
     return await handler(request)
 
 
-def concat_js(*names: str) -> str:
-    """Concatenate template-dir JS files in order, separated by newlines."""
-    return "\n".join((TEMPLATES_ROOT / name).read_text(encoding="utf-8") for name in names)
-
-
-async def serve_analytics_js(_: web.Request) -> web.Response:
-    """
-    Serve the analytics JavaScript file.
-
-    No-cache headers (like `dashboard.js`) ensure viewers pick up new analytics code
-    immediately after a deploy without a hard refresh, instead of running a stale copy.
-    """
-    return web.Response(
-        body=concat_js("analytics_pure.js", "analytics.js"),
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Content-Type": "application/javascript; charset=utf-8",
-        },
-    )
-
-
-async def serve_dashboard_js(_: web.Request) -> web.Response:
-    """
-    Serve the admin dashboard JavaScript file.
-
-    Served publicly (the file contains no secrets — only chart wiring and
-    fetch calls against `/admin/dashboard/*`, which are themselves gated by
-    `admin_auth_middleware`). No-cache headers ensure admins pick up new
-    dashboard code immediately after a deploy without a hard refresh.
-    """
-    return web.Response(
-        body=concat_js("dashboard_pure.js", "dashboard.js"),
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Content-Type": "application/javascript; charset=utf-8",
-        },
-    )
-
-
 def build_web_app() -> web.Application:
     import_models()
     app = web.Application(
@@ -189,20 +170,37 @@ def build_web_app() -> web.Application:
     admin_auth.setup_admin_sessions(app)
     app.middlewares.append(admin_auth.admin_auth_middleware)
     app.middlewares.append(aiohttp_jinja2.context_processors_middleware)
-    aiohttp_jinja2.setup(
+    env = aiohttp_jinja2.setup(
         app,
         loader=jinja2.FileSystemLoader(TEMPLATES_ROOT),
         filters={"humanize": humanize, "wait": queues.format_wait},
     )
+    # Pages load their scripts by fingerprinted URL: {{ js_bundles.analytics }}.
+    env.globals["js_bundles"] = add_js_bundles(app, TEMPLATES_ROOT)
     app[aiohttp_jinja2.APP_CONTEXT_PROCESSORS_KEY] = (i18n_context_processor,)
     for routes in ALL_ROUTES:
         app.router.add_routes(routes)
-    app.router.add_get("/analytics.js", serve_analytics_js)
-    app.router.add_get("/dashboard.js", serve_dashboard_js)
+    app.cleanup_ctx.append(watch_cache_invalidations)
     app.on_cleanup.append(close_shared_clients)
     return app
 
 
+async def watch_cache_invalidations(_app: web.Application) -> AsyncIterator[None]:
+    tasks = []
+    if settings.REDIS_URL:
+        tasks = [
+            asyncio.create_task(services.apps.watch_token_invalidations()),
+            asyncio.create_task(services.games.watch_game_detail_invalidations()),
+        ]
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
 async def close_shared_clients(_app: web.Application) -> None:
+    await queue_event_hub.close()
+    await icon_refresher.close()
     await rest.close_http_session()
     await close_redis()
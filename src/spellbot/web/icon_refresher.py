@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Final
+
+from redis.exceptions import RedisError
+
+from spellbot import services
+from spellbot.database import db_session_manager
+from spellbot.redis_client import get_redis
+from spellbot.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+# How long after asking Discord for a guild's icon before asking again, in any process.
+ICON_FETCH_TTL_S: Final = 6 * 60 * 60
+ICON_ATTEMPT_KEY_PREFIX: Final = "icon_attempt:"
+
+# Guilds whose icon was asked for by this process when Redis is not configured (or is
+# failing): xid -> when it may be asked for again.
+icon_fetch_attempts: dict[int, float] = {}
+
+
+def claim_locally(guild_xids: list[int]) -> list[int]:
+    now = time.monotonic()
+    claimed = [xid for xid in guild_xids if icon_fetch_attempts.get(xid, 0.0) <= now]
+    for xid in claimed:
+        icon_fetch_attempts[xid] = now + ICON_FETCH_TTL_S
+    return claimed
+
+
+async def claim_icon_fetches(guild_xids: list[int]) -> list[int]:
+    """
+    Return the guilds whose icons nobody has asked Discord for recently, claiming them.
+
+    The claims are shared through Redis when it is configured, so only one web
+    process asks Discord for a given guild's icon every `ICON_FETCH_TTL_S`.
+    """
+    if settings.REDIS_URL:
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            for xid in guild_xids:
+                pipe.set(f"{ICON_ATTEMPT_KEY_PREFIX}{xid}", "1", nx=True, ex=ICON_FETCH_TTL_S)
+            claims = await pipe.execute()
+            return [xid for xid, claimed in zip(guild_xids, claims, strict=True) if claimed]
+        except RedisError:
+            logger.warning("redis error claiming icon fetches, claiming locally", exc_info=True)
+    return claim_locally(guild_xids)
+
+
+async def fetch_icons(guild_xids: list[int]) -> dict[int, str]:
+    """Ask Discord for the given guilds' icons, `ICON_FETCH_CONCURRENCY` at a time."""
+    limit = asyncio.Semaphore(settings.ICON_FETCH_CONCURRENCY)
+
+    async def fetch(xid: int) -> str | None:
+        async with limit:
+            return await services.guilds.fetch_icon_url(xid)
+
+    fetched = await asyncio.gather(*(fetch(xid) for xid in guild_xids))
+    return {xid: icon for xid, icon in zip(guild_xids, fetched, strict=True) if icon}
+
+
+class IconRefresher:
+    """
+    Backfill missing guild icons from Discord in the background.
+
+    Pages show the default logo for a guild without an icon and hand it to
+    `request`; a single task fetches the icons asked for since it last ran and
+    stores them all at once, so the next snapshot of the page picks them up.
+    """
+
+    def __init__(self) -> None:
+        self.pending: set[int] = set()
+        self.task: asyncio.Task[None] | None = None
+
+    def request(self, guild_xids: Iterable[int]) -> None:
+        self.pending.update(guild_xids)
+        if self.pending and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self.run())
+
+    async def refresh(self, guild_xids: list[int]) -> None:
+        claimed = await claim_icon_fetches(guild_xids)
+        if not claimed:
+            return
+        icons = await fetch_icons(claimed)
+        async with db_session_manager():
+            await services.guilds.set_icons(icons)
+        logger.info("backfilled %s of %s guild icons", len(icons), len(claimed))
+
+    async def run(self) -> None:
+        while self.pending:
+            guild_xids = sorted(self.pending)
+            self.pending.clear()
+            try:
+                await self.refresh(guild_xids)
+            except Exception:
+                logger.exception("failed to backfill guild icons for %s", guild_xids)
+
+    async def close(self) -> None:
+        self.pending.clear()
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+
+icon_refresher = IconRefresher()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from typing import Any, Final
+
+import orjson
+from aiohttp import web
+
+# Bodies at least this large are compressed (deflate or gzip, as the client accepts);
+# below this the bytes saved aren't worth the CPU spent compressing them.
+JSON_COMPRESS_MIN_BYTES: Final = 16 * 1024
+
+# Dates and times go through `json_default` too, so both encoders write them alike.
+ORJSON_OPTIONS: Final = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def json_default(value: Any) -> str:
+    """Serialize what JSON has no type for: dates and times as ISO strings, else `str()`."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+
+def stdlib_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
+
+
+def dumps(value: Any) -> bytes:
+    """Encode the web app's JSON responses as compact UTF-8 bytes."""
+    try:
+        return orjson.dumps(value, default=json_default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # orjson only writes integers that fit in 64 bits; json writes any of them.
+        return stdlib_dumps(value)
+
+
+def json_body_response(body: bytes | str, *, status: int = 200) -> web.Response:
+    """Respond with an already encoded JSON body, compressed when it is large."""
+    if isinstance(body, str):
+        body = body.encode()
+    response = web.Response(body=body, status=status, content_type="application/json")
+    if len(body) >= JSON_COMPRESS_MIN_BYTES:
+        response.enable_compression()
+    return response
+
+
+def json_response(data: Any, *, status: int = 200) -> web.Response:
+    """Respond with `data` encoded by `dumps`, compressed when it is large."""
+    return json_body_response(dumps(data), status=status)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from typing import Final
+
+from redis.exceptions import RedisError
+
+from spellbot import services
+from spellbot.database import db_session_manager
+from spellbot.redis_client import get_redis
+from spellbot.services.queue_events import QUEUE_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Events a stream may have waiting to be sent before it is told to reload instead.
+STREAM_BACKLOG: Final = 100
+
+# How long the set of publicly listed guilds is reused for when filtering events.
+PUBLIC_GUILDS_TTL_S: Final = 60.0
+
+# How long to wait before subscribing again after losing the Redis connection.
+RESUBSCRIBE_DELAY_S: Final = 5.0
+
+# Sent when a stream may have missed events, so the page reloads to catch up.
+RELOAD_EVENT: Final = json.dumps({"type": "reload"})
+
+
+class QueueEventHub:
+    """
+    Fan queue events from one Redis subscription out to every open /queues stream.
+
+    The subscription is started by the first stream and shared by all of them, so
+    the number of connected browsers costs nothing in Redis or the database.
+    Events for guilds that aren't listed publicly never reach a stream.
+    """
+
+    def __init__(self) -> None:
+        self.streams: set[asyncio.Queue[str]] = set()
+        self.task: asyncio.Task[None] | None = None
+        self.public_guilds: set[int] = set()
+        self.public_guilds_expire = 0.0
+
+    def connect(self) -> asyncio.Queue[str]:
+        stream: asyncio.Queue[str] = asyncio.Queue(maxsize=STREAM_BACKLOG)
+        self.streams.add(stream)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return stream
+
+    def disconnect(self, stream: asyncio.Queue[str]) -> None:
+        self.streams.discard(stream)
+
+    def broadcast(self, message: str) -> None:
+        for stream in self.streams:
+            try:
+                stream.put_nowait(message)
+            except asyncio.QueueFull:
+                # A stream this far behind is better off reloading than catching up.
+                while not stream.empty():
+                    stream.get_nowait()
+                stream.put_nowait(RELOAD_EVENT)
+
+    async def is_public(self, guild_xid: int) -> bool:
+        if time.monotonic() >= self.public_guilds_expire:
+            async with db_session_manager():
+                self.public_guilds = await services.queues.public_guild_xids()
+            self.public_guilds_expire = time.monotonic() + PUBLIC_GUILDS_TTL_S
+        return guild_xid in self.public_guilds
+
+    async def dispatch(self, data: bytes | str) -> None:
+        try:
+            event = json.loads(data)
+            if await self.is_public(int(event["guild_xid"])):
+                self.broadcast(json.dumps(event))
+        except Exception:
+            logger.exception("failed to dispatch queue event %r", data)
+
+    async def run(self) -> None:
+        missed = False
+        while True:
+            try:
+                redis = await get_redis()
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(QUEUE_EVENTS_CHANNEL)
+                    if missed:
+                        self.broadcast(RELOAD_EVENT)
+                        missed = False
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await self.dispatch(message["data"])
+            except RedisError:
+                logger.warning("lost the queue events subscription", exc_info=True)
+                missed = True
+                await asyncio.sleep(RESUBSCRIBE_DELAY_S)
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+
+queue_event_hub = QueueEventHub()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import secrets
+import time
+from typing import TYPE_CHECKING, Final, cast
+
+from aiohttp import web
+from redis.exceptions import RedisError
+
+from spellbot.redis_client import get_redis
+from spellbot.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from redis import asyncio as aioredis
+
+    from spellbot.web.dashboard_filters import Bucket
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_KEY_PREFIX: Final = "response:"
+
+# How long a response stays cached, by the size of the buckets its charts are drawn in:
+# a new game barely moves a monthly bar, so coarse charts can be a little older.
+RESPONSE_CACHE_TTL_S: Final[dict[Bucket, int]] = {"day": 60, "week": 300, "month": 900}
+
+# How long responses showing what's happening right now (like queue depth) are cached,
+# whatever the period: just long enough for admins loading the dashboard together.
+LIVE_RESPONSE_CACHE_TTL_S: Final = 5
+
+# A request that finds another one already computing the same response polls for its
+# result this often, for at most as long as the other request holds the lock.
+RESPONSE_LOCK_TTL_S: Final = 30
+RESPONSE_POLL_INTERVAL_S: Final = 0.05
+
+# Deletes the lock in KEYS[1] only if it still holds the token in ARGV[1]: a request
+# that outlived its lock mustn't release the one another request has taken since.
+RELEASE_LOCK_SCRIPT: Final = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# Responses cached in this process when Redis is not configured (or is failing):
+# key -> (expires, text).
+response_cache: dict[str, tuple[float, str]] = {}
+
+# Responses being computed in this process right now, shared by every request for them.
+responses_in_flight: dict[str, asyncio.Future[str]] = {}
+
+
+def response_cache_key(*parts: object) -> str:
+    return RESPONSE_CACHE_KEY_PREFIX + ":".join(str(part) for part in parts)
+
+
+def remember(key: str, ttl: int, text: str) -> None:
+    now = time.monotonic()
+    for stale in [k for k, (expires, _) in response_cache.items() if expires <= now]:
+        del response_cache[stale]
+    response_cache[key] = (now + ttl, text)
+
+
+def recall(key: str) -> str | None:
+    entry = response_cache.get(key)
+    if entry is None or time.monotonic() >= entry[0]:
+        return None
+    return entry[1]
+
+
+async def release_lock(redis: aioredis.Redis, lock: str, token: str) -> None:
+    try:
+        await cast("Awaitable[int]", redis.eval(RELEASE_LOCK_SCRIPT, 1, lock, token))
+    except RedisError:
+        # The lock expires by itself; the response is worth more than a tidy release.
+        logger.warning("redis error releasing a response lock", exc_info=True)
+
+
+async def redis_fill(key: str, ttl: int, compute: Callable[[], Awaitable[str]]) -> str:
+    """
+    Return the response cached in Redis, computing it if no other process already is.
+
+    Whoever takes the lock computes the response and caches it; everyone else polls
+    for that result and only computes it themselves if the lock goes away without
+    one, for example because the request holding it failed. Once computed, a response
+    is returned even if Redis fails to store it, rather than computed again.
+    """
+    redis = await get_redis()
+    if (hit := await redis.get(key)) is not None:
+        return cast("bytes", hit).decode()
+    lock = f"{key}:lock"
+    token = secrets.token_hex()
+    if await redis.set(lock, token, nx=True, ex=RESPONSE_LOCK_TTL_S):
+        try:
+            text = await compute()
+            try:
+                await redis.set(key, text, ex=ttl)
+            except RedisError:
+                logger.warning("redis error caching a response", exc_info=True)
+            return text
+        finally:
+            await release_lock(redis, lock, token)
+    for _ in range(int(RESPONSE_LOCK_TTL_S / RESPONSE_POLL_INTERVAL_S)):
+        await asyncio.sleep(RESPONSE_POLL_INTERVAL_S)
+        if (hit := await redis.get(key)) is not None:
+            return cast("bytes", hit).decode()
+        if not await redis.exists(lock):
+            break
+    return await compute()
+
+
+async def fill(key: str, ttl: int, compute: Callable[[], Awaitable[str]]) -> str:
+    if settings.REDIS_URL:
+        try:
+            return await redis_fill(key, ttl, compute)
+        except RedisError:
+            logger.warning("redis error in response cache, using the local cache", exc_info=True)
+    text = await compute()
+    remember(key, ttl, text)
+    return text
+
+
+async def cached_response(key: str, ttl: int, compute: Callable[[], Awaitable[str]]) -> str:
+    """
+    Return the response text cached under `key`, calling `compute` to fill it if needed.
+
+    Responses are shared through Redis when it is configured and kept in this process
+    otherwise, or while Redis is failing. Either way only one request computes a given
+    response at a time: the others for the same key wait for its result instead of
+    running the same queries.
+    """
+    if (text := recall(key)) is not None:
+        return text
+    future = responses_in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fill(key, ttl, compute))
+        responses_in_flight[key] = future
+        future.add_done_callback(lambda _: responses_in_flight.pop(key, None))
+    # Shielded so that a request going away doesn't cancel the work others are waiting on.
+    return await asyncio.shield(future)
+
+
+def etag_response(request: web.Request, text: str, *, content_type: str) -> web.Response:
+    """
+    Respond with `text` tagged with an ETag of its content, or 304 if the client has it.
+
+    Clients polling a page send its tag back in `If-None-Match` and get an empty 304
+    instead of the same body again for as long as its content stays the same.
+    """
+    etag = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    headers = {"Cache-Control": "no-cache"}
+    if any(tag.value == etag for tag in request.if_none_match or ()):
+        response = web.Response(status=304, headers=headers)
+    else:
+        response = web.Response(text=text, content_type=content_type, headers=headers)
+    response.etag = etag
+    return response
@@ -203,8 +203,8 @@
     const [y, m, d] = iso.split("-").map(Number);
     return monthYearFmt.format(new Date(y, m - 1, d));
   }
-  /* `toDayMap` and `fmt` live in analytics_pure.js (concatenated by
-     serve_analytics_js) so they can be unit-tested under Node. */
+  /* `toDayMap` and `fmt` live in analytics_pure.js (bundled ahead of
+     this file by web/assets.py) so they can be unit-tested under Node. */
 
   /* Smart date formatting based on visible range */
   function smartDateTicks(rawDates) {
@@ -264,8 +264,8 @@
   const pendingRequests = { "30d": new Set(), all: new Set() };
 
   /* `periodLabel`, `getTimezoneOffsetHours`, `getUserTimezone`,
-     `utcHourToLocal`, `getTodayUTC`, `getTodayLocal` and `excludeToday`
-     live in analytics_pure.js. */
+     `utcHourToLocal`, `getTodayUTC`, `getTodayLocal`, `excludeToday`,
+     `snapshotAgeLabel` and `splitNdjson` live in analytics_pure.js. */
 
   function updateTitles() {
     const now = new Date();
@@ -330,6 +330,14 @@
     document.getElementById("statTotalGames").textContent = fmt(data.total_games);
     document.getElementById("statActivePlayers").textContent = fmt(data.active_players);
     document.getElementById("statRepeatRate").textContent = data.repeat_player_rate + "%";
+    showSnapshotAge(data.snapshot_at);
+  }
+
+  function showSnapshotAge(snapshotAt) {
+    const el = document.getElementById("snapshotAge");
+    if (!el) return;
+    el.textContent = snapshotAgeLabel(snapshotAt, new Date());
+    el.title = snapshotAt ? "Computed " + new Date(snapshotAt).toLocaleString() : "";
   }
 
   function renderActivity(data) {
@@ -961,47 +969,75 @@
     },
   ];
 
-  function fetchEndpoint({ name, sectionId, render }) {
+  function showFailed({ sectionId }) {
+    if (sectionId === "summarySection") {
+      showSummaryError();
+    } else {
+      showError(sectionId, "Failed to load");
+    }
+  }
+
+  /* Loads every panel not already cached for the current period with one batch
+     request. The server streams a line per panel as each one is ready, so charts
+     render as their data arrives instead of when the slowest panel is done. */
+  function fetchPanels(eps) {
     const requestPeriod = currentPeriod;
     const cache = dataCache[requestPeriod];
-    if (cache[name]) {
-      render(cache[name]);
-      return;
-    }
-    if (pendingRequests[requestPeriod].has(name)) {
-      return;
+    const waiting = {};
+    eps.forEach((ep) => {
+      if (cache[ep.name]) {
+        ep.render(cache[ep.name]);
+      } else if (!pendingRequests[requestPeriod].has(ep.name)) {
+        showLoading(ep.sectionId);
+        pendingRequests[requestPeriod].add(ep.name);
+        waiting[ep.name] = ep;
+      }
+    });
+    const names = Object.keys(waiting);
+    if (!names.length) return;
+
+    function settle(name, data) {
+      const ep = waiting[name];
+      if (!ep) return;
+      delete waiting[name];
+      pendingRequests[requestPeriod].delete(name);
+      if (data) dataCache[requestPeriod][name] = data;
+      if (currentPeriod !== requestPeriod) return;
+      if (data) {
+        ep.render(data);
+      } else {
+        showFailed(ep);
+      }
     }
-    showLoading(sectionId);
-    pendingRequests[requestPeriod].add(name);
+
     /* QUERY is empty in the moderator session view, so start the query string here. */
-    const periodParam = (QUERY ? "&" : "?") + "period=" + requestPeriod;
-    fetch(BASE_URL + "/" + name + QUERY + periodParam)
-      .then((r) => {
+    const params =
+      (QUERY ? "&" : "?") + "period=" + requestPeriod + "&panels=" + names.join(",");
+    fetch(BASE_URL + "/batch" + QUERY + params)
+      .then(async (r) => {
         if (!r.ok) throw new Error("Failed");
-        return r.json();
-      })
-      .then((data) => {
-        pendingRequests[requestPeriod].delete(name);
-        dataCache[requestPeriod][name] = data;
-        if (currentPeriod === requestPeriod) {
-          render(data);
+        const reader = r.body.getReader();
+        const decoder = new TextDecoder();
+        let rest = "";
+        for (;;) {
+          const { done, value } = await reader.read();
+          rest += decoder.decode(value || new Uint8Array(), { stream: !done });
+          const split = splitNdjson(rest, done);
+          rest = split.rest;
+          split.items.forEach((item) => settle(item.panel, item.error ? null : item.data));
+          if (done) break;
         }
       })
-      .catch(() => {
-        pendingRequests[requestPeriod].delete(name);
-        if (currentPeriod === requestPeriod) {
-          if (sectionId === "summarySection") {
-            showSummaryError();
-          } else {
-            showError(sectionId, "Failed to load");
-          }
-        }
+      .catch(() => {})
+      .finally(() => {
+        /* Anything the stream never delivered failed to load. */
+        Object.keys(waiting).forEach((name) => settle(name, null));
       });
   }
 
   function refreshAll() {
     Object.values(Chart.instances).forEach((chart) => chart.destroy());
-    endpoints.forEach((ep) => fetchEndpoint(ep));
+    fetchPanels(endpoints);
   }
 
   /* ── Initial load ── */
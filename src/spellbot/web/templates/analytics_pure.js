@@ -1,7 +1,7 @@
 /**
  * Pure (side-effect free) helpers for the analytics page.
  *
- * Concatenated with analytics.js at serve time so top-level declarations
+ * Concatenated with analytics.js at startup so top-level declarations
  * become globals visible to the IIFE in analytics.js. The trailing
  * `module.exports` block is a no-op in the browser and lets Vitest import
  * the same helpers under Node for unit testing.
@@ -132,6 +132,35 @@ function getLanguageName(locale, displayNames) {
   }
 }
 
+// Describes how old a panel's precomputed snapshot is, e.g. `Updated 5 min ago`.
+// `snapshotAt` is the ISO timestamp the API sends with snapshot data; live data
+// has none, so the label is empty.
+function snapshotAgeLabel(snapshotAt, now) {
+  if (!snapshotAt) return "";
+  var minutes = Math.floor((now.getTime() - new Date(snapshotAt).getTime()) / 60000);
+  if (minutes < 1) return "Updated just now";
+  if (minutes < 60) return "Updated " + minutes + " min ago";
+  var hours = Math.floor(minutes / 60);
+  if (hours < 24) return "Updated " + hours + " h ago";
+  return "Updated " + Math.floor(hours / 24) + " d ago";
+}
+
+// Splits streamed newline delimited JSON into the complete items received so far
+// and the trailing partial line to keep for the next chunk. When the stream is
+// `done` the trailing text is a final item too.
+function splitNdjson(text, done) {
+  var lines = text.split("\n");
+  var rest = done ? "" : lines.pop();
+  var items = lines
+    .filter(function (line) {
+      return line.trim();
+    })
+    .map(function (line) {
+      return JSON.parse(line);
+    });
+  return { items: items, rest: rest };
+}
+
 /* v8 ignore next */
 if (typeof module !== "undefined" && module.exports) {
   module.exports = {
@@ -148,5 +177,7 @@ if (typeof module !== "undefined" && module.exports) {
     renderLeftServerNote: renderLeftServerNote,
     getUserTimezone: getUserTimezone,
     getLanguageName: getLanguageName,
+    snapshotAgeLabel: snapshotAgeLabel,
+    splitNdjson: splitNdjson,
   };
 }
@@ -1538,7 +1538,9 @@
           const cells = row
             .map(function (cell) {
               if (cell === null) return '<td class="sql-null">NULL</td>';
-              return "<td>" + escapeHtml(String(cell)) + "</td>";
+              // json/jsonb and array columns arrive as structured values.
+              const shown = typeof cell === "object" ? JSON.stringify(cell) : String(cell);
+              return "<td>" + escapeHtml(shown) + "</td>";
             })
             .join("");
           return "<tr>" + cells + "</tr>";
@@ -1,7 +1,7 @@
 /**
  * Pure (side-effect free) helpers for the admin dashboard.
  *
- * This file is concatenated with dashboard.js at serve time so top-level
+ * This file is concatenated with dashboard.js at startup so top-level
  * function declarations become globals visible to the IIFE in dashboard.js.
  * The trailing `module.exports` block is a no-op in the browser and lets
  * Vitest import the same helpers under Node for unit testing.
@@ -1,8 +1,15 @@
 import { describe, it, expect } from "vitest";
 import pure from "../src/spellbot/web/templates/analytics_pure.js";
 
-const { escapeHtml, renderPlayerRow, renderLeftServerNote, getUserTimezone, getLanguageName } =
-  pure;
+const {
+  escapeHtml,
+  renderPlayerRow,
+  renderLeftServerNote,
+  getUserTimezone,
+  getLanguageName,
+  snapshotAgeLabel,
+  splitNdjson,
+} = pure;
 
 describe("escapeHtml", () => {
   it("escapes the five HTML metacharacters", () => {
@@ -131,3 +138,44 @@ describe("getLanguageName", () => {
     expect(getLanguageName("xx-YY", stub)).toBe("xx-YY");
   });
 });
+
+describe("snapshotAgeLabel", () => {
+  const now = new Date("2026-01-02T12:00:00Z");
+
+  it("is empty for live data", () => {
+    expect(snapshotAgeLabel(undefined, now)).toBe("");
+  });
+
+  it("describes fresh snapshots", () => {
+    expect(snapshotAgeLabel("2026-01-02T11:59:30+00:00", now)).toBe("Updated just now");
+  });
+
+  it("counts minutes, hours and days", () => {
+    expect(snapshotAgeLabel("2026-01-02T11:55:00+00:00", now)).toBe("Updated 5 min ago");
+    expect(snapshotAgeLabel("2026-01-02T09:00:00+00:00", now)).toBe("Updated 3 h ago");
+    expect(snapshotAgeLabel("2025-12-30T12:00:00+00:00", now)).toBe("Updated 3 d ago");
+  });
+});
+
+describe("splitNdjson", () => {
+  it("keeps a trailing partial line for the next chunk", () => {
+    expect(splitNdjson('{"panel":"a"}\n{"pan', false)).toEqual({
+      items: [{ panel: "a" }],
+      rest: '{"pan',
+    });
+  });
+
+  it("parses the last line once the stream is done", () => {
+    expect(splitNdjson('{"panel":"a"}\n{"panel":"b"}', true)).toEqual({
+      items: [{ panel: "a" }, { panel: "b" }],
+      rest: "",
+    });
+  });
+
+  it("skips blank lines", () => {
+    expect(splitNdjson('\n{"panel":"a"}\n\n', false)).toEqual({
+      items: [{ panel: "a" }],
+      rest: "",
+    });
+  });
+});
@@ -806,6 +806,40 @@ class TestPatreonSync:
         assert action.bot.supporters == {123, 456, 789}
 
 
+@pytest.mark.asyncio
+class TestRefreshDashboardRollups:
+    async def test_refresh_dashboard_rollups(
+        self,
+        action: TasksAction,
+        mocker: MockerFixture,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        mock_refresh = AsyncMock(return_value=3)
+        mocker.patch.object(services.rollups, "refresh", mock_refresh)
+
+        await action.refresh_dashboard_rollups()
+
+        mock_refresh.assert_called_once_with()
+        assert "starting task refresh_dashboard_rollups" in caplog.text
+
+
+@pytest.mark.asyncio
+class TestRefreshAnalyticsSnapshots:
+    async def test_refresh_analytics_snapshots(
+        self,
+        action: TasksAction,
+        mocker: MockerFixture,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        mock_refresh = AsyncMock(return_value=2)
+        mocker.patch.object(services.snapshots, "refresh", mock_refresh)
+
+        await action.refresh_analytics_snapshots()
+
+        mock_refresh.assert_called_once_with()
+        assert "starting task refresh_analytics_snapshots" in caplog.text
+
+
 @pytest.mark.asyncio
 class TestHandleException:
     async def test_reraises_spellbot_error(self) -> None:
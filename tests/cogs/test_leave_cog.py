@@ -15,14 +15,21 @@ from tests.fixtures import Factories, run_command
 from tests.mocks import mock_operations
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextlib import AbstractContextManager
+
     import discord
     from pytest_mock import MockerFixture
 
     from spellbot import SpellBot
+    from spellbot.query_stats import QueryStats
     from spellbot.settings import Settings
 
 pytestmark = pytest.mark.use_db
 
+# SQL statements issued for a player leaving a game that still has players, as measured.
+LEAVE_STATEMENT_BUDGET = 32
+
 CONVOKE_PENDING_MSG = (
     "_A [Convoke](https://www.convoke.games/) link will be created when all players have joined._"
 )
@@ -88,6 +95,28 @@ class TestCogLeaveGame:
                 "flags": 0,
             }
 
+    async def test_leave_statement_budget(
+        self,
+        cog: LeaveGameCog,
+        message: discord.Message,
+        game: Game,
+        player: User,
+        interaction: discord.Interaction,
+        factories: Factories,
+        statement_budget: Callable[[int], AbstractContextManager[QueryStats]],
+    ) -> None:
+        p2 = factories.user.create()
+        DatabaseSession.add(Queue(user_xid=p2.xid, game_id=game.id, og_guild_xid=game.guild_xid))
+        await DatabaseSession.commit()
+
+        with mock_operations(leave_action), statement_budget(LEAVE_STATEMENT_BUDGET) as stats:
+            leave_action.safe_fetch_text_channel.return_value = interaction.channel
+            leave_action.safe_get_partial_message.return_value = message
+
+            await run_command(cog.leave_command, interaction)
+
+        assert stats.statements == LEAVE_STATEMENT_BUDGET
+
     async def test_leave_then_delete(
         self,
         cog: LeaveGameCog,
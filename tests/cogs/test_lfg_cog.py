@@ -21,14 +21,19 @@ from tests.mocks import mock_discord_object, mock_operations
 
 if TYPE_CHECKING:
     from collections.abc import Callable
+    from contextlib import AbstractContextManager
 
     from pytest_mock import MockerFixture
 
     from spellbot import SpellBot
+    from spellbot.query_stats import QueryStats
     from spellbot.settings import Settings
 
 pytestmark = pytest.mark.use_db
 
+# SQL statements issued for a player creating a new game with /lfg, as measured.
+LFG_STATEMENT_BUDGET = 28
+
 CONVOKE_PENDING_MSG = (
     "_A [Convoke](https://www.convoke.games/) link will be created when all players have joined._"
 )
@@ -99,6 +104,22 @@ class TestCogLookingForGame:
         assert user_game is not None
         assert user_game.id == game.id
 
+    async def test_lfg_statement_budget(
+        self,
+        cog: LookingForGameCog,
+        channel: Channel,
+        interaction: discord.Interaction,
+        statement_budget: Callable[[int], AbstractContextManager[QueryStats]],
+    ) -> None:
+        with mock_operations(lfg_action), statement_budget(LFG_STATEMENT_BUDGET) as stats:
+            message = MagicMock(spec=discord.Message)
+            message.id = 123
+            lfg_action.safe_followup_channel.return_value = message
+
+            await run_command(cog.lfg, interaction)
+
+        assert stats.statements == LFG_STATEMENT_BUDGET
+
     async def test_lfg_fully_seated(
         self,
         cog: LookingForGameCog,
@@ -10,7 +10,8 @@ from sqlalchemy import select
 
 from spellbot.cogs import OwnerCog
 from spellbot.database import DatabaseSession
-from spellbot.models import Guild, User
+from spellbot.models import Guild, Token, User
+from spellbot.pool_stats import PoolStats
 
 if TYPE_CHECKING:
     from discord.ext import commands
@@ -239,11 +240,84 @@ class TestCogOwner:
             await run_owner_command(cog, cog.demote, context, str(target_user.id))
         assert "rolling back database session due to unhandled exception" in caplog.text
 
+    async def test_create_and_delete_token(
+        self,
+        bot: SpellBot,
+        context: commands.Context[SpellBot],
+    ) -> None:
+        cog = OwnerCog(bot)
+
+        await run_owner_command(cog, cog.create_token, context, "game,score")
+
+        token = (await DatabaseSession.execute(select(Token))).scalar_one()
+        assert token.scopes == "game,score"
+        context.author.send.assert_called_once_with(  # type: ignore
+            f"Created API token `{token.key}` with scopes `game,score`.",
+        )
+
+        context.author.send.reset_mock()  # type: ignore
+        await run_owner_command(cog, cog.delete_token, context, token.key)
+        context.author.send.assert_called_once_with("API token deleted.")  # type: ignore
+        DatabaseSession.expire_all()
+        token = (await DatabaseSession.execute(select(Token))).scalar_one()
+        assert token.deleted_at is not None
+
+        context.author.send.reset_mock()  # type: ignore
+        await run_owner_command(cog, cog.delete_token, context, token.key)
+        context.author.send.assert_called_once_with("No such API token.")  # type: ignore
+
+    async def test_create_token_defaults_to_all_scopes(
+        self,
+        bot: SpellBot,
+        context: commands.Context[SpellBot],
+    ) -> None:
+        cog = OwnerCog(bot)
+        await run_owner_command(cog, cog.create_token, context, None)
+        token = (await DatabaseSession.execute(select(Token))).scalar_one()
+        assert token.scopes == "*"
+
+    async def test_delete_token_without_target(
+        self,
+        bot: SpellBot,
+        context: commands.Context[SpellBot],
+    ) -> None:
+        cog = OwnerCog(bot)
+        await run_owner_command(cog, cog.delete_token, context, None)
+        context.author.send.assert_called_once_with("No target token.")  # type: ignore
+
+    async def test_create_and_delete_token_exceptions(
+        self,
+        bot: SpellBot,
+        context: commands.Context[SpellBot],
+        mocker: MockerFixture,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        cog = OwnerCog(bot)
+        error = AsyncMock(side_effect=RuntimeError())
+        mocker.patch("spellbot.cogs.owner_cog.create_api_token", error)
+        mocker.patch("spellbot.cogs.owner_cog.delete_api_token", error)
+
+        with pytest.raises(RuntimeError):
+            await run_owner_command(cog, cog.create_token, context, None)
+        assert "rolling back database session due to unhandled exception" in caplog.text
+
+        caplog.clear()
+
+        with pytest.raises(RuntimeError):
+            await run_owner_command(cog, cog.delete_token, context, "key")
+        assert "rolling back database session due to unhandled exception" in caplog.text
+
     async def test_stats(
         self,
         bot: SpellBot,
         context: commands.Context[SpellBot],
+        mocker: MockerFixture,
     ) -> None:
+        mocker.patch("spellbot.cogs.owner_cog.pool_snapshots", return_value=[])
+        mocker.patch(
+            "spellbot.cogs.owner_cog.format_scope_summary",
+            return_value="10 scopes, 4 untouched (40%)",
+        )
         cog = OwnerCog(bot)
 
         await run_owner_command(cog, cog.stats, context)
@@ -259,11 +333,32 @@ class TestCogOwner:
                     guilds:   0
                     users:    0
                     patrons:  set()
+                    sessions: 10 scopes, 4 untouched (40%)
                     ```
                 """,
             ),
         )
 
+    async def test_stats_with_pools(
+        self,
+        bot: SpellBot,
+        context: commands.Context[SpellBot],
+        mocker: MockerFixture,
+    ) -> None:
+        stats = PoolStats(name="primary", size=20, max_overflow=40)
+        stats.record_checkout(wait_ms=0.4, in_use=3, overflow=0, age_s=12.0)
+        stats.record_checkout(wait_ms=30.0, in_use=22, overflow=2, age_s=60.0)
+        mocker.patch("spellbot.cogs.owner_cog.pool_snapshots", return_value=[stats.snapshot()])
+        cog = OwnerCog(bot)
+
+        await run_owner_command(cog, cog.stats, context)
+
+        sent = context.author.send.call_args.args[0]  # type: ignore
+        assert sent.endswith(
+            "primary:  22/20 in use (peak 22), overflow 2/40 (peak 2), "
+            "wait p50 1ms p95 50ms max 30ms, age max 60s\n```",
+        )
+
     async def test_sync(
         self,
         bot: SpellBot,
@@ -4,6 +4,7 @@ import asyncio
 import contextvars
 import itertools
 import logging
+from contextlib import contextmanager
 from functools import partial
 from typing import TYPE_CHECKING, Any, Literal, cast, overload
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -14,7 +15,8 @@ import pytest
 import pytest_asyncio
 from click.testing import CliRunner
 from discord.ext import commands
-from sqlalchemy import create_engine, select, text
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import sessionmaker
 
 # Importing registers the audit.activity / audit.transaction tables on Base.metadata so they are
@@ -30,12 +32,19 @@ from spellbot.database import (
 from spellbot.database import (
     engine as async_engine,
 )
-from spellbot.models import Base, Queue
+from spellbot.models import Base, Game, Play, Queue, UserPlayWeek
 from spellbot.models import User as UserModel
+from spellbot.query_stats import query_scope
+from spellbot.services.apps import token_cache
+from spellbot.services.cohorts import cohort_cache
+from spellbot.services.games import game_detail_cache
 from spellbot.services.guilds import guild_cache
+from spellbot.services.plays import record_count_cache
 from spellbot.settings import Settings
 from spellbot.settings import settings as runtime_settings
 from spellbot.web import build_web_app
+from spellbot.web.icon_refresher import icon_fetch_attempts, icon_refresher
+from spellbot.web.response_cache import response_cache
 from tests.factories import (
     AlertFactory,
     BlockFactory,
@@ -56,7 +65,8 @@ from tests.factories import (
 from tests.mocks import build_author, build_channel, build_guild, build_interaction, build_message
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable, Generator
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+    from contextlib import AbstractContextManager
 
     from aiohttp import web
     from aiohttp.test_utils import TestClient
@@ -70,7 +80,8 @@ if TYPE_CHECKING:
     FreezeTimeFactory = FrozenDateTimeFactory | StepTickTimeFactory | TickingDateTimeFactory
 
     from spellbot import SpellBot
-    from spellbot.models import Channel, Game, Guild, User
+    from spellbot.models import Channel, Guild, User
+    from spellbot.query_stats import QueryStats
 
 logger = logging.getLogger(__name__)
 
@@ -132,6 +143,21 @@ async def run_command[CogT: commands.Cog, **CogCallbackP](
     return await callback(**kwargs)
 
 
+async def backfill_play_weeks() -> None:
+    """Record the play weeks of every started game, as the `user_play_weeks` migration does."""
+    await DatabaseSession.execute(
+        insert(UserPlayWeek)
+        .from_select(
+            ["user_xid", "week", "guild_xid"],
+            select(Play.user_xid, func.date_trunc("week", Game.started_at), Game.guild_xid)
+            .join(Game, Play.game_id == Game.id)
+            .where(Game.started_at.isnot(None))
+            .distinct(),
+        )
+        .on_conflict_do_nothing(),
+    )
+
+
 class Factories:
     alert = AlertFactory
     block = BlockFactory
@@ -495,6 +521,38 @@ def clear_guild_cache() -> None:
     guild_cache.clear()
 
 
+@pytest.fixture(autouse=True)
+def clear_game_detail_cache() -> None:
+    game_detail_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_record_count_cache() -> None:
+    record_count_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache() -> None:
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cohort_cache() -> None:
+    cohort_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> None:
+    token_cache.clear()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_icon_refresher() -> AsyncGenerator[None]:
+    icon_fetch_attempts.clear()
+    yield
+    await icon_refresher.close()
+
+
 @pytest.fixture(autouse=True)
 def allow_all_dms(request: pytest.FixtureRequest) -> Generator[None]:
     if "no_dm_limiter_patch" in request.keywords:
@@ -502,3 +560,25 @@ def allow_all_dms(request: pytest.FixtureRequest) -> Generator[None]:
         return
     with patch("spellbot.operations.try_consume_dm_slot", new=AsyncMock(return_value=True)):
         yield
+
+
+@pytest.fixture
+def statement_budget() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """
+    Fail the test if the wrapped code issues more than `limit` SQL statements.
+
+    Usage: `with statement_budget(30): await run_command(cog.lfg, interaction)`.
+    Every `db_session_manager()` scope opened inside counts towards the budget, so
+    a flow that starts hydrating models one row at a time fails here.
+    """
+
+    @contextmanager
+    def budget(limit: int) -> Generator[QueryStats]:
+        with query_scope() as stats:
+            yield stats
+        assert stats.statements <= limit, (
+            f"issued {stats.statements} SQL statements, budget is {limit}; "
+            f"most repeated: {stats.most_repeated()}"
+        )
+
+    return budget
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from sqlalchemy import delete
 
+from spellbot.database import DatabaseSession
+from spellbot.models import Token
 from spellbot.services import apps
+from spellbot.settings import settings
 
 if TYPE_CHECKING:
     from tests.fixtures import Factories
@@ -54,3 +59,33 @@ class TestServiceApps:
         """Test that a bad path doesn't crash and returns False."""
         token = factories.token.create(key="key", scopes="game")
         assert await apps.verify_token(token.key, "/bogus") is False
+
+    async def test_verify_token_is_cached(self, factories: Factories) -> None:
+        token = factories.token.create(key="cached_key", scopes="game")
+        assert await apps.verify_token(token.key, "/api/game/1/verify") is True
+
+        # Deleted behind the cache's back, the token is still trusted until it expires.
+        await DatabaseSession.execute(delete(Token))
+        await DatabaseSession.commit()
+        assert await apps.verify_token(token.key, "/api/game/1/verify") is True
+        assert apps.cached_token_scopes(token.key) == {"game"}
+
+    async def test_create_and_delete_token_invalidate_cache(self) -> None:
+        assert await apps.verify_token("new_key", "/api/game/1/verify") is False
+
+        data = await apps.create_token("new_key", scopes="game", note="convoke")
+        assert data.scopes == "game"
+        assert await apps.verify_token("new_key", "/api/game/1/verify") is True
+
+        assert await apps.delete_token("new_key") is True
+        assert await apps.verify_token("new_key", "/api/game/1/verify") is False
+        assert await apps.delete_token("new_key") is False
+
+    async def test_invalidations_are_published(self) -> None:
+        redis = AsyncMock()
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch("spellbot.services.apps.get_redis", AsyncMock(return_value=redis)),
+        ):
+            await apps.create_token("published_key")
+        redis.publish.assert_awaited_once_with(apps.TOKEN_INVALIDATIONS_CHANNEL, "published_key")
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from spellbot.services import cohorts
+from spellbot.web.dashboard_filters import GuildFilter
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+
+    from tests.fixtures import Factories
+
+pytestmark = pytest.mark.use_db
+
+# A Wednesday.
+NOW = datetime(2024, 6, 12, 12, 0, tzinfo=UTC)
+ALL_GUILDS = GuildFilter(mode="all", xid=None)
+
+
+def week(n: int) -> datetime:
+    """Return the naive start of the week `n` weeks before `NOW`'s."""
+    return datetime(2024, 6, 10) - timedelta(weeks=n)  # noqa: DTZ001
+
+
+class TestWeekStart:
+    def test_truncates_to_monday(self) -> None:
+        assert cohorts.week_start(NOW) == datetime(2024, 6, 10, tzinfo=UTC)
+
+    def test_monday_is_its_own_week(self) -> None:
+        monday = datetime(2024, 6, 10, tzinfo=UTC)
+        assert cohorts.week_start(monday) == monday
+
+
+@pytest.mark.asyncio
+class TestCohortMatrix:
+    async def test_counts_returners_by_cohort(self, factories: Factories) -> None:
+        factories.guild.create(xid=1, name="one")
+        alice = factories.user.create(xid=11, name="alice")
+        bob = factories.user.create(xid=12, name="bob")
+        await cohorts.record_play_weeks(1, [alice.xid], NOW - timedelta(weeks=2))
+        await cohorts.record_play_weeks(1, [alice.xid, bob.xid], NOW - timedelta(weeks=1))
+        await cohorts.record_play_weeks(1, [alice.xid, bob.xid], NOW)
+
+        cells = await cohorts.cohort_cells(ALL_GUILDS, None, None)
+
+        assert cells == {
+            (week(2), week(2)): 1,
+            (week(2), week(1)): 1,
+            (week(2), week(0)): 1,
+            (week(1), week(1)): 1,
+            (week(1), week(0)): 1,
+        }
+
+    async def test_guild_filter_scopes_cohorts(self, factories: Factories) -> None:
+        factories.guild.create(xid=1, name="one")
+        factories.guild.create(xid=2, name="two")
+        alice = factories.user.create(xid=11, name="alice")
+        await cohorts.record_play_weeks(2, [alice.xid], NOW - timedelta(weeks=1))
+        await cohorts.record_play_weeks(1, [alice.xid], NOW)
+
+        # Outside guild two alice first played this week.
+        excluding = GuildFilter(mode="exclude", xid=2)
+        assert await cohorts.cohort_cells(excluding, None, None) == {(week(0), week(0)): 1}
+        assert await cohorts.cohort_cells(ALL_GUILDS, None, None) == {
+            (week(1), week(1)): 1,
+            (week(1), week(0)): 1,
+        }
+
+    async def test_caches_completed_weeks(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        factories.guild.create(xid=1, name="one")
+        alice = factories.user.create(xid=11, name="alice")
+        await cohorts.record_play_weeks(1, [alice.xid], NOW - timedelta(weeks=1))
+        await cohorts.record_play_weeks(1, [alice.xid], NOW)
+        assert len(await cohorts.cohort_matrix(ALL_GUILDS)) == 2
+        assert cohorts.cohort_cache[ALL_GUILDS].complete_until == week(0)
+
+        # Completed weeks are served from the cache, only this week is counted again.
+        bob = factories.user.create(xid=12, name="bob")
+        await cohorts.record_play_weeks(1, [bob.xid], NOW - timedelta(weeks=1))
+        assert await cohorts.cohort_matrix(ALL_GUILDS) == {
+            (week(1), week(1)): 1,
+            (week(1), week(0)): 1,
+        }
+
+        # A week later only the week that just ended is added to the cache.
+        freezer.move_to(NOW + timedelta(weeks=1))
+        await cohorts.record_play_weeks(1, [alice.xid], NOW + timedelta(weeks=1))
+        matrix = await cohorts.cohort_matrix(ALL_GUILDS)
+        assert matrix[week(1), week(-1)] == 1
+        assert cohorts.cohort_cache[ALL_GUILDS].complete_until == week(-1)
+        assert set(cohorts.cohort_cache[ALL_GUILDS].cells) == {
+            (week(1), week(1)),
+            (week(1), week(0)),
+        }
+
+    async def test_cached_weeks_expire(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        factories.guild.create(xid=1, name="one")
+        alice = factories.user.create(xid=11, name="alice")
+        await cohorts.record_play_weeks(1, [alice.xid], NOW - timedelta(weeks=1))
+        assert await cohorts.cohort_matrix(ALL_GUILDS) == {(week(1), week(1)): 1}
+
+        # A completed week that changes shows up once the cache expires.
+        bob = factories.user.create(xid=12, name="bob")
+        await cohorts.record_play_weeks(1, [bob.xid], NOW - timedelta(weeks=1))
+        assert await cohorts.cohort_matrix(ALL_GUILDS) == {(week(1), week(1)): 1}
+        freezer.tick(timedelta(seconds=cohorts.COHORT_CACHE_TTL_S))
+        assert await cohorts.cohort_matrix(ALL_GUILDS) == {(week(1), week(1)): 2}
@@ -5,10 +5,14 @@ from typing import TYPE_CHECKING, Any
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import delete, update
 
+from spellbot.database import DatabaseSession
 from spellbot.enums import GameBracket, GameFormat, GameService
-from spellbot.services import dashboard
-from spellbot.web.dashboard_filters import GuildFilter, PeriodSpec, parse_period
+from spellbot.models import Game, RollupState
+from spellbot.services import dashboard, rollups
+from spellbot.web.dashboard_filters import GuildFilter, PeriodSpec, parse_guild, parse_period
+from tests.fixtures import backfill_play_weeks
 
 if TYPE_CHECKING:
     from freezegun.api import FrozenDateTimeFactory
@@ -946,6 +950,7 @@ class TestDashboardRules:
 class TestDashboardCohortRetention:
     async def test_cohorts_built_from_first_play_week(self, seed: Seed) -> None:
         del seed
+        await backfill_play_weeks()
         result = await dashboard.dashboard_cohort_retention(period_all(), all_guilds())
         assert result["max_weeks"] >= 0
         assert len(result["cohorts"]) >= 1
@@ -978,6 +983,7 @@ class TestDashboardCohortRetention:
         )
         factories.play.create(game_id=early.id, user_xid=user.xid, og_guild_xid=guild.xid)
         factories.play.create(game_id=late.id, user_xid=user.xid, og_guild_xid=guild.xid)
+        await backfill_play_weeks()
         result = await dashboard.dashboard_cohort_retention(
             period_all(),
             GuildFilter(mode="include", xid=int(guild.xid)),
@@ -990,6 +996,7 @@ class TestDashboardCohortRetention:
 
     async def test_bounded_period_applies_filter(self, seed: Seed) -> None:
         del seed
+        await backfill_play_weeks()
         result = await dashboard.dashboard_cohort_retention(period_30d(), all_guilds())
         assert isinstance(result["cohorts"], list)
 
@@ -1382,3 +1389,103 @@ class TestDashboardActiveQueues:
     async def test_empty(self) -> None:
         result = await dashboard.dashboard_active_queues(period_all(), all_guilds())
         assert result == {"rows": []}
+
+
+@pytest_asyncio.fixture
+async def history(factories: Factories, freezer: FrozenDateTimeFactory) -> None:
+    """Seed five weeks of varied games, a few hours apart, across two guilds."""
+    freezer.move_to(NOW)
+    guilds = [factories.guild.create(xid=960001 + i, name=f"History {i}") for i in range(2)]
+    channels = [
+        factories.channel.create(xid=961001 + i, name=f"history-{i}", guild=guild)
+        for i, guild in enumerate(guilds)
+    ]
+    users = [factories.user.create(xid=860001 + i, name=f"player{i}") for i in range(6)]
+    formats = [GameFormat.COMMANDER, GameFormat.CEDH, GameFormat.MODERN]
+    services = [GameService.SPELLTABLE, GameService.CONVOKE, GameService.TABLE_STREAM]
+    brackets = list(GameBracket)
+    for i in range(120):
+        started = NOW - timedelta(hours=7 * i + 1)
+        expired = i % 9 == 0
+        game = factories.game.create(
+            guild=guilds[i % 2],
+            channel=channels[i % 2],
+            created_at=started - timedelta(minutes=3 + i % 50),
+            started_at=None if expired else started,
+            deleted_at=started if expired or i % 11 == 0 else None,
+            format=formats[i % 3].value,
+            bracket=brackets[i % len(brackets)].value,
+            service=services[i % 4 % 3].value,
+            seats=2 if i % 5 == 0 else 4,
+            voice_xid=970000 + i if i % 4 == 0 else None,
+            blind=i % 6 == 0,
+        )
+        if not expired:
+            for user in users[i % 5 : i % 5 + 2]:
+                factories.play.create(
+                    game_id=game.id,
+                    user_xid=user.xid,
+                    og_guild_xid=guilds[i % 2].xid,
+                )
+
+
+ROLLUP_PANELS = [
+    dashboard.dashboard_summary,
+    dashboard.dashboard_totals,
+    dashboard.dashboard_users_activity,
+    dashboard.dashboard_games,
+    dashboard.dashboard_service_popularity,
+    dashboard.dashboard_hour_of_day,
+    dashboard.dashboard_day_of_week,
+    dashboard.dashboard_activity_heatmap,
+    dashboard.dashboard_popular_formats,
+    dashboard.dashboard_popular_seats,
+    dashboard.dashboard_avg_wait_time,
+    dashboard.dashboard_voice_adoption,
+    dashboard.dashboard_blind_adoption,
+]
+
+
+@pytest.mark.asyncio
+class TestDashboardRollupParity:
+    @pytest.mark.parametrize("period", ["7d", "30d", "180d", "all"])
+    @pytest.mark.parametrize("guild", ["all", "960001", "not:960001"])
+    async def test_rollups_match_raw_queries(
+        self,
+        history: None,
+        period: str,
+        guild: str,
+    ) -> None:
+        del history
+        spec = parse_period(period)
+        opts = parse_guild(guild)
+        raw = [await panel(spec, opts) for panel in ROLLUP_PANELS]
+
+        assert await rollups.refresh() > 0
+        window = await rollups.rollup_window(spec.start_dt)
+        assert window.covered_until == NOW.replace(hour=0)
+
+        assert [await panel(spec, opts) for panel in ROLLUP_PANELS] == raw
+
+    async def test_changed_games_stay_in_parity(
+        self,
+        history: None,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        del history
+        spec = parse_period("30d")
+        opts = parse_guild("all")
+        await rollups.refresh()
+
+        freezer.move_to(NOW + timedelta(hours=1))
+        old = NOW - timedelta(days=3)
+        await DatabaseSession.execute(
+            update(Game)
+            .where(Game.started_at < old, Game.started_at >= old - timedelta(days=1))
+            .values(format=GameFormat.PAUPER.value, seats=3),
+        )
+        await rollups.refresh()
+        rolled_up = [await panel(spec, opts) for panel in ROLLUP_PANELS]
+
+        await DatabaseSession.execute(delete(RollupState))
+        assert [await panel(spec, opts) for panel in ROLLUP_PANELS] == rolled_up
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
 from sqlalchemy import select
@@ -8,7 +11,17 @@ from sqlalchemy.sql.expression import and_
 
 from spellbot.database import DatabaseSession
 from spellbot.enums import GameBracket, GameFormat, GameService
-from spellbot.models import Channel, Game, GameStatus, Guild, Play, Post, Queue, User
+from spellbot.models import (
+    Channel,
+    Game,
+    GameStatus,
+    Guild,
+    Play,
+    Post,
+    Queue,
+    User,
+    UserPlayWeek,
+)
 from spellbot.services import games
 from spellbot.settings import settings
 from tests.factories import (
@@ -16,11 +29,18 @@ from tests.factories import (
     ChannelFactory,
     GameFactory,
     GuildFactory,
+    PlayFactory,
     PostFactory,
     UserFactory,
     WatchFactory,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from contextlib import AbstractContextManager
+
+    from spellbot.query_stats import QueryStats
+
 pytestmark = pytest.mark.use_db
 
 
@@ -149,6 +169,17 @@ class TestServiceGames:
         assert found.password == "whatever"
         assert found.status == GameStatus.STARTED.value
 
+    async def test_games_make_ready_records_play_weeks(self, game: Game) -> None:
+        users = [UserFactory.create(game=game) for _ in range(2)]
+        game_data = await games.get(game.id)  # type: ignore
+        assert game_data is not None
+        await games.make_ready(game_data, None, None, pins=["1111", "2222"])
+
+        weeks = (await DatabaseSession.execute(select(UserPlayWeek))).scalars().all()
+        assert {week.user_xid for week in weeks} == {user.xid for user in users}
+        assert {week.guild_xid for week in weeks} == {game.guild_xid}
+        assert {week.week.weekday() for week in weeks} == {0}
+
     async def test_games_shrink_game(self, game: Game) -> None:
         UserFactory.create(game=game)
         UserFactory.create(game=game)
@@ -865,3 +896,99 @@ class TestServiceGamesGuildWar:
 
         assert new
         assert second_id != first_id
+
+
+@pytest.mark.asyncio
+class TestGameDetailView:
+    async def test_reads_everything_in_one_statement(
+        self,
+        game: Game,
+        statement_budget: Callable[[int], AbstractContextManager[QueryStats]],
+    ) -> None:
+        player = UserFactory.create(name="player")
+        PlayFactory.create(game_id=game.id, user_xid=player.xid, og_guild_xid=game.guild_xid)
+        queued = UserFactory.create(name="queued", game=game)
+
+        with statement_budget(1):
+            detail = await games.game_detail_view(game.id)  # type: ignore[arg-type]
+
+        assert detail is not None
+        assert detail["guild"]["xid"] == game.guild_xid
+        assert detail["channel"]["xid"] == game.channel_xid
+        assert len(detail["posts"]) == 1
+        assert [(p["user_xid"], p["user_name"]) for p in detail["plays"]] == [
+            (player.xid, "player"),
+        ]
+        assert [(q["user_xid"], q["user_name"]) for q in detail["queued"]] == [
+            (queued.xid, "queued"),
+        ]
+
+    async def test_missing_game(self) -> None:
+        assert await games.game_detail_view(404) is None
+
+    async def test_caches_started_games_until_they_change(
+        self,
+        guild: Guild,
+        channel: Channel,
+    ) -> None:
+        game = GameFactory.create(guild=guild, channel=channel, status=GameStatus.STARTED.value)
+        redis = AsyncMock()
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch("spellbot.services.games.get_redis", AsyncMock(return_value=redis)),
+        ):
+            detail = await games.game_detail_view(game.id)
+            assert detail is not None
+            assert await games.game_detail_view(game.id) is detail
+
+            await games.set_metadata(game.id, {"source": "convoke"})
+            detail = await games.game_detail_view(game.id)
+            assert detail is not None
+            assert detail["metadata"] == {"source": "convoke"}
+
+            game_data = await games.get(game.id)
+            assert game_data is not None
+            await games.set_voice(game_data, voice_xid=12345)
+
+        channel_name = games.GAME_DETAIL_INVALIDATIONS_CHANNEL
+        assert redis.publish.await_args_list == [call(channel_name, str(game.id))] * 2
+        assert game.id not in games.game_detail_cache
+
+    async def test_does_not_cache_without_redis(self, guild: Guild, channel: Channel) -> None:
+        game = GameFactory.create(guild=guild, channel=channel, status=GameStatus.STARTED.value)
+        with patch.object(settings, "REDIS_URL", None):
+            await games.game_detail_view(game.id)
+        assert game.id not in games.game_detail_cache
+
+    async def test_does_not_cache_pending_games(self, game: Game) -> None:
+        with patch.object(settings, "REDIS_URL", "redis://localhost"):
+            await games.game_detail_view(game.id)  # type: ignore[arg-type]
+        assert game.id not in games.game_detail_cache
+
+    async def test_drops_views_changed_elsewhere(self) -> None:
+        games.game_detail_cache[1] = ({}, 0.0)
+        games.game_detail_cache[2] = ({}, 0.0)
+        messages = [{"type": "subscribe", "data": 1}]
+
+        async def listen() -> AsyncIterator[dict[str, Any]]:
+            for message in messages:
+                yield message
+            # A view cached while subscribed is dropped once another process changes it.
+            games.game_detail_cache[2] = ({}, 0.0)
+            yield {"type": "message", "data": b"2"}
+            raise asyncio.CancelledError
+
+        pubsub = MagicMock()
+        pubsub.__aenter__.return_value = pubsub
+        pubsub.subscribe = AsyncMock()
+        pubsub.listen = listen
+        redis = MagicMock()
+        redis.pubsub.return_value = pubsub
+        with (
+            patch("spellbot.services.games.get_redis", AsyncMock(return_value=redis)),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await games.watch_game_detail_invalidations()
+
+        pubsub.subscribe.assert_awaited_once_with(games.GAME_DETAIL_INVALIDATIONS_CHANNEL)
+        assert games.game_detail_cache == {}
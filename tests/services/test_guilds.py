@@ -224,21 +224,19 @@ class TestServiceGuilds:
         assert refreshed
         assert refreshed.icon is None
 
-    async def test_guilds_set_icon(self) -> None:
-        guild = GuildFactory.create(icon=None)
+    async def test_guilds_set_icons(self) -> None:
+        first = GuildFactory.create(icon=None)
+        second = GuildFactory.create(icon="https://cdn.discordapp.com/icons/307/old.png")
+        untouched = GuildFactory.create(icon=None)
 
         url = "https://cdn.discordapp.com/icons/306/feedface.png"
-        await guilds.set_icon(guild.xid, url)
+        await guilds.set_icons({first.xid: url, second.xid: None})
         DatabaseSession.expire_all()
-        refreshed = await DatabaseSession.get(Guild, guild.xid)
-        assert refreshed
-        assert refreshed.icon == url
-
-        await guilds.set_icon(guild.xid, None)
-        DatabaseSession.expire_all()
-        refreshed = await DatabaseSession.get(Guild, guild.xid)
-        assert refreshed
-        assert refreshed.icon is None
+        icons = {
+            guild.xid: guild.icon
+            for guild in (await DatabaseSession.execute(select(Guild))).scalars()
+        }
+        assert icons == {first.xid: url, second.xid: None, untouched.xid: None}
 
     async def test_guilds_award_add(self) -> None:
         discord_guild = MagicMock()
@@ -6,8 +6,9 @@ from typing import TYPE_CHECKING
 import pytest
 import pytest_asyncio
 
+from spellbot.database import read_only_engine
 from spellbot.enums import GameFormat
-from spellbot.models import GameStatus
+from spellbot.models import Game, GameStatus
 from spellbot.services import plays
 
 if TYPE_CHECKING:
@@ -348,7 +349,7 @@ class TestPlaysServiceRecords:
 
         result = await plays.user_records(user_xid=user.xid)
         assert result is not None
-        rows, total = result
+        rows, total = result.rows, result.total
         assert total == 1
         assert len(rows) == 1
         assert rows[0]["channel"] == channel.xid
@@ -387,7 +388,7 @@ class TestPlaysServiceRecords:
 
         result = await plays.channel_records(guild_xid=guild.xid, channel_xid=channel.xid)
         assert result is not None
-        rows, total = result
+        rows, total = result.rows, result.total
         assert total == 1
         assert len(rows) == 1
         assert rows[0]["channel"] == channel.xid
@@ -397,6 +398,173 @@ class TestPlaysServiceRecords:
         assert "locale" in rows[0]
 
 
+@pytest.mark.asyncio
+class TestPlaysServiceRecordsPaging:
+    """Tests for keyset pagination of the records listings."""
+
+    @staticmethod
+    def seed_channel(factories: Factories, games: int) -> tuple[int, int]:
+        guild = factories.guild.create(xid=8601, name="kp-guild")
+        channel = factories.channel.create(xid=8701, name="kp-channel", guild=guild)
+        user = factories.user.create(xid=8801, name="kp-user")
+        base = datetime(2024, 1, 1, tzinfo=UTC)
+        for i in range(games):
+            # Pairs of games share a timestamp so ties must be broken by game id.
+            when = base + timedelta(hours=i // 2)
+            game = factories.game.create(
+                guild=guild,
+                channel=channel,
+                seats=2 + i % 3,
+                status=GameStatus.STARTED.value,
+                created_at=when,
+                updated_at=when,
+            )
+            factories.post.create(guild=guild, channel=channel, game=game, message_xid=9600 + i)
+            factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+        return guild.xid, channel.xid
+
+    @pytest.mark.parametrize(
+        ("sort_by", "sort_dir"),
+        [
+            pytest.param(sort_by, sort_dir, id=f"{sort_by}-{sort_dir}")
+            for sort_by in plays.CHANNEL_RECORDS_SORT_COLUMNS
+            for sort_dir in ("asc", "desc")
+        ],
+    )
+    async def test_channel_pages_cover_every_game_once(
+        self,
+        factories: Factories,
+        sort_by: str,
+        sort_dir: str,
+    ) -> None:
+        guild_xid, channel_xid = self.seed_channel(factories, 25)
+        opts = plays.RecordFilters(sort_by=sort_by, sort_dir=sort_dir)
+
+        seen: list[int] = []
+        pages: list[plays.RecordsPage] = []
+        cursor = None
+        while True:
+            page = await plays.channel_records(guild_xid, channel_xid, cursor, opts)
+            assert page is not None
+            assert page.total == 25
+            pages.append(page)
+            seen.extend(row["id"] for row in page.rows)
+            if page.next_cursor is None:
+                break
+            cursor = plays.decode_cursor(page.next_cursor, opts)
+
+        assert [len(p.rows) for p in pages] == [10, 10, 5]
+        assert len(seen) == len(set(seen)) == 25
+        assert pages[0].prev_cursor is None
+        assert pages[-1].prev_cursor is not None
+
+        # Paging backwards from the last page returns exactly the page before it.
+        assert pages[-1].prev_cursor is not None
+        back = await plays.channel_records(
+            guild_xid,
+            channel_xid,
+            plays.decode_cursor(pages[-1].prev_cursor, opts),
+            opts,
+        )
+        assert back is not None
+        assert [row["id"] for row in back.rows] == [row["id"] for row in pages[1].rows]
+        assert back.next_cursor is not None
+        assert back.prev_cursor is not None
+
+    async def test_user_pages(self, factories: Factories) -> None:
+        self.seed_channel(factories, plays.USER_PAGE_SIZE + 3)
+        opts = plays.RecordFilters(sort_by="guild_name", sort_dir="asc")
+
+        first = await plays.user_records(8801, opts=opts)
+        assert first is not None
+        assert len(first.rows) == plays.USER_PAGE_SIZE
+        assert first.prev_cursor is None
+        assert first.next_cursor is not None
+
+        second = await plays.user_records(8801, plays.decode_cursor(first.next_cursor, opts), opts)
+        assert second is not None
+        assert len(second.rows) == 3
+        assert second.next_cursor is None
+        assert {row["id"] for row in first.rows}.isdisjoint(row["id"] for row in second.rows)
+
+    async def test_total_is_cached(self, factories: Factories) -> None:
+        guild = factories.guild.create(xid=8602, name="kp-guild2")
+        channel = factories.channel.create(xid=8702, name="kp-channel2", guild=guild)
+        user = factories.user.create(xid=8802, name="kp-user2")
+
+        def add_game(message_xid: int) -> None:
+            game = factories.game.create(
+                guild=guild,
+                channel=channel,
+                status=GameStatus.STARTED.value,
+            )
+            factories.post.create(guild=guild, channel=channel, game=game, message_xid=message_xid)
+            factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+
+        add_game(9698)
+        page = await plays.channel_records(guild.xid, channel.xid)
+        assert page is not None
+        assert (len(page.rows), page.total) == (1, 1)
+
+        # A new game is listed straight away, but the total is served from the cache.
+        add_game(9699)
+        page = await plays.channel_records(guild.xid, channel.xid)
+        assert page is not None
+        assert (len(page.rows), page.total) == (2, 1)
+
+        plays.record_count_cache.clear()
+        page = await plays.channel_records(guild.xid, channel.xid)
+        assert page is not None
+        assert page.total == 2
+
+    async def test_count_cache_is_bounded(
+        self,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(plays, "RECORD_COUNT_CACHE_SIZE", 2)
+        sql = "SELECT CAST(:n AS INTEGER)"
+
+        for n in range(3):
+            assert await plays.cached_count(sql, {"n": n}) == n
+        # The oldest entry made way for the newest.
+        assert [key[1] for key in plays.record_count_cache] == [(("n", 1),), (("n", 2),)]
+
+        # Expired entries are dropped as soon as anything new is cached.
+        freezer.tick(plays.RECORD_COUNT_TTL_S)
+        await plays.cached_count(sql, {"n": 3})
+        assert [key[1] for key in plays.record_count_cache] == [(("n", 3),)]
+
+
+class TestRecordCursors:
+    """Tests for encoding and decoding the opaque records page cursors."""
+
+    def test_round_trip(self) -> None:
+        opts = plays.RecordFilters()
+        when = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+        cursor = plays.RecordCursor("updated_at", "desc", when, 42)
+        assert plays.decode_cursor(plays.encode_cursor(cursor), opts) == cursor
+
+    def test_round_trip_before(self) -> None:
+        opts = plays.RecordFilters(sort_by="guild_name", sort_dir="asc")
+        cursor = plays.RecordCursor("guild_name", "asc", "a guild", 7, before=True)
+        assert plays.decode_cursor(plays.encode_cursor(cursor), opts) == cursor
+
+    def test_other_sort_is_ignored(self) -> None:
+        cursor = plays.RecordCursor("seats", "desc", 4, 42)
+        opts = plays.RecordFilters(sort_by="seats", sort_dir="asc")
+        assert plays.decode_cursor(plays.encode_cursor(cursor), opts) is None
+
+    @pytest.mark.parametrize("token", ["", "not base64!", "bm90IGpzb24", "WzEsMiwzXQ"])
+    def test_junk_is_ignored(self, token: str) -> None:
+        assert plays.decode_cursor(token, plays.RecordFilters()) is None
+
+    def test_bad_value_is_ignored(self) -> None:
+        cursor = plays.RecordCursor("seats", "desc", "four", 42)
+        opts = plays.RecordFilters(sort_by="seats")
+        assert plays.decode_cursor(plays.encode_cursor(cursor), opts) is None
+
+
 @pytest.mark.asyncio
 class TestPlaysServiceStreamingExports:
     """Tests for the streaming export helpers and target-existence validators."""
@@ -509,6 +677,52 @@ class TestPlaysServiceStreamingExports:
         assert rows[0]["channel_name"] == channel.name
         assert rows[0]["user_xid"] == str(user.xid)
 
+    async def test_stream_channel_records_across_batches(
+        self,
+        factories: Factories,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        # Fetch two rows per round trip so the export spans several cursor batches.
+        monkeypatch.setattr(plays, "EXPORT_YIELD_PER", 2)
+        guild = factories.guild.create(xid=8408, name="sb-guild")
+        channel = factories.channel.create(xid=8508, name="sb-channel", guild=guild)
+        users = [factories.user.create(xid=8608 + i, name=f"sb-user{i}") for i in range(2)]
+        for i in range(5):
+            game = factories.game.create(
+                guild=guild,
+                channel=channel,
+                status=GameStatus.STARTED.value,
+            )
+            factories.post.create(guild=guild, channel=channel, game=game, message_xid=9200 + i)
+            for user in users:
+                factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+
+        stream = plays.stream_channel_records(guild_xid=guild.xid, channel_xid=channel.xid)
+        rows = [r async for r in stream]
+        assert len(rows) == 10
+        assert len({r["id"] for r in rows}) == 5
+
+    async def test_stream_closed_early(self, factories: Factories) -> None:
+        guild = factories.guild.create(xid=8409, name="se-guild")
+        channel = factories.channel.create(xid=8509, name="se-channel", guild=guild)
+        user = factories.user.create(xid=8610, name="se-user")
+        for i in range(3):
+            game = factories.game.create(
+                guild=guild,
+                channel=channel,
+                status=GameStatus.STARTED.value,
+            )
+            factories.post.create(guild=guild, channel=channel, game=game, message_xid=9300 + i)
+            factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+
+        # Abandoning an export part way through (say, the client went away) releases
+        # its cursor and connection when the stream is closed.
+        stream = plays.stream_user_records(user_xid=user.xid)
+        assert (await anext(stream))["channel"] == channel.xid
+        streaming = read_only_engine.pool.checkedout()
+        await stream.aclose()
+        assert read_only_engine.pool.checkedout() == streaming - 1
+
 
 class TestRulesHelpers:
     """Tests for normalize_rule and extract_ngrams helper functions."""
@@ -537,3 +751,66 @@ class TestRulesHelpers:
         result = plays.extract_ngrams("no proxies allowed here", 3)
         assert "no proxies allowed" in result
         assert "proxies allowed here" in result
+
+
+@pytest.mark.asyncio
+class TestRuleFrequencies:
+    async def test_matches_python_helpers(self, factories: Factories) -> None:
+        guild = factories.guild.create(xid=8411, name="rf-guild")
+        channel = factories.channel.create(xid=8511, name="rf-channel", guild=guild)
+        rules = [
+            "No Proxies Allowed!",
+            "  no   proxies\tallowed.. ",
+            "no proxies allowed, please",
+            "a b (no) 'proxies' x allowed",
+            "rule ! !",
+            "...",
+        ]
+        for rule in rules:
+            factories.game.create(
+                guild=guild,
+                channel=channel,
+                started_at=datetime.now(tz=UTC),
+                rules=rule,
+            )
+
+        result = await plays.analytics_rules(guild.xid)
+
+        normalized = [plays.normalize_rule(rule) for rule in rules]
+        expected_rules: dict[str, int] = {}
+        expected_ngrams: dict[str, int] = {}
+        for rule in filter(None, normalized):
+            expected_rules[rule] = expected_rules.get(rule, 0) + 1
+            for phrase in plays.extract_ngrams(rule, 2) + plays.extract_ngrams(rule, 3):
+                expected_ngrams[phrase] = expected_ngrams.get(phrase, 0) + 1
+        assert {r["rule"]: r["count"] for r in result["top_rules"]} == expected_rules
+        assert {r["phrase"]: r["count"] for r in result["rule_ngrams"]} == expected_ngrams
+        assert result["top_rules"][0] == {"rule": "no proxies allowed", "count": 2}
+        assert result["rule_ngrams"][0] == {"phrase": "no proxies", "count": 4}
+
+    async def test_keeps_only_the_top_phrases(self, factories: Factories) -> None:
+        guild = factories.guild.create(xid=8412, name="rt-guild")
+        channel = factories.channel.create(xid=8512, name="rt-channel", guild=guild)
+        for rule in ("zz yy", "bb cc", "aa bb", "zz yy"):
+            factories.game.create(
+                guild=guild,
+                channel=channel,
+                started_at=datetime.now(tz=UTC),
+                rules=rule,
+            )
+
+        result = await plays.rule_frequencies(
+            [Game.guild_xid == guild.xid],
+            rules=2,
+            ngrams=2,
+        )
+
+        # Ties are broken alphabetically.
+        assert result["top_rules"] == [
+            {"rule": "zz yy", "count": 2},
+            {"rule": "aa bb", "count": 1},
+        ]
+        assert result["rule_ngrams"] == [
+            {"phrase": "zz yy", "count": 2},
+            {"phrase": "aa bb", "count": 1},
+        ]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from spellbot.enums import GameBracket, GameFormat
+from spellbot.services import games
+from spellbot.services.queue_events import QUEUE_EVENTS_CHANNEL, QueueEventType, game_changed
+from spellbot.settings import settings
+from tests.factories import UserFactory
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from spellbot.models import Game
+
+pytestmark = pytest.mark.use_db
+
+
+@pytest.fixture
+def redis() -> Iterator[MagicMock]:
+    redis = MagicMock()
+    redis.pipeline.return_value.execute = AsyncMock()
+    with (
+        patch.object(settings, "REDIS_URL", "redis://localhost"),
+        patch("spellbot.services.queue_events.get_redis", AsyncMock(return_value=redis)),
+    ):
+        yield redis
+
+
+def published(redis: MagicMock) -> list[dict[str, object]]:
+    calls = redis.pipeline.return_value.publish.call_args_list
+    assert all(call.args[0] == QUEUE_EVENTS_CHANNEL for call in calls)
+    return [json.loads(call.args[1]) for call in calls]
+
+
+@pytest.mark.asyncio
+class TestGameChanged:
+    async def test_publishes_seats_and_players(self, game: Game, redis: MagicMock) -> None:
+        UserFactory.create(game=game)
+
+        await game_changed(QueueEventType.SEAT, [game.id])  # type: ignore[list-item]
+
+        assert published(redis) == [
+            {
+                "type": "seat",
+                "game_id": game.id,
+                "guild_xid": game.guild_xid,
+                "format": str(GameFormat(game.format)),
+                "bracket": str(GameBracket(game.bracket)),
+                "language": "English",
+                "seats": game.seats,
+                "players": 1,
+            },
+        ]
+        redis.pipeline.return_value.execute.assert_awaited_once()
+
+    async def test_without_redis_does_nothing(self, game: Game) -> None:
+        get_redis = AsyncMock()
+        with (
+            patch.object(settings, "REDIS_URL", None),
+            patch("spellbot.services.queue_events.get_redis", get_redis),
+        ):
+            await game_changed(QueueEventType.SEAT, [game.id])  # type: ignore[list-item]
+        get_redis.assert_not_called()
+
+    async def test_redis_errors_are_swallowed(self, game: Game, redis: MagicMock) -> None:
+        redis.pipeline.return_value.execute.side_effect = RedisError("down")
+        await game_changed(QueueEventType.SEAT, [game.id])  # type: ignore[list-item]
+
+    async def test_games_write_paths_publish(self, game: Game, redis: MagicMock) -> None:
+        user = UserFactory.create()
+        game_data = await games.get(game.id)  # type: ignore[arg-type]
+        assert game_data is not None
+
+        await games.add_player(game_data, user.xid)
+        await games.dequeue_players([user.xid])
+        await games.delete_games([game.id])  # type: ignore[list-item]
+
+        events = published(redis)
+        assert [(e["type"], e["players"]) for e in events] == [
+            ("seat", 1),
+            ("seat", 0),
+            ("expired", 0),
+        ]
@@ -337,6 +337,15 @@ class TestOnlyMemberOfFilter:
         none_rows = await queues.public_active_queues(only_member_of=999)
         assert none_rows == []
 
+    async def test_member_guild_xids(self, factories: Factories) -> None:
+        mine = factories.guild.create(xid=977201, name="Mine")
+        factories.guild.create(xid=977202, name="Theirs")
+        me = factories.user.create(xid=877201, name="me")
+        factories.guild_member.create(user_xid=me.xid, guild_xid=mine.xid)
+
+        assert await queues.member_guild_xids(me.xid) == {mine.xid}
+        assert await queues.member_guild_xids(999) == set()
+
 
 @pytest.mark.asyncio
 class TestOnlyMythicTrackFilter:
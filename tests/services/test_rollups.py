@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sqlalchemy import delete, func, select, text, update
+
+from spellbot.database import DatabaseSession, engine
+from spellbot.models import Game, GuildDailyRollup, Play, RollupState
+from spellbot.services import dashboard, rollups
+from spellbot.web.dashboard_filters import GuildFilter, parse_period
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+
+    from tests.fixtures import Factories
+
+pytestmark = pytest.mark.use_db
+
+NOW = datetime(2024, 6, 15, 12, 0, tzinfo=UTC)
+TODAY = datetime(2024, 6, 15, tzinfo=UTC)
+ALL_GUILDS = GuildFilter(mode="all", xid=None)
+
+
+def day(n: int) -> datetime:
+    """Return midnight `n` days before today."""
+    return TODAY - timedelta(days=n)
+
+
+class TestRollupWindow:
+    def test_without_rollups_everything_is_live(self) -> None:
+        start = NOW - timedelta(days=30)
+        assert rollups.RollupWindow(start).raw_ranges() == [(start, None)]
+
+    def test_partial_first_day_is_live(self) -> None:
+        start = NOW - timedelta(days=30)
+        window = rollups.RollupWindow(start, day(29), TODAY)
+        assert window.raw_ranges() == [(start, day(29)), (TODAY, None)]
+
+    def test_all_time_reads_only_since_last_refresh_live(self) -> None:
+        window = rollups.RollupWindow(None, None, TODAY)
+        assert window.raw_ranges() == [(TODAY, None)]
+
+
+class TestDayRuns:
+    def test_collapses_consecutive_days(self) -> None:
+        days = [day(1), day(5), day(2), day(4), day(1)]
+        assert rollups.day_runs(days) == [(day(5), day(3)), (day(2), day(0))]
+
+    def test_splits_long_runs(self) -> None:
+        days = [day(n) for n in range(1, 41)]
+        runs = rollups.day_runs(days)
+        assert [hi - lo for lo, hi in runs] == [timedelta(days=31), timedelta(days=9)]
+        assert runs[0][0] == day(40)
+        assert runs[-1][1] == day(0)
+
+
+@pytest.mark.asyncio
+class TestRollupWindowLookup:
+    async def test_no_rollups(self) -> None:
+        start = NOW - timedelta(days=7)
+        assert await rollups.rollup_window(start) == rollups.RollupWindow(start)
+
+    async def test_rounds_start_up_to_whole_day(self, freezer: FrozenDateTimeFactory) -> None:
+        freezer.move_to(NOW)
+        await rollups.refresh()
+        start = NOW - timedelta(days=7)
+        window = await rollups.rollup_window(start)
+        assert window == rollups.RollupWindow(start, day(6), TODAY)
+
+    async def test_start_after_rollups_is_all_live(self, freezer: FrozenDateTimeFactory) -> None:
+        freezer.move_to(NOW)
+        await rollups.refresh()
+        start = NOW - timedelta(hours=6)
+        assert await rollups.rollup_window(start) == rollups.RollupWindow(start)
+
+
+@pytest.mark.asyncio
+class TestRefresh:
+    async def seed(self, factories: Factories) -> list[Game]:
+        guild = factories.guild.create(xid=970001, name="Rollups")
+        channel = factories.channel.create(xid=971001, name="rollups", guild=guild)
+        user = factories.user.create(xid=870001, name="roller")
+        seeded = []
+        for days_ago in (10, 3, 3, 0):
+            started = NOW - timedelta(days=days_ago, hours=1)
+            game = factories.game.create(
+                guild=guild,
+                channel=channel,
+                created_at=started - timedelta(minutes=10),
+                started_at=started,
+                # Column defaults read the real clock rather than the frozen one.
+                updated_at=started,
+            )
+            factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+            seeded.append(game)
+        return seeded
+
+    async def started_total(self) -> int:
+        rows = await DatabaseSession.execute(
+            select(func.sum(GuildDailyRollup.value)).where(
+                GuildDailyRollup.metric == rollups.RollupMetric.STARTED.value,
+            ),
+        )
+        return int(rows.scalar() or 0)
+
+    async def test_nothing_to_roll_up(self, freezer: FrozenDateTimeFactory) -> None:
+        freezer.move_to(NOW)
+        assert await rollups.refresh() == 0
+        state = await DatabaseSession.get(RollupState, rollups.ROLLUP_NAME)
+        assert state is not None
+        assert state.covered_until == TODAY.replace(tzinfo=None)
+
+    async def test_first_refresh_backfills_whole_days(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        await self.seed(factories)
+        assert await rollups.refresh() == 10
+        # Today's game is still counted live rather than rolled up.
+        assert await self.started_total() == 3
+
+    async def test_later_refreshes_only_recompute_changed_days(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW - timedelta(hours=1))
+        seeded = await self.seed(factories)
+        freezer.move_to(NOW)
+        await rollups.refresh()
+
+        freezer.move_to(NOW + timedelta(hours=1))
+        assert await rollups.refresh() == 0
+
+        # Expiring the oldest game touches the day it was created on.
+        expired_at = datetime.now(tz=UTC)
+        await DatabaseSession.execute(
+            update(Game)
+            .where(Game.id == seeded[0].id)
+            .values(deleted_at=expired_at, updated_at=expired_at),
+        )
+        freezer.move_to(NOW + timedelta(hours=1, minutes=10))
+        assert await rollups.refresh() == 1
+
+        # A day later the seeded day has ended, so it gets rolled up too.
+        freezer.move_to(NOW + timedelta(days=1))
+        assert await rollups.refresh() == 1
+        assert await self.started_total() == 4
+
+    async def test_holds_the_lock_until_done(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        freezer.move_to(NOW)
+        await self.seed(factories)
+        refresh_range = rollups.refresh_range
+        attempts: list[bool] = []
+
+        async def refresh_range_elsewhere(lo: datetime, hi: datetime) -> None:
+            await refresh_range(lo, hi)
+            async with engine.connect() as conn:
+                lock = text("SELECT pg_try_advisory_xact_lock(:key)")
+                attempts.append(
+                    bool((await conn.execute(lock, {"key": rollups.ROLLUP_LOCK_KEY})).scalar())
+                )
+
+        monkeypatch.setattr(rollups, "refresh_range", refresh_range_elsewhere)
+        assert await rollups.refresh() == 10
+        assert attempts == [False]
+
+    async def test_failed_refresh_keeps_previous_rollups(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        freezer.move_to(NOW)
+        await self.seed(factories)
+        await rollups.refresh()
+        await DatabaseSession.execute(delete(RollupState))
+
+        def broken_selects(lo: datetime, hi: datetime) -> list[Any]:
+            raise RuntimeError
+
+        # The rolled-up days are deleted before the insert that fails.
+        monkeypatch.setattr(rollups, "metric_selects", broken_selects)
+        with pytest.raises(RuntimeError):
+            await rollups.refresh()
+        assert await self.started_total() == 3
+
+    async def test_panels_read_from_rollups(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        await self.seed(factories)
+        await rollups.refresh()
+
+        # With the games gone, only the rolled-up days can still be counted.
+        await DatabaseSession.execute(delete(Play))
+        await DatabaseSession.execute(delete(Game))
+        summary = await dashboard.dashboard_summary(parse_period("all"), ALL_GUILDS)
+        assert summary["games"] == 3
+        hours = await dashboard.dashboard_hour_of_day(parse_period("30d"), ALL_GUILDS)
+        assert [h["count"] for h in hours["hours"] if h["count"]] == [3]
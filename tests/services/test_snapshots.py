@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sqlalchemy import select, text
+
+from spellbot.database import DatabaseSession, context_vars, engine
+from spellbot.models import GuildAnalyticsSnapshot
+from spellbot.services import games, snapshots
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+
+    from spellbot.models import Game, Guild
+    from tests.fixtures import Factories
+
+pytestmark = pytest.mark.use_db
+
+NOW = datetime(2024, 6, 15, 12, 0, tzinfo=UTC)
+
+
+@pytest.mark.asyncio
+class TestSnapshots:
+    def seed(self, factories: Factories) -> tuple[Guild, Game]:
+        guild = factories.guild.create(xid=980001, name="Snapshots")
+        channel = factories.channel.create(xid=981001, name="snapshots", guild=guild)
+        user = factories.user.create(xid=880001, name="snapper")
+        game = factories.game.create(
+            guild=guild,
+            channel=channel,
+            created_at=NOW - timedelta(days=2, minutes=10),
+            started_at=NOW - timedelta(days=2),
+            updated_at=NOW - timedelta(days=2),
+        )
+        factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+        return guild, game
+
+    async def computed_at(self, guild_xid: int) -> datetime | None:
+        rows = await DatabaseSession.execute(
+            select(GuildAnalyticsSnapshot.computed_at).where(
+                GuildAnalyticsSnapshot.guild_xid == guild_xid,
+            ),
+        )
+        return rows.scalar_one_or_none()
+
+    async def test_no_snapshot_until_viewed(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        assert await snapshots.refresh() == 0
+        assert await snapshots.panel(guild.xid, "summary") is None
+
+        await snapshots.mark_viewed(guild.xid)
+        assert await snapshots.panel(guild.xid, "summary") is None
+        assert await snapshots.refresh() == 1
+
+        summary = await snapshots.panel(guild.xid, "summary")
+        assert summary is not None
+        assert summary["total_games"] == 1
+        assert summary["snapshot_at"] == NOW.isoformat()
+        every_time = await snapshots.panel(guild.xid, "histogram", all_time=True)
+        assert every_time is not None
+        assert every_time["median_games"] == 1
+
+    async def test_snapshot_matches_live_panels(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        await snapshots.refresh()
+
+        for name, fetch in snapshots.SNAPSHOT_PANELS.items():
+            for all_time in (False, True):
+                data = await snapshots.panel(guild.xid, name, all_time=all_time)
+                assert data is not None
+                del data["snapshot_at"]
+                assert data == await fetch(guild.xid, all_time=all_time)
+
+    async def test_recomputes_after_games_change(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, game = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        await snapshots.refresh()
+
+        freezer.move_to(NOW + timedelta(minutes=5))
+        assert await snapshots.refresh() == 0
+
+        await games.delete_games([game.id])  # type: ignore[list-item]
+        freezer.move_to(NOW + timedelta(minutes=10))
+        assert await snapshots.refresh() == 1
+        summary = await snapshots.panel(guild.xid, "summary")
+        assert summary is not None
+        assert summary["total_games"] == 0
+
+    async def test_recomputes_old_snapshots(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        await snapshots.refresh()
+
+        freezer.move_to(NOW + timedelta(minutes=61))
+        assert await snapshots.refresh() == 1
+        assert await self.computed_at(guild.xid) == (NOW + timedelta(minutes=61)).replace(
+            tzinfo=None,
+        )
+
+    async def test_drops_snapshots_no_longer_viewed(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        await snapshots.refresh()
+
+        freezer.move_to(NOW + timedelta(days=31))
+        assert await snapshots.refresh() == 0
+        assert await snapshots.panel(guild.xid, "summary") is None
+
+    async def test_holds_the_lock_until_done(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        compute = snapshots.compute
+        attempts: list[bool] = []
+
+        async def compute_elsewhere(guild_xid: int) -> dict[str, dict[str, Any]]:
+            async with engine.connect() as conn:
+                lock = text("SELECT pg_try_advisory_xact_lock(:key)")
+                key = {"key": snapshots.SNAPSHOT_LOCK_KEY}
+                attempts.append(bool((await conn.execute(lock, key)).scalar()))
+            return await compute(guild_xid)
+
+        monkeypatch.setattr(snapshots, "compute", compute_elsewhere)
+        assert await snapshots.refresh() == 1
+        assert attempts == [False]
+
+    async def test_computes_on_the_read_only_session(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        await snapshots.mark_viewed(guild.xid)
+        outer = context_vars[DatabaseSession].get()
+        compute = snapshots.compute
+        sessions: list[object] = []
+
+        async def compute_and_note_session(guild_xid: int) -> dict[str, dict[str, Any]]:
+            sessions.append(context_vars[DatabaseSession].get())
+            return await compute(guild_xid)
+
+        monkeypatch.setattr(snapshots, "compute", compute_and_note_session)
+        assert await snapshots.refresh() == 1
+        assert len(sessions) == 1
+        assert sessions[0] is not outer
+
+    async def test_failed_guild_keeps_the_others(
+        self,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild, _ = self.seed(factories)
+        broken = factories.guild.create(xid=980002, name="Broken")
+        await snapshots.mark_viewed(guild.xid)
+        await snapshots.mark_viewed(broken.xid)
+        compute = snapshots.compute
+
+        async def compute_or_fail(guild_xid: int) -> dict[str, dict[str, Any]]:
+            if guild_xid == broken.xid:
+                raise RuntimeError("boom")
+            return await compute(guild_xid)
+
+        monkeypatch.setattr(snapshots, "compute", compute_or_fail)
+        assert await snapshots.refresh() == 1
+        assert await self.computed_at(guild.xid) is not None
+        assert await self.computed_at(broken.xid) is None
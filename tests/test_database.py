@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, insert, inspect, select, text
+
+from spellbot.database import (
+    DatabaseSession,
+    advisory_lock,
+    context_vars,
+    db_session_manager,
+    engine,
+    read_only_engine,
+    read_only_session_manager,
+    transaction_session_manager,
+)
+from spellbot.models import Guild
+from spellbot.query_stats import scope_totals
+from tests.factories import GuildFactory
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestReadOnlySessionManager:
+    async def test_falls_back_to_primary_without_replica(self) -> None:
+        assert read_only_engine.__wrapped__ is engine.__wrapped__
+
+    async def test_reads_and_restores_outer_session(self) -> None:
+        guild = GuildFactory.create()
+        outer = context_vars[DatabaseSession].get()
+
+        async with read_only_session_manager():
+            assert context_vars[DatabaseSession].get() is not outer
+            found = await DatabaseSession.get(Guild, guild.xid)
+            assert found is not None
+            assert found.name == guild.name
+
+        assert context_vars[DatabaseSession].get() is outer
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestUntouchedSessions:
+    async def test_untouched_scope_skips_commit_and_expire(self) -> None:
+        GuildFactory.create()
+        guild = (await DatabaseSession.execute(select(Guild))).scalar_one()
+        before = scope_totals.copy()
+
+        with patch("spellbot.database.AsyncSession.commit") as commit:
+            async with db_session_manager():
+                pass
+
+        commit.assert_not_called()
+        assert not inspect(guild).expired
+        assert scope_totals["scopes"] == before["scopes"] + 1
+        assert scope_totals["untouched"] == before["untouched"] + 1
+
+    async def test_touched_scope_commits_and_expires(self) -> None:
+        GuildFactory.create()
+        guild = (await DatabaseSession.execute(select(Guild))).scalar_one()
+        before = scope_totals.copy()
+
+        async with db_session_manager():
+            await DatabaseSession.execute(text("SELECT 1"))
+
+        assert inspect(guild).expired
+        assert scope_totals["scopes"] == before["scopes"] + 1
+        assert scope_totals["untouched"] == before["untouched"]
+
+    async def test_scope_that_committed_is_still_closed_and_expired(self) -> None:
+        GuildFactory.create()
+        guild = (await DatabaseSession.execute(select(Guild))).scalar_one()
+        before = scope_totals.copy()
+
+        with patch("spellbot.database.AsyncSession.close") as close:
+            async with db_session_manager():
+                await DatabaseSession.execute(text("SELECT 1"))
+                await DatabaseSession.commit()
+
+        close.assert_called_once()
+        assert inspect(guild).expired
+        assert scope_totals["untouched"] == before["untouched"]
+
+    async def test_untouched_read_only_scope(self) -> None:
+        outer = context_vars[DatabaseSession].get()
+
+        async with read_only_session_manager():
+            pass
+
+        assert context_vars[DatabaseSession].get() is outer
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestTransactionSessionManager:
+    async def test_commits_together_and_restores_outer_session(self) -> None:
+        outer = context_vars[DatabaseSession].get()
+
+        async with transaction_session_manager():
+            assert context_vars[DatabaseSession].get() is not outer
+            await DatabaseSession.execute(insert(Guild).values(xid=1, name="one"))
+            # Other connections see nothing until the transaction commits.
+            async with engine.connect() as conn:
+                assert (await conn.execute(select(func.count()).select_from(Guild))).scalar() == 0
+
+        assert context_vars[DatabaseSession].get() is outer
+        assert (
+            await DatabaseSession.execute(select(func.count()).select_from(Guild))
+        ).scalar() == 1
+
+    async def test_rolls_back_on_error(self) -> None:
+        async def insert_then_fail() -> None:
+            async with transaction_session_manager():
+                await DatabaseSession.execute(insert(Guild).values(xid=1, name="one"))
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            await insert_then_fail()
+
+        assert (
+            await DatabaseSession.execute(select(func.count()).select_from(Guild))
+        ).scalar() == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestAdvisoryLock:
+    async def try_lock_elsewhere(self) -> bool:
+        async with engine.connect() as conn:
+            lock = text("SELECT pg_try_advisory_xact_lock(:key)")
+            return bool((await conn.execute(lock, {"key": 42})).scalar())
+
+    async def test_held_until_exit_across_commits(self) -> None:
+        async with advisory_lock(42) as locked:
+            assert locked
+            await DatabaseSession.execute(text("SELECT 1"))
+            await DatabaseSession.commit()
+            assert not await self.try_lock_elsewhere()
+
+        assert await self.try_lock_elsewhere()
+
+    async def test_not_taken_twice(self) -> None:
+        async with advisory_lock(42) as outer, advisory_lock(42) as inner:
+            assert outer
+            assert not inner
+        assert await self.try_lock_elsewhere()
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 from spellbot.i18n import (
     best_locale,
     guild_locale,
+    language_name,
     normalize_locale,
     parse_accept_language,
     t,
@@ -67,6 +68,20 @@ class TestNormalizeLocale:
         assert normalize_locale("de") == "de"
 
 
+class TestLanguageName:
+    def test_known_locales(self) -> None:
+        assert language_name("en") == "English"
+        assert language_name("ja") == "Japanese"
+        assert language_name("es-ES") == "Spanish"
+
+    def test_unknown_locale_returns_code(self) -> None:
+        assert language_name("xx") == "xx"
+
+    def test_none_defaults_to_english(self) -> None:
+        assert language_name(None) == "English"
+        assert language_name("") == "English"
+
+
 class TestGuildLocale:
     def test_none_guild_returns_en(self) -> None:
         assert guild_locale(None) == "en"
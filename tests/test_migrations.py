@@ -1,8 +1,19 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
 
 from spellbot.models import create_all, reverse_all
+from spellbot.models.base import (
+    ALEMBIC_INI,
+    MIGRATIONS_DIR,
+    database_at_head,
+    packaged_head_revision,
+)
 
 if TYPE_CHECKING:
     from spellbot.settings import Settings
@@ -12,3 +23,26 @@ class TestMigrations:
     def test_alembic(self, settings: Settings) -> None:
         create_all(settings.RESOLVED_DATABASE_URL)
         reverse_all(settings.RESOLVED_DATABASE_URL)
+
+    def test_packaged_head_revision_is_current(self) -> None:
+        config = Config(str(ALEMBIC_INI))
+        config.set_main_option("script_location", str(MIGRATIONS_DIR))
+        heads = ScriptDirectory.from_config(config).get_heads()
+        assert [packaged_head_revision()] == heads, (
+            "src/spellbot/migrations/HEAD is out of date, it should contain the newest revision"
+        )
+
+    def test_create_all_skips_alembic_at_head(self, settings: Settings) -> None:
+        url = settings.RESOLVED_DATABASE_URL
+        create_all(url)
+        engine = create_engine(url)
+        try:
+            assert database_at_head(engine)
+            with patch("spellbot.models.base.upgrade_to_head") as upgrade_to_head:
+                create_all(url)
+            upgrade_to_head.assert_not_called()
+
+            reverse_all(url)
+            assert not database_at_head(engine)
+        finally:
+            engine.dispose()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from spellbot.database import DatabaseSession
+from spellbot.pool_stats import (
+    PoolStats,
+    format_pool_summary,
+    pool_stats,
+)
+
+
+class TestPoolStats:
+    def test_empty(self) -> None:
+        stats = PoolStats(name="primary", size=20, max_overflow=40)
+
+        snapshot = stats.snapshot()
+
+        assert snapshot["checkouts"] == 0
+        assert snapshot["wait_p50_ms"] is None
+        assert snapshot["wait_p95_ms"] is None
+        assert snapshot["wait_mean_ms"] == 0
+        assert format_pool_summary(snapshot) == (
+            "0/20 in use (peak 0), overflow 0/40 (peak 0), wait p50 n/a p95 n/a max 0ms, age max 0s"
+        )
+
+    def test_record_checkout(self) -> None:
+        stats = PoolStats(name="primary", size=2, max_overflow=1)
+
+        stats.record_checkout(wait_ms=0.5, in_use=1, overflow=0, age_s=10.0)
+        stats.record_checkout(wait_ms=7.0, in_use=3, overflow=1, age_s=30.0)
+        stats.record_checkout(wait_ms=2.0, in_use=2, overflow=0, age_s=20.0)
+
+        snapshot = stats.snapshot()
+        assert snapshot["checkouts"] == 3
+        assert snapshot["in_use"] == 2
+        assert snapshot["overflow"] == 0
+        assert snapshot["peak_in_use"] == 3
+        assert snapshot["peak_overflow"] == 1
+        assert snapshot["wait_mean_ms"] == 3.17
+        assert snapshot["wait_max_ms"] == 7.0
+        assert snapshot["wait_buckets"][:3] == [1, 1, 1]
+        assert snapshot["age_mean_s"] == 20.0
+        assert snapshot["age_max_s"] == 30.0
+
+    @pytest.mark.parametrize(
+        ("q", "expected"),
+        [
+            pytest.param(0.5, 5.0, id="p50"),
+            pytest.param(0.95, 9000.0, id="p95_beyond_last_bucket"),
+        ],
+    )
+    def test_wait_percentile(self, q: float, expected: float) -> None:
+        stats = PoolStats(name="primary", size=20, max_overflow=40)
+        for wait_ms in (2.0, 3.0, 4.0, 9000.0):
+            stats.record_checkout(wait_ms=wait_ms, in_use=1, overflow=0, age_s=0.0)
+
+        assert stats.wait_buckets[-1] == 1
+        assert stats.wait_percentile_ms(q) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestInstrumentedQueuePool:
+    async def test_checkouts_are_recorded(self) -> None:
+        stats = pool_stats["primary"]
+        before = stats.checkouts
+
+        await DatabaseSession.execute(text("SELECT 1"))
+
+        assert stats.checkouts > before
+        assert stats.peak_in_use >= 1
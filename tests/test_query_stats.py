@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from spellbot.database import (
+    DatabaseSession,
+    db_session_manager,
+    engine,
+    read_only_session_manager,
+)
+from spellbot.query_stats import (
+    REPEATED_STATEMENT_THRESHOLD,
+    START_TIMES_KEY,
+    QueryStats,
+    format_scope_summary,
+    query_scope,
+    query_stats,
+    scope_totals,
+)
+
+
+class TestQueryStats:
+    def test_record(self) -> None:
+        stats = QueryStats()
+
+        stats.record("SELECT 1", 1, 2.0)
+        stats.record("SELECT 2", 3, 1.5)
+        stats.record("SELECT 1", 1, 0.5)
+
+        assert stats.statements == 3
+        assert stats.rows == 5
+        assert stats.duration_ms == 4.0
+        assert stats.most_repeated() == ("SELECT 1", 2)
+
+    def test_most_repeated_empty(self) -> None:
+        assert QueryStats().most_repeated() is None
+
+    def test_scopes_nest_into_the_outermost(self) -> None:
+        with query_scope() as outer, query_scope() as inner:
+            assert inner is outer
+        assert query_stats.get() is None
+
+    def test_warns_about_repeated_statements(self) -> None:
+        with patch("spellbot.query_stats.logger") as logger, query_scope() as stats:
+            for _ in range(REPEATED_STATEMENT_THRESHOLD):
+                stats.record("SELECT * FROM users WHERE xid = %(xid)s", 1, 0.1)
+
+        logger.warning.assert_called_once()
+
+    def test_no_warning_below_threshold(self) -> None:
+        with patch("spellbot.query_stats.logger") as logger, query_scope() as stats:
+            stats.record("SELECT 1", 1, 0.1)
+
+        logger.warning.assert_not_called()
+
+    def test_format_scope_summary(self) -> None:
+        with patch.dict(scope_totals, {"scopes": 8, "untouched": 2}, clear=True):
+            assert format_scope_summary() == "8 scopes, 2 untouched (25%)"
+
+    def test_format_scope_summary_empty(self) -> None:
+        with patch.dict(scope_totals, clear=True):
+            assert format_scope_summary() == "0 scopes, 0 untouched"
+
+
+@pytest.mark.asyncio
+@pytest.mark.use_db
+class TestQueryScopeCounting:
+    async def test_counts_statements_and_rows(self) -> None:
+        with query_scope() as stats:
+            await DatabaseSession.execute(text("SELECT 1"))
+            await DatabaseSession.execute(text("SELECT generate_series(1, 3)"))
+
+        assert stats.statements == 2
+        assert stats.rows == 4
+
+    async def test_session_managers_count_into_enclosing_scope(self) -> None:
+        with query_scope() as stats:
+            async with db_session_manager():
+                await DatabaseSession.execute(text("SELECT 1"))
+                async with read_only_session_manager():
+                    await DatabaseSession.execute(text("SELECT 1"))
+
+        assert stats.statements == 2
+        assert stats.most_repeated() == ("SELECT 1", 2)
+
+    async def test_failed_statements_drop_their_start_time(self) -> None:
+        async with engine.connect() as conn:
+            with query_scope() as stats, pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT 1 / 0"))
+
+            assert not conn.info[START_TIMES_KEY]
+        assert stats.statements == 0
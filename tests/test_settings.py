@@ -32,3 +32,20 @@ class TestSettings:
 
         assert custom_tablestream == settings.TABLESTREAM_CREATE
         assert custom_edhlab == settings.EDHLAB_CREATE
+
+    def test_database_replica_url_unset(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("DATABASE_REPLICA_URL", raising=False)
+
+        settings = Settings()
+
+        assert settings.RESOLVED_DATABASE_REPLICA_URL is None
+
+    def test_database_replica_url_resolved(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("DATABASE_REPLICA_URL", "postgres://replica:5432/spellbot")
+
+        settings = Settings()
+
+        assert (
+            settings.RESOLVED_DATABASE_REPLICA_URL
+            == "postgresql+psycopg://replica:5432/spellbot-test"
+        )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -11,9 +12,12 @@ from spellbot import redis_client
 from spellbot.redis_client import close_redis
 from spellbot.settings import settings
 from spellbot.shard_status import (
-    SHARD_STATUS_PREFIX,
+    SHARD_STATUS_METADATA_KEY,
+    SHARD_STATUS_VERSIONS_KEY,
     ShardStatus,
     get_all_shard_statuses,
+    is_stale,
+    shard_status_key,
     update_shard_status,
 )
 
@@ -60,6 +64,15 @@ class TestShardStatus:
         assert status.is_ready is True
         assert status.last_updated == "2026-01-13T12:00:00+00:00"
 
+    def test_is_stale(self) -> None:
+        now = datetime(2026, 1, 13, 12, 0, tzinfo=UTC)
+        fresh = make_status(0, last_updated=(now - timedelta(seconds=30)).isoformat())
+        old = make_status(0, last_updated=(now - timedelta(minutes=5)).isoformat())
+        bad = make_status(0, last_updated="not-a-date")
+        assert not is_stale(fresh, now)
+        assert is_stale(old, now)
+        assert is_stale(bad, now)
+
     def test_shard_status_from_dict_null_latency(self) -> None:
         data = {
             "shard_id": 0,
@@ -73,6 +86,55 @@ class TestShardStatus:
         assert status.is_ready is False
 
 
+def make_status(shard_id: int, **kwargs: object) -> ShardStatus:
+    data: dict[str, object] = {
+        "shard_id": shard_id,
+        "latency_ms": 45.5,
+        "guild_count": 100,
+        "is_ready": True,
+        "last_updated": datetime.now(tz=UTC).isoformat(),
+        "version": "1.0.0",
+    }
+    data.update(kwargs)
+    return ShardStatus.from_dict(data)
+
+
+def make_pipeline(*results: list[object]) -> MagicMock:
+    """Build a mock pipeline whose successive execute() calls return the given results."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(side_effect=list(results))
+    return pipe
+
+
+def make_bot(*shard_ids: int, latency: float | None = 0.045) -> MagicMock:
+    mock_shard = MagicMock()
+    mock_shard.latency = latency
+    mock_shard.is_closed.return_value = False
+
+    bot = MagicMock()
+    bot.shard_count = len(shard_ids)
+    bot.shards = dict.fromkeys(shard_ids, mock_shard)
+    bot.ready_shards = set(shard_ids)
+    bot.get_shard.return_value = mock_shard
+    bot.guilds = []
+    for shard_id in shard_ids:
+        mock_guild = MagicMock()
+        mock_guild.shard_id = shard_id
+        bot.guilds.append(mock_guild)
+    return bot
+
+
+def hset_mapping(pipe: MagicMock) -> dict[str, dict[str, object]]:
+    mapping = pipe.hset.call_args.kwargs["mapping"]
+    return {field: json.loads(value) for field, value in mapping.items()}
+
+
+def metadata_written(pipe: MagicMock) -> dict[str, object]:
+    pipe.set.assert_called_once()
+    assert pipe.set.call_args[0][0] == SHARD_STATUS_METADATA_KEY
+    return json.loads(pipe.set.call_args[0][1])
+
+
 @pytest.mark.asyncio
 class TestUpdateShardStatus:
     async def test_update_shard_status_no_redis(self) -> None:
@@ -84,194 +146,106 @@ class TestUpdateShardStatus:
             await update_shard_status(bot)  # Should not raise
 
     async def test_update_shard_status_with_redis(self) -> None:
-        """Test that update_shard_status writes to Redis."""
+        """Test that update_shard_status writes every shard in one pipeline."""
+        pipe = make_pipeline([])
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=None)  # No existing metadata
-        mock_redis.aclose = AsyncMock()
-
-        # Mock shard info
-        mock_shard = MagicMock()
-        mock_shard.latency = 0.045
-        mock_shard.is_closed.return_value = False
-
-        # Mock guild with shard_id
-        mock_guild = MagicMock()
-        mock_guild.shard_id = 0
-
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
-        bot.guilds = [mock_guild]
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        bot = make_bot(0, 1, 2)
+        bot.guilds.append(bot.guilds[0])
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
+            patch("spellbot.shard_status.__version__", "1.0.0"),
+            patch("spellbot.shard_status.pool_snapshots", return_value=[{"name": "primary"}]),
         ):
-            mock_from_url.return_value = mock_redis
-
             await update_shard_status(bot)
 
-            # Verify Redis was called
-            assert mock_redis.set.call_count == 2  # One for shard, one for metadata
+        pipe.execute.assert_awaited_once()
+        mock_redis.set.assert_not_called()
+        assert pipe.hset.call_args[0][0] == shard_status_key("1.0.0")
+        statuses = hset_mapping(pipe)
+        assert {field: status["guild_count"] for field, status in statuses.items()} == {
+            "0": 2,
+            "1": 1,
+            "2": 1,
+        }
+        assert statuses["0"]["latency_ms"] == 45.0
+        pipe.zadd.assert_called_once()
+        assert pipe.zadd.call_args[0][0] == SHARD_STATUS_VERSIONS_KEY
+        assert "1.0.0" in pipe.zadd.call_args[0][1]
+        assert metadata_written(pipe)["total_guilds"] == 4
+        assert metadata_written(pipe)["pools"] == [{"name": "primary"}]
 
     async def test_update_shard_status_with_null_latency(self) -> None:
         """Test that update_shard_status handles null latency."""
+        pipe = make_pipeline([])
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=None)
-        mock_redis.aclose = AsyncMock()
-
-        mock_shard = MagicMock()
-        mock_shard.latency = None  # Null latency
-        mock_shard.is_closed.return_value = False
-
-        mock_guild = MagicMock()
-        mock_guild.shard_id = 0
-
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
-        bot.guilds = [mock_guild]
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+        bot = make_bot(0, latency=None)
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
         ):
-            mock_from_url.return_value = mock_redis
-
             await update_shard_status(bot)
 
-            # Verify Redis was called
-            assert mock_redis.set.call_count == 2
-            shard_call = mock_redis.set.call_args_list[0]
-            shard_json = json.loads(shard_call[0][1])
-            assert shard_json["latency_ms"] is None
+        assert hset_mapping(pipe)["0"]["latency_ms"] is None
 
     async def test_update_shard_status_with_existing_newer_version(self) -> None:
         """Test version comparison when existing version is newer."""
         existing_metadata = json.dumps({"version": "99.99.99", "shard_count": 1})
+        pipe = make_pipeline([])
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=existing_metadata)
-        mock_redis.aclose = AsyncMock()
-
-        mock_shard = MagicMock()
-        mock_shard.latency = 0.045
-        mock_shard.is_closed.return_value = False
-
-        mock_guild = MagicMock()
-        mock_guild.shard_id = 0
-
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
-        bot.guilds = [mock_guild]
+        mock_redis.pipeline = MagicMock(return_value=pipe)
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
         ):
-            mock_from_url.return_value = mock_redis
+            await update_shard_status(make_bot(0))
 
-            await update_shard_status(bot)
-
-            # Verify the metadata was set with the newer version preserved
-            assert mock_redis.set.call_count == 2
-            metadata_call = mock_redis.set.call_args_list[1]
-            metadata_json = json.loads(metadata_call[0][1])
-            assert metadata_json["version"] == "99.99.99"
+        # Verify the metadata was set with the newer version preserved
+        assert metadata_written(pipe)["version"] == "99.99.99"
 
     async def test_update_shard_status_with_invalid_existing_version(self) -> None:
         """Test version comparison when existing version is invalid."""
         existing_metadata = json.dumps({"version": "invalid-version", "shard_count": 1})
+        pipe = make_pipeline([])
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=existing_metadata)
-        mock_redis.aclose = AsyncMock()
-
-        mock_shard = MagicMock()
-        mock_shard.latency = 0.045
-        mock_shard.is_closed.return_value = False
-
-        mock_guild = MagicMock()
-        mock_guild.shard_id = 0
-
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
-        bot.guilds = [mock_guild]
+        mock_redis.pipeline = MagicMock(return_value=pipe)
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
+            patch("spellbot.shard_status.__version__", "1.0.0"),
         ):
-            mock_from_url.return_value = mock_redis
+            await update_shard_status(make_bot(0))
 
-            await update_shard_status(bot)
-
-            # Should not raise and should write current version
-            assert mock_redis.set.call_count == 2
+        # Should not raise and should write current version
+        assert metadata_written(pipe)["version"] == "1.0.0"
 
     async def test_update_shard_status_with_existing_older_version(self) -> None:
         """Test version comparison when existing version is older."""
         existing_metadata = json.dumps({"version": "0.0.1", "shard_count": 1})
+        pipe = make_pipeline([])
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=existing_metadata)
-        mock_redis.aclose = AsyncMock()
-
-        mock_shard = MagicMock()
-        mock_shard.latency = 0.045
-        mock_shard.is_closed.return_value = False
-
-        mock_guild = MagicMock()
-        mock_guild.shard_id = 0
-
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
-        bot.guilds = [mock_guild]
+        mock_redis.pipeline = MagicMock(return_value=pipe)
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
             patch("spellbot.shard_status.__version__", "1.0.0"),
         ):
-            mock_from_url.return_value = mock_redis
+            await update_shard_status(make_bot(0))
 
-            await update_shard_status(bot)
-
-            # Verify the metadata was set with the current version (not the older one)
-            assert mock_redis.set.call_count == 2
-            metadata_call = mock_redis.set.call_args_list[1]
-            metadata_json = json.loads(metadata_call[0][1])
-            assert metadata_json["version"] == "1.0.0"
+        # Verify the metadata was set with the current version (not the older one)
+        assert metadata_written(pipe)["version"] == "1.0.0"
 
     async def test_update_shard_status_redis_error(self) -> None:
         """Test that Redis errors are handled gracefully."""
@@ -295,16 +269,9 @@ class TestUpdateShardStatus:
     async def test_update_shard_status_reuses_client(self) -> None:
         """Repeated calls share a single Redis client (from_url called once)."""
         mock_redis = AsyncMock()
-        mock_redis.set = AsyncMock()
         mock_redis.get = AsyncMock(return_value=None)
-        mock_shard = MagicMock()
-        mock_shard.latency = 0.045
-        mock_shard.is_closed.return_value = False
-        bot = MagicMock()
-        bot.shard_count = 1
-        bot.shards = {0: mock_shard}
-        bot.ready_shards = {0}
-        bot.get_shard.return_value = mock_shard
+        mock_redis.pipeline = MagicMock(side_effect=lambda **_: make_pipeline([]))
+        bot = make_bot(0)
         bot.guilds = []
 
         from_url = AsyncMock(return_value=mock_redis)
@@ -327,82 +294,85 @@ class TestGetAllShardStatuses:
             assert metadata is None
 
     async def test_get_all_shard_statuses_with_data(self) -> None:
-        """Test that get_all_shard_statuses returns data from Redis."""
-        shard_data = {
-            "shard_id": 0,
-            "latency_ms": 45.5,
-            "guild_count": 100,
-            "is_ready": True,
-            "last_updated": "2026-01-13T12:00:00+00:00",
-        }
+        """Test that get_all_shard_statuses reads every version hash in one pipeline."""
         metadata = {
-            "shard_count": 1,
-            "total_guilds": 100,
+            "shard_count": 2,
+            "total_guilds": 300,
             "last_updated": "2026-01-13T12:00:00+00:00",
         }
-
+        old_hash = {b"1": json.dumps(make_status(1, version="1.0.0").to_dict()).encode()}
+        new_hash = {
+            b"0": json.dumps(make_status(0, version="1.1.0").to_dict()).encode(),
+            b"1": json.dumps(make_status(1, version="1.1.0").to_dict()).encode(),
+        }
+        meta_pipe = make_pipeline([json.dumps(metadata).encode(), [b"1.0.0", b"1.1.0"]])
+        hash_pipe = make_pipeline([old_hash, new_hash])
         mock_redis = AsyncMock()
-        mock_redis.get = AsyncMock(
-            side_effect=[
-                json.dumps(metadata),  # First call for metadata
-                json.dumps(shard_data),  # Second call for shard data
-            ],
-        )
-        mock_redis.scan_iter = MagicMock(
-            return_value=AsyncIterator([f"{SHARD_STATUS_PREFIX}0"]),
-        )
-        mock_redis.aclose = AsyncMock()
+        mock_redis.pipeline = MagicMock(side_effect=[meta_pipe, hash_pipe])
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
         ):
-            mock_from_url.return_value = mock_redis
+            statuses, meta = await get_all_shard_statuses()
+
+        assert [(s.shard_id, s.version) for s in statuses] == [
+            (0, "1.1.0"),
+            (1, "1.0.0"),
+            (1, "1.1.0"),
+        ]
+        assert [c[0][0] for c in hash_pipe.hgetall.call_args_list] == [
+            shard_status_key("1.0.0"),
+            shard_status_key("1.1.0"),
+        ]
+        mock_redis.scan_iter.assert_not_called()
+        mock_redis.get.assert_not_called()
+        assert meta is not None
+        assert meta["shard_count"] == 2
+
+    async def test_get_all_shard_statuses_skips_stale_shards(self) -> None:
+        """Shards that stopped publishing are dropped even while their hash lives on."""
+        last_updated = datetime.now(tz=UTC) - timedelta(minutes=5)
+        stale = make_status(3, last_updated=last_updated.isoformat())
+        live_hash = {
+            b"0": json.dumps(make_status(0).to_dict()).encode(),
+            b"3": json.dumps(stale.to_dict()).encode(),
+        }
+        meta_pipe = make_pipeline([None, [b"1.0.0"]])
+        hash_pipe = make_pipeline([live_hash])
+        mock_redis = AsyncMock()
+        mock_redis.pipeline = MagicMock(side_effect=[meta_pipe, hash_pipe])
 
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
+        ):
             statuses, meta = await get_all_shard_statuses()
 
-            assert len(statuses) == 1
-            assert statuses[0].shard_id == 0
-            assert meta is not None
-            assert meta["shard_count"] == 1
+        assert [s.shard_id for s in statuses] == [0]
+        assert meta is None
 
     async def test_get_all_shard_statuses_with_empty_data(self) -> None:
-        """Test that empty shard data is handled."""
+        """Test that no live versions is handled without a second round trip."""
         metadata = {
             "shard_count": 1,
             "total_guilds": 0,
             "last_updated": "2026-01-13T12:00:00+00:00",
         }
-
+        meta_pipe = make_pipeline([json.dumps(metadata), []])
+        hash_pipe = make_pipeline()
         mock_redis = AsyncMock()
-        mock_redis.get = AsyncMock(
-            side_effect=[
-                json.dumps(metadata),  # First call for metadata
-                None,  # Second call for shard data returns None
-            ],
-        )
-        mock_redis.scan_iter = MagicMock(
-            return_value=AsyncIterator([f"{SHARD_STATUS_PREFIX}0:1.0.0"]),
-        )
-        mock_redis.aclose = AsyncMock()
+        mock_redis.pipeline = MagicMock(side_effect=[meta_pipe, hash_pipe])
 
         with (
             patch.object(settings, "REDIS_URL", "redis://localhost"),
-            patch(
-                "spellbot.redis_client.aioredis.from_url",
-                new_callable=AsyncMock,
-            ) as mock_from_url,
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=mock_redis)),
         ):
-            mock_from_url.return_value = mock_redis
-
             statuses, meta = await get_all_shard_statuses()
 
-            # No statuses because the get call returned None
-            assert len(statuses) == 0
-            assert meta is not None
+        assert len(statuses) == 0
+        assert meta is not None
+        hash_pipe.execute.assert_not_awaited()
 
     async def test_get_all_shard_statuses_redis_error(self) -> None:
         """Test that Redis errors are handled gracefully."""
@@ -419,21 +389,3 @@ class TestGetAllShardStatuses:
 
             assert statuses == []
             assert meta is None
-
-
-class AsyncIterator:
-    """Helper class to create an async iterator from a list."""
-
-    def __init__(self, items: list[str]) -> None:
-        self.items = items
-        self.index = 0
-
-    def __aiter__(self) -> AsyncIterator:
-        return self
-
-    async def __anext__(self) -> str:
-        if self.index >= len(self.items):
-            raise StopAsyncIteration
-        item = self.items[self.index]
-        self.index += 1
-        return item
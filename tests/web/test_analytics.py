@@ -1,18 +1,21 @@
 from __future__ import annotations
 
+import json
 from datetime import UTC, datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from unittest.mock import AsyncMock, MagicMock, patch
 from urllib.parse import parse_qs, urlparse
 
 import pytest
 
+from spellbot import services
 from spellbot.enums import GameFormat
 from spellbot.models import GameStatus
 from spellbot.settings import settings
 from spellbot.utils import generate_signed_url
 from spellbot.web.api import analytics
 from spellbot.web.api.analytics import check_guild_member
+from spellbot.web.response_cache import response_cache
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
@@ -173,6 +176,48 @@ class TestWebAnalyticsSummary:
         assert data["total_games"] == 1
         assert data["active_players"] == 1
 
+    async def test_analytics_summary_from_snapshot(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        mocker: MockerFixture,
+    ) -> None:
+        freezer.move_to(datetime(2020, 1, 1, tzinfo=UTC))
+        guild = factories.guild.create(xid=201, name="test-guild")
+        channel = factories.channel.create(xid=301, name="channel", guild=guild)
+        game = factories.game.create(
+            guild=guild,
+            channel=channel,
+            status=GameStatus.STARTED.value,
+            started_at=datetime.now(tz=UTC),
+            created_at=datetime.now(tz=UTC),
+        )
+        user = factories.user.create(xid=101, name="player1")
+        factories.play.create(game_id=game.id, user_xid=user.xid, og_guild_xid=guild.xid)
+
+        mocker.patch("spellbot.utils.time.time", return_value=1000.0)
+        url = generate_signed_url(guild.xid, expires_in_minutes=10)
+        parsed = urlparse(url)
+        query = parse_qs(parsed.query)
+        data_path = (
+            f"/g/{guild.xid}/analytics/summary?expires={query['expires'][0]}&sig={query['sig'][0]}"
+        )
+
+        # Opening the page asks for a snapshot; until one is computed data is live.
+        assert (await client.get(f"{parsed.path}?{parsed.query}")).status == 200
+        data = await (await client.get(data_path)).json()
+        assert data["total_games"] == 1
+        assert "snapshot_at" not in data
+
+        await services.snapshots.refresh()
+        response_cache.clear()
+        live = mocker.patch("spellbot.services.plays.analytics_summary", AsyncMock())
+        data = await (await client.get(data_path)).json()
+        assert data["total_games"] == 1
+        assert data["snapshot_at"] == "2020-01-01T00:00:00+00:00"
+        live.assert_not_called()
+
     async def test_analytics_summary_moderator_session(
         self,
         mod_client: ClientSession,
@@ -484,6 +529,102 @@ class TestWebAnalyticsEndpoints:
         assert isinstance(rule_ngrams, list)
 
 
+@pytest.mark.asyncio
+class TestWebAnalyticsBatch:
+    """Tests for the batch endpoint (streams one JSON line per panel)."""
+
+    def batch_path(self, guild_xid: int, mocker: MockerFixture, query: str = "") -> str:
+        mocker.patch("spellbot.utils.time.time", return_value=1000.0)
+        parsed = urlparse(generate_signed_url(guild_xid, expires_in_minutes=10))
+        return f"/g/{guild_xid}/analytics/batch?{parsed.query}{query}"
+
+    async def get_lines(self, client: ClientSession, path: str) -> dict[str, Any]:
+        resp = await client.get(path)
+        assert resp.status == 200
+        assert resp.content_type == "application/x-ndjson"
+        lines = [json.loads(line) for line in (await resp.text()).splitlines()]
+        by_panel = {line["panel"]: line for line in lines}
+        assert len(by_panel) == len(lines)
+        return by_panel
+
+    async def test_streams_every_panel_by_default(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        guild = factories.guild.create(xid=201, name="test-guild")
+        lines = await self.get_lines(client, self.batch_path(guild.xid, mocker))
+        assert set(lines) == set(services.snapshots.SNAPSHOT_PANELS)
+        assert lines["summary"]["data"]["total_games"] == 0
+        assert "games_by_hour" in lines["hour-of-day"]["data"]
+
+    async def test_streams_requested_panels_once(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        guild = factories.guild.create(xid=201, name="test-guild")
+        path = self.batch_path(guild.xid, mocker, "&period=all&panels=summary,formats,summary")
+        lines = await self.get_lines(client, path)
+        assert set(lines) == {"summary", "formats"}
+        assert "popular_formats" in lines["formats"]["data"]
+
+    async def test_failed_panel_does_not_fail_the_batch(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        guild = factories.guild.create(xid=201, name="test-guild")
+        mocker.patch.dict(
+            services.snapshots.SNAPSHOT_PANELS,
+            {"formats": AsyncMock(side_effect=RuntimeError("boom"))},
+        )
+        path = self.batch_path(guild.xid, mocker, "&panels=formats,summary")
+        lines = await self.get_lines(client, path)
+        assert lines["formats"] == {"panel": "formats", "error": "Failed to load"}
+        assert "data" in lines["summary"]
+
+    async def test_checks_membership_of_listed_players(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        guild = factories.guild.create(xid=201, name="test-guild")
+        mocker.patch.dict(
+            services.snapshots.SNAPSHOT_PANELS,
+            {"players": AsyncMock(return_value={"top_players": [{"user_xid": "1"}]})},
+        )
+        check = mocker.patch(
+            "spellbot.web.api.analytics.check_membership_and_update",
+            AsyncMock(return_value=[{"user_xid": "1", "left_server": True}]),
+        )
+        lines = await self.get_lines(client, self.batch_path(guild.xid, mocker, "&panels=players"))
+        assert lines["players"]["data"]["top_players"] == [{"user_xid": "1", "left_server": True}]
+        check.assert_awaited_once_with(guild.xid, [{"user_xid": "1"}])
+
+    async def test_unknown_panel(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        guild = factories.guild.create(xid=201, name="test-guild")
+        resp = await client.get(self.batch_path(guild.xid, mocker, "&panels=summary,nope"))
+        assert resp.status == 400
+
+    async def test_guild_not_found(self, client: ClientSession, mocker: MockerFixture) -> None:
+        resp = await client.get(self.batch_path(99999, mocker))
+        assert resp.status == 404
+
+    async def test_missing_signature(self, client: ClientSession) -> None:
+        resp = await client.get("/g/201/analytics/batch")
+        assert resp.status == 403
+
+
 @pytest.mark.asyncio
 class TestWebAnalyticsSignatureBypass:
     """Tests for CHECK_SIGNATURE=False bypass."""
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import gzip
+from typing import TYPE_CHECKING
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from spellbot.web.assets import accepted_codings, build_bundle, bundle_response
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class TestAcceptedCodings:
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            pytest.param("", set(), id="empty"),
+            pytest.param("gzip, deflate, br", {"gzip", "deflate", "br"}, id="list"),
+            pytest.param("br;q=1.0, GZIP;q=0.5", {"br", "gzip"}, id="weighted"),
+            pytest.param("br;q=0, gzip", {"gzip"}, id="refused"),
+            pytest.param("gzip;q=nope", {"gzip"}, id="bad-weight"),
+        ],
+    )
+    def test_accepted_codings(self, header: str, expected: set[str]) -> None:
+        assert accepted_codings(header) == expected
+
+
+class TestBuildBundle:
+    def test_fingerprints_and_compresses(self, tmp_path: Path) -> None:
+        (tmp_path / "a.js").write_text("var a = 1;", encoding="utf-8")
+        (tmp_path / "b.js").write_text("var b = 2;", encoding="utf-8")
+
+        bundle = build_bundle(tmp_path, "page", ("a.js", "b.js"))
+
+        assert bundle.body == b"var a = 1;\nvar b = 2;"
+        assert bundle.url == f"/page.{bundle.digest}.js"
+        assert gzip.decompress(bundle.gzipped) == bundle.body
+
+        (tmp_path / "b.js").write_text("var b = 3;", encoding="utf-8")
+        assert build_bundle(tmp_path, "page", ("a.js", "b.js")).url != bundle.url
+
+
+class TestBundleResponse:
+    def test_gzips_when_accepted(self, tmp_path: Path) -> None:
+        (tmp_path / "a.js").write_text("var a = 1;", encoding="utf-8")
+        bundle = build_bundle(tmp_path, "page", ("a.js",))
+
+        request = make_mocked_request("GET", bundle.url, headers={"Accept-Encoding": "gzip, br"})
+        response = bundle_response(request, bundle, "no-cache")
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.body == bundle.gzipped
+
+        request = make_mocked_request("GET", bundle.url, headers={"Accept-Encoding": "identity"})
+        response = bundle_response(request, bundle, "no-cache")
+        assert "Content-Encoding" not in response.headers
+        assert response.body == bundle.body
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from spellbot.web.builder import nav_context
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+
+@pytest.mark.asyncio
+class TestNavContext:
+    async def test_resolved_once_per_request(self, mocker: MockerFixture) -> None:
+        get_viewer = mocker.patch(
+            "spellbot.web.api.viewer_auth.get_viewer",
+            AsyncMock(return_value=(7, "Amy")),
+        )
+        get_admin_user_xid = mocker.patch(
+            "spellbot.web.api.admin_auth.get_admin_user_xid",
+            AsyncMock(return_value=None),
+        )
+        request = make_mocked_request("GET", "/g/1")
+
+        nav = await nav_context(request)
+        assert await nav_context(request) is nav
+        assert nav["logged_in"] is True
+        assert nav["name"] == "Amy"
+        assert nav["is_admin"] is False
+        assert nav["here"] == "/g/1"
+        get_viewer.assert_awaited_once()
+        get_admin_user_xid.assert_awaited_once()
+
+        await nav_context(make_mocked_request("GET", "/queues"))
+        assert get_viewer.await_count == 2
@@ -9,10 +9,12 @@ import pytest
 import pytest_asyncio
 
 from spellbot.web.api import admin_auth
+from spellbot.web.response_cache import LIVE_RESPONSE_CACHE_TTL_S
 
 if TYPE_CHECKING:
     from aiohttp import web
     from aiohttp.test_utils import TestClient
+    from freezegun.api import FrozenDateTimeFactory
     from pytest_mock import MockerFixture
 
     WebClient = TestClient[web.Request, web.Application]
@@ -166,6 +168,43 @@ class TestDashboardJsonEndpoints:
         )
         assert resp.status == 200
 
+    async def test_endpoint_responses_are_cached(
+        self,
+        admin_client: WebClient,
+        mocker: MockerFixture,
+    ) -> None:
+        summary = mocker.patch(
+            "spellbot.services.dashboard.dashboard_summary",
+            AsyncMock(return_value={"games": 1}),
+        )
+        for _ in range(2):
+            resp = await admin_client.get("/admin/dashboard/summary?period=7d")
+            assert await resp.json() == {"games": 1}
+        assert summary.await_count == 1
+
+        # Another period or guild filter is a different response.
+        await admin_client.get("/admin/dashboard/summary?period=7d&guild=12345")
+        assert summary.await_count == 2
+
+    async def test_live_responses_are_cached_briefly(
+        self,
+        admin_client: WebClient,
+        mocker: MockerFixture,
+        freezer: FrozenDateTimeFactory,
+    ) -> None:
+        depth = mocker.patch(
+            "spellbot.services.dashboard.dashboard_queue_depth",
+            AsyncMock(return_value={"total": 1, "by_format": []}),
+        )
+        await admin_client.get("/admin/dashboard/queue-depth?period=all")
+        await admin_client.get("/admin/dashboard/queue-depth?period=all")
+        assert depth.await_count == 1
+
+        # However coarse the period, queue depth is never more than a few seconds old.
+        freezer.tick(LIVE_RESPONSE_CACHE_TTL_S + 1)
+        await admin_client.get("/admin/dashboard/queue-depth?period=all")
+        assert depth.await_count == 2
+
     async def test_endpoint_unauthenticated_redirects(self, client: WebClient) -> None:
         resp = await client.get("/admin/dashboard/summary", allow_redirects=False)
         assert resp.status == 302
@@ -227,8 +266,19 @@ class TestDashboardSqlConsole:
         )
         assert resp.status == 200
         data = await resp.json()
-        # Timestamps aren't JSON primitives, so they come back as strings.
-        assert data["rows"] == [["2020-01-02 03:04:05"]]
+        # Timestamps aren't JSON primitives, so they come back as ISO strings.
+        assert data["rows"] == [["2020-01-02T03:04:05"]]
+
+    async def test_large_result_is_compressed(self, admin_client: WebClient) -> None:
+        resp = await admin_client.post(
+            "/admin/dashboard/sql",
+            json={"query": "SELECT repeat('x', 20000) AS wide"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert resp.status == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        data = await resp.json()
+        assert data["rows"] == [["x" * 20000]]
 
     async def test_statement_without_result_set(self, admin_client: WebClient) -> None:
         resp = await admin_client.post(
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from spellbot.web.api import exports
+
+
+def written(response: MagicMock) -> bytes:
+    return b"".join(call.args[0] for call in response.write.await_args_list)
+
+
+@pytest.mark.asyncio
+class TestChunkedCsvWriter:
+    async def test_writes_in_chunks(self) -> None:
+        response = MagicMock(write=AsyncMock())
+        writer = exports.ChunkedCsvWriter(response, ["Game", "Name"])
+        rows = [[i, f"player, number {i}"] for i in range(10_000)]
+        for row in rows:
+            await writer.writerow(row)
+        await writer.close()
+
+        chunks = [call.args[0] for call in response.write.await_args_list]
+        assert len(chunks) > 1
+        assert all(len(chunk) < 2 * exports.EXPORT_CHUNK_SIZE for chunk in chunks)
+        parsed = list(csv.reader(io.StringIO(written(response).decode())))
+        assert parsed[0] == ["Game", "Name"]
+        assert parsed[1:] == [[str(i), name] for i, name in rows]
+        assert writer.rows == len(rows)
+
+    async def test_flush_empty(self) -> None:
+        response = MagicMock(write=AsyncMock())
+        writer = exports.ChunkedCsvWriter(response, ["Game"])
+        await writer.flush()
+        await writer.flush()
+        response.write.assert_awaited_once_with(b"Game\r\n")
+
+
+@pytest.mark.asyncio
+class TestChunkedNdjsonWriter:
+    async def test_one_object_per_line(self) -> None:
+        response = MagicMock(write=AsyncMock())
+        writer = exports.ChunkedNdjsonWriter(response)
+        when = datetime(2020, 1, 1, tzinfo=UTC)
+        await writer.writerow({"game": 1, "time": when, "players": [{"xid": 2}]})
+        await writer.writerow({"game": 2, "time": when, "players": []})
+        await writer.close()
+
+        lines = written(response).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"game": 1, "time": "2020-01-01T00:00:00+00:00", "players": [{"xid": 2}]},
+            {"game": 2, "time": "2020-01-01T00:00:00+00:00", "players": []},
+        ]
+        assert writer.rows == 2
+
+
+class TestExportSink:
+    def test_take(self) -> None:
+        sink = exports.ExportSink()
+        sink.write(b"abc")
+        sink.write(memoryview(b"de"))
+        assert sink.tell() == 5
+        assert sink.take() == b"abcde"
+        assert sink.take() == b""
+        # The position keeps counting from the start of the file after a take.
+        sink.write(b"f")
+        assert sink.tell() == 6
+
+
+@pytest.mark.asyncio
+class TestParquetExportWriter:
+    async def test_writes_row_groups(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(exports, "PARQUET_ROW_GROUP_SIZE", 3)
+        response = MagicMock(write=AsyncMock())
+        schema = pa.schema([("game", pa.int64()), ("name", pa.string())])
+        writer = exports.ParquetExportWriter(response, schema)
+        for i in range(7):
+            await writer.writerow({"game": i, "name": f"game {i}"})
+        await writer.close()
+
+        # Each full row group is sent as soon as it is written.
+        assert response.write.await_count >= 3
+        parquet = pq.ParquetFile(io.BytesIO(written(response)))
+        assert parquet.metadata.num_row_groups == 3
+        assert parquet.read().column("game").to_pylist() == list(range(7))
+        assert writer.rows == 7
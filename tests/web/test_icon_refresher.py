@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from spellbot.settings import settings
+from spellbot.web import icon_refresher as icon_refresher_mod
+from spellbot.web.icon_refresher import (
+    ICON_ATTEMPT_KEY_PREFIX,
+    IconRefresher,
+    claim_icon_fetches,
+    fetch_icons,
+)
+
+if TYPE_CHECKING:
+    from pytest_mock import MockerFixture
+
+    from tests.fixtures import Factories
+
+pytestmark = pytest.mark.use_db
+
+
+@pytest.mark.asyncio
+class TestClaimIconFetches:
+    async def test_claims_through_redis(self) -> None:
+        redis = MagicMock()
+        redis.pipeline.return_value.execute = AsyncMock(return_value=[True, None])
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch.object(icon_refresher_mod, "get_redis", AsyncMock(return_value=redis)),
+        ):
+            assert await claim_icon_fetches([1, 2]) == [1]
+        redis.pipeline.return_value.set.assert_any_call(
+            f"{ICON_ATTEMPT_KEY_PREFIX}2",
+            "1",
+            nx=True,
+            ex=icon_refresher_mod.ICON_FETCH_TTL_S,
+        )
+
+    async def test_claims_locally_when_redis_fails(self) -> None:
+        redis = MagicMock()
+        redis.pipeline.return_value.execute = AsyncMock(side_effect=RedisError("down"))
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch.object(icon_refresher_mod, "get_redis", AsyncMock(return_value=redis)),
+        ):
+            assert await claim_icon_fetches([1, 2]) == [1, 2]
+            assert await claim_icon_fetches([1, 2, 3]) == [3]
+
+
+@pytest.mark.asyncio
+class TestFetchIcons:
+    async def test_limits_concurrent_fetches(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(settings, "ICON_FETCH_CONCURRENCY", 2)
+        running = peak = 0
+
+        async def fetch_icon_url(xid: int) -> str | None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return f"https://cdn/{xid}.png" if xid % 2 else None
+
+        mocker.patch("spellbot.services.guilds.fetch_icon_url", new=fetch_icon_url)
+
+        assert await fetch_icons([1, 2, 3, 4, 5]) == {
+            1: "https://cdn/1.png",
+            3: "https://cdn/3.png",
+            5: "https://cdn/5.png",
+        }
+        assert peak == 2
+
+
+@pytest.mark.asyncio
+class TestIconRefresher:
+    async def test_stores_fetched_icons_at_once(
+        self,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        factories.guild.create(xid=1, name="one", icon=None)
+        factories.guild.create(xid=2, name="two", icon=None)
+        mocker.patch(
+            "spellbot.services.guilds.fetch_icon_url",
+            new=AsyncMock(side_effect=lambda xid: f"https://cdn/{xid}.png"),
+        )
+        set_icons = mocker.spy(icon_refresher_mod.services.guilds, "set_icons")
+        refresher = IconRefresher()
+
+        refresher.request([1, 2])
+        refresher.request([2])
+        assert refresher.task is not None
+        await refresher.task
+
+        set_icons.assert_called_once_with({1: "https://cdn/1.png", 2: "https://cdn/2.png"})
+        assert not refresher.pending
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any
+
+from spellbot.web.json_encoding import (
+    JSON_COMPRESS_MIN_BYTES,
+    dumps,
+    json_response,
+    stdlib_dumps,
+)
+
+PAYLOAD: dict[Any, Any] = {
+    "when": datetime(2020, 1, 2, 3, 4, 5, tzinfo=UTC),
+    "day": date(2020, 1, 2),
+    "amount": Decimal("1.50"),
+    7: ["seven", None, True, 1.5],
+}
+EXPECTED = {
+    "when": "2020-01-02T03:04:05+00:00",
+    "day": "2020-01-02",
+    "amount": "1.50",
+    "7": ["seven", None, True, 1.5],
+}
+
+
+class TestStdlibDumps:
+    def test_encodes_dates_and_others(self) -> None:
+        assert json.loads(stdlib_dumps(PAYLOAD)) == EXPECTED
+
+
+class TestDumps:
+    def test_matches_stdlib(self) -> None:
+        assert dumps(PAYLOAD) == stdlib_dumps(PAYLOAD)
+
+    def test_big_int_falls_back_to_stdlib(self) -> None:
+        assert dumps({"big": 2**70}) == b'{"big":1180591620717411303424}'
+
+
+class TestJsonResponse:
+    def test_small_body_is_not_compressed(self) -> None:
+        response = json_response({"ok": True}, status=201)
+        assert response.status == 201
+        assert response.content_type == "application/json"
+        assert json.loads(response.body) == {"ok": True}  # type: ignore
+        assert not response.compression
+
+    def test_large_body_is_compressed(self) -> None:
+        response = json_response({"rows": ["x" * JSON_COMPRESS_MIN_BYTES]})
+        assert response.compression
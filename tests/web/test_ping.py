@@ -9,6 +9,8 @@ import pytest_asyncio
 from spellbot import redis_client
 from spellbot.redis_client import close_redis
 from spellbot.settings import settings
+from spellbot.web.assets import IMMUTABLE_CACHE_CONTROL, build_js_bundles
+from spellbot.web.builder import TEMPLATES_ROOT
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
@@ -44,7 +46,7 @@ class TestWebStaticFiles:
         assert "ANALYTICS_CONFIG" in text
         # pure helpers are concatenated ahead of the main IIFE
         assert "function toDayMap" in text
-        assert resp.headers.get("Cache-Control") == "no-cache, no-store, must-revalidate"
+        assert resp.headers.get("Cache-Control") == "no-cache"
 
     async def test_dashboard_js(self, client: ClientSession) -> None:
         resp = await client.get("/dashboard.js")
@@ -53,7 +55,22 @@ class TestWebStaticFiles:
         text = await resp.text()
         # pure helpers are concatenated ahead of the main IIFE
         assert "PERIOD_BUCKET" in text
-        assert resp.headers.get("Cache-Control") == "no-cache, no-store, must-revalidate"
+        assert resp.headers.get("Cache-Control") == "no-cache"
+
+    async def test_fingerprinted_bundle(self, client: ClientSession) -> None:
+        bundle = build_js_bundles(TEMPLATES_ROOT)["analytics"]
+        resp = await client.get(bundle.url, headers={"Accept-Encoding": "gzip"})
+        assert resp.status == 200
+        assert resp.headers.get("Cache-Control") == IMMUTABLE_CACHE_CONTROL
+        assert resp.headers.get("Content-Encoding") == "gzip"
+        assert resp.headers.get("Vary") == "Accept-Encoding"
+        assert await resp.read() == bundle.body
+
+    async def test_unchanged_bundle_is_not_modified(self, client: ClientSession) -> None:
+        resp = await client.get("/dashboard.js")
+        etag = resp.headers["ETag"]
+        resp = await client.get("/dashboard.js", headers={"If-None-Match": etag})
+        assert resp.status == 304
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from spellbot.web.queue_stream import RELOAD_EVENT, STREAM_BACKLOG, QueueEventHub
+
+if TYPE_CHECKING:
+    from tests.fixtures import Factories
+
+pytestmark = pytest.mark.use_db
+
+
+class TestBroadcast:
+    def test_sends_to_every_stream(self) -> None:
+        hub = QueueEventHub()
+        streams = [asyncio.Queue[str](), asyncio.Queue[str]()]
+        hub.streams.update(streams)
+
+        hub.broadcast("hello")
+
+        assert [stream.get_nowait() for stream in streams] == ["hello", "hello"]
+
+    def test_full_stream_is_told_to_reload(self) -> None:
+        hub = QueueEventHub()
+        stream = asyncio.Queue[str](maxsize=STREAM_BACKLOG)
+        hub.streams.add(stream)
+
+        for n in range(STREAM_BACKLOG + 1):
+            hub.broadcast(str(n))
+
+        assert stream.qsize() == 1
+        assert stream.get_nowait() == RELOAD_EVENT
+
+
+@pytest.mark.asyncio
+class TestDispatch:
+    async def test_only_public_guilds_are_sent(self, factories: Factories) -> None:
+        factories.guild.create(xid=1, name="public", promote=True)
+        factories.guild.create(xid=2, name="private", promote=False)
+        hub = QueueEventHub()
+        stream = asyncio.Queue[str]()
+        hub.streams.add(stream)
+
+        await hub.dispatch(json.dumps({"type": "seat", "game_id": 10, "guild_xid": 2}))
+        await hub.dispatch(json.dumps({"type": "seat", "game_id": 11, "guild_xid": 1}))
+
+        assert json.loads(stream.get_nowait())["game_id"] == 11
+        assert stream.empty()
+
+    async def test_malformed_events_are_dropped(self) -> None:
+        hub = QueueEventHub()
+        stream = asyncio.Queue[str]()
+        hub.streams.add(stream)
+
+        await hub.dispatch(b"not json")
+
+        assert stream.empty()
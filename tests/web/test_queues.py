@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
@@ -15,7 +16,8 @@ from spellbot.models import Guild
 from spellbot.services import alerts
 from spellbot.web.api import admin_auth
 from spellbot.web.api import queues as queues_endpoint_mod
-from spellbot.web.api.queues import SPELLBOT_DEFAULT_LOGO, format_wait, language_name
+from spellbot.web.api.queues import SPELLBOT_DEFAULT_LOGO, format_wait
+from spellbot.web.icon_refresher import ICON_FETCH_TTL_S, icon_refresher
 
 if TYPE_CHECKING:
     from aiohttp import web
@@ -32,11 +34,6 @@ pytestmark = pytest.mark.use_db
 NOW = datetime(2024, 6, 15, 12, 0, tzinfo=UTC)
 
 
-@pytest.fixture(autouse=True)
-def _clear_icon_fetch_throttle() -> None:
-    queues_endpoint_mod._icon_fetch_attempts.clear()
-
-
 class TestFormatWait:
     def test_sub_minute(self) -> None:
         assert format_wait(0) == "<1m"
@@ -55,20 +52,6 @@ class TestFormatWait:
         assert format_wait(3 * 60 * 60 + 45 * 60) == "3h 45m"
 
 
-class TestLanguageName:
-    def test_known_locales(self) -> None:
-        assert language_name("en") == "English"
-        assert language_name("ja") == "Japanese"
-        assert language_name("es-ES") == "Spanish"
-
-    def test_unknown_locale_returns_code(self) -> None:
-        assert language_name("xx") == "xx"
-
-    def test_none_defaults_to_english(self) -> None:
-        assert language_name(None) == "English"
-        assert language_name("") == "English"
-
-
 @pytest.mark.asyncio
 class TestQueuesEndpoint:
     async def test_renders_empty_state(self, client: WebClient) -> None:
@@ -167,15 +150,20 @@ class TestQueuesEndpoint:
             new=AsyncMock(return_value=fetched),
         ) as mock_fetch:
             resp = await client.get("/queues")
-        assert resp.status == 200
-        body = await resp.text()
-        assert fetched in body
+            # The page doesn't wait for Discord, the icon is fetched in the background.
+            assert resp.status == 200
+            assert SPELLBOT_DEFAULT_LOGO in await resp.text()
+            assert icon_refresher.task is not None
+            await icon_refresher.task
         mock_fetch.assert_awaited_once_with(guild.xid)
         DatabaseSession.expire_all()
         refreshed = await DatabaseSession.get(Guild, guild.xid)
         assert refreshed
         assert refreshed.icon == fetched
 
+        freezer.move_to(NOW + timedelta(seconds=queues_endpoint_mod.QUEUES_SNAPSHOT_TTL_S))
+        assert fetched in await (await client.get("/queues")).text()
+
     async def test_falls_back_to_default_logo_when_discord_returns_no_icon(
         self,
         client: WebClient,
@@ -288,13 +276,18 @@ class TestQueuesEndpoint:
         )
         factories.queue.create(user_xid=u1.xid, game_id=game.id, og_guild_xid=guild.xid)
 
+        async def get_queues(at: timedelta) -> None:
+            freezer.move_to(NOW + at)
+            assert (await client.get("/queues")).status == 200
+            if icon_refresher.task is not None:
+                await icon_refresher.task
+
         mock = AsyncMock(return_value=None)
         with patch("spellbot.services.guilds.fetch_icon_url", new=mock):
-            assert (await client.get("/queues")).status == 200
-            assert (await client.get("/queues")).status == 200
+            await get_queues(timedelta())
+            await get_queues(timedelta(minutes=1))
             assert mock.await_count == 1
-            freezer.move_to(NOW + queues_endpoint_mod.ICON_FETCH_TTL)
-            assert (await client.get("/queues")).status == 200
+            await get_queues(timedelta(seconds=ICON_FETCH_TTL_S))
             assert mock.await_count == 2
 
     async def test_renders_inline_active_games_stat(
@@ -469,6 +462,8 @@ class TestQueuesEndpoint:
         assert 'id="filter-mine"' in body
         assert "checked" in body
         assert "Logged in as" in body
+        # Live updates only count new games in the viewer's own servers.
+        assert "var memberGuilds = [980201];" in body
 
     async def test_my_param_ignored_when_no_viewer_session(
         self,
@@ -689,6 +684,73 @@ class TestQueuesJsonEndpoint:
         assert len(payload["games"]) == 1
         assert payload["games"][0]["logo"] == SPELLBOT_DEFAULT_LOGO
 
+    async def test_snapshot_shared_between_requests(
+        self,
+        client: WebClient,
+        factories: Factories,
+        freezer: FrozenDateTimeFactory,
+        mocker: MockerFixture,
+    ) -> None:
+        freezer.move_to(NOW)
+        guild = factories.guild.create(xid=980701, name="Shared", icon="https://x/y.png")
+        ch = factories.channel.create(xid=980711, name="lfg", guild=guild)
+        factories.game.create(guild=guild, channel=ch, started_at=NOW - timedelta(minutes=5))
+        spy = mocker.spy(queues_endpoint_mod.services.queues, "public_active_games")
+
+        assert (await client.get("/queues.json")).status == 200
+        assert (await client.get("/queues")).status == 200
+        assert spy.call_count == 1
+
+        freezer.move_to(NOW + timedelta(seconds=queues_endpoint_mod.QUEUES_SNAPSHOT_TTL_S))
+        payload = await (await client.get("/queues.json")).json()
+        assert spy.call_count == 2
+        assert payload["games"][0]["started_seconds_ago"] == 5 * 60 + 5
+
+    async def test_not_modified_when_etag_matches(self, client: WebClient) -> None:
+        for path in ("/queues.json", "/queues"):
+            resp = await client.get(path)
+            assert resp.status == 200
+            etag = resp.headers["ETag"]
+
+            resp = await client.get(path, headers={"If-None-Match": etag})
+            assert resp.status == 304
+            assert resp.headers["ETag"] == etag
+            assert await resp.read() == b""
+
+            resp = await client.get(path, headers={"If-None-Match": '"stale"'})
+            assert resp.status == 200
+
+
+@pytest.mark.asyncio
+class TestQueuesStreamEndpoint:
+    async def test_no_content_without_redis(self, client: WebClient) -> None:
+        with patch.object(queues_endpoint_mod.settings, "REDIS_URL", None):
+            resp = await client.get("/queues/stream")
+        assert resp.status == 204
+
+    async def test_streams_hub_events(self, client: WebClient, mocker: MockerFixture) -> None:
+        stream = asyncio.Queue[str]()
+        stream.put_nowait('{"type": "seat", "game_id": 1}')
+        mocker.patch.object(queues_endpoint_mod.settings, "REDIS_URL", "redis://localhost")
+        mocker.patch.object(queues_endpoint_mod.queue_event_hub, "connect", return_value=stream)
+        disconnect = mocker.patch.object(queues_endpoint_mod.queue_event_hub, "disconnect")
+        # Keepalives notice the client going away.
+        mocker.patch.object(queues_endpoint_mod, "QUEUES_STREAM_KEEPALIVE_S", 0.01)
+
+        resp = await client.get("/queues/stream")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "text/event-stream"
+        assert await resp.content.readline() == b"retry: 5000\n"
+        assert await resp.content.readline() == b"\n"
+        assert await resp.content.readline() == b'data: {"type": "seat", "game_id": 1}\n'
+        resp.close()
+
+        for _ in range(100):
+            if disconnect.called:
+                break
+            await asyncio.sleep(0.01)
+        disconnect.assert_called_once_with(stream)
+
 
 @pytest.mark.asyncio
 class TestPlayedGuildsSection:
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import html
+import io
+import json
+import re
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 from unittest.mock import AsyncMock, MagicMock
 
+import pyarrow.parquet as pq
 import pytest
 from sqlalchemy import func, select
 
 from spellbot.database import DatabaseSession
 from spellbot.enums import GameBracket, GameFormat
 from spellbot.models import Block, Channel, GameStatus, Guild, GuildAward, User
+from spellbot.services.plays import RecordCursor, encode_cursor
 from spellbot.web.api import record
 
 if TYPE_CHECKING:
@@ -718,6 +724,57 @@ class TestWebRecordFilters:
         assert "(1 matching)" in text
         assert "SB#12" in text
 
+    async def test_channel_pages_follow_cursor_links(
+        self,
+        client: ClientSession,
+        factories: Factories,
+    ) -> None:
+        guild = factories.guild.create(xid=702, name="paging-guild")
+        channel = factories.channel.create(xid=802, name="paging-channel", guild=guild)
+        user = factories.user.create(xid=603, name="carol")
+        for gid in range(21, 33):
+            when = datetime(2024, 1, 1, tzinfo=UTC) + timedelta(days=gid)
+            g = factories.game.create(
+                id=gid,
+                status=GameStatus.STARTED.value,
+                guild=guild,
+                channel=channel,
+                created_at=when,
+                updated_at=when,
+            )
+            factories.post.create(guild=guild, channel=channel, game=g, message_xid=9000 + gid)
+            factories.play.create(game_id=g.id, user_xid=user.xid)
+
+        resp = await client.get(f"/g/{guild.xid}/c/{channel.xid}?with_player=carol&sort=id")
+        text = await resp.text()
+        assert "(12 matching)" in text
+        assert "SB#32" in text
+        assert "SB#22" not in text
+        next_link = re.search(r'href="([^"]*cursor=[^"]*)" class="button"', text)
+        assert next_link is not None
+        next_url = html.unescape(next_link.group(1))
+        # Filters and sort carry over to the next page.
+        assert "with_player=carol&sort=id&cursor=" in next_url
+
+        resp = await client.get(next_url)
+        text = await resp.text()
+        assert "SB#22" in text
+        assert "SB#21" in text
+        assert "SB#23" not in text
+        assert "(12 matching)" in text
+
+    async def test_cursor_from_another_sort_shows_first_page(
+        self,
+        client: ClientSession,
+        factories: Factories,
+    ) -> None:
+        guild_xid, channel_xid, _ = self.seed_channel(factories)
+        cursor = encode_cursor(RecordCursor("id", "desc", 12, 12))
+        resp = await client.get(f"/g/{guild_xid}/c/{channel_xid}?cursor={cursor}")
+        assert resp.status == 200
+        text = await resp.text()
+        assert "SB#13" in text
+
 
 @pytest.mark.asyncio
 class TestWebRecordExport:
@@ -816,6 +873,8 @@ class TestWebRecordExport:
 
         with caplog.at_level("INFO"):
             resp = await client.get(f"/u/{user.xid}/export.csv")
+            # Headers arrive before the first row is fetched; wait for the handler to end.
+            await resp.read()
 
         # The disconnect is swallowed: the request completes without a 500/traceback.
         assert resp.status == 200
@@ -861,6 +920,91 @@ class TestWebRecordExport:
         assert "user-1,101" in lines[1] or "user-1,101" in lines[2]
         assert "user-2,102" in lines[1] or "user-2,102" in lines[2]
 
+    @staticmethod
+    def seed_export(factories: Factories) -> tuple[int, int, int]:
+        user1 = factories.user.create(xid=101, name="user-1")
+        user2 = factories.user.create(xid=102, name="user-2")
+        guild = factories.guild.create(xid=201, name="guild")
+        channel = factories.channel.create(xid=301, name="channel", guild=guild)
+        game = factories.game.create(
+            id=1,
+            seats=2,
+            status=GameStatus.STARTED.value,
+            format=GameFormat.MODERN.value,
+            guild=guild,
+            channel=channel,
+            created_at=datetime(2020, 1, 1, tzinfo=UTC),
+            updated_at=datetime(2020, 1, 1, tzinfo=UTC),
+        )
+        factories.post.create(guild=guild, channel=channel, game=game, message_xid=901)
+        factories.play.create(game_id=game.id, user_xid=user1.xid)
+        factories.play.create(game_id=game.id, user_xid=user2.xid)
+        return guild.xid, channel.xid, user1.xid
+
+    async def test_user_export_ndjson(self, client: ClientSession, factories: Factories) -> None:
+        _, _, user_xid = self.seed_export(factories)
+
+        resp = await client.get(f"/u/{user_xid}/export.ndjson")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"].startswith("application/x-ndjson")
+        assert f"user-{user_xid}-" in resp.headers["Content-Disposition"]
+        assert ".ndjson" in resp.headers["Content-Disposition"]
+
+        lines = (await resp.read()).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "game": 1,
+                "time": "2020-01-01T00:00:00+00:00",
+                "guild_xid": 201,
+                "guild": "guild",
+                "channel_xid": 301,
+                "channel": "channel",
+                "format": "Modern",
+                "seats": 2,
+                "bracket": "None",
+                "locale": "en",
+                "link": None,
+                "players": [{"name": "user-1", "xid": 101}, {"name": "user-2", "xid": 102}],
+            },
+        ]
+
+    async def test_channel_export_ndjson(
+        self,
+        client: ClientSession,
+        factories: Factories,
+    ) -> None:
+        guild_xid, channel_xid, _ = self.seed_export(factories)
+
+        resp = await client.get(f"/g/{guild_xid}/c/{channel_xid}/export.ndjson")
+        assert resp.status == 200
+        rows = [json.loads(line) for line in (await resp.read()).decode("utf-8").splitlines()]
+        assert sorted((row["user_name"], row["user_xid"]) for row in rows) == [
+            ("user-1", 101),
+            ("user-2", 102),
+        ]
+        assert all(row["game"] == 1 for row in rows)
+
+    async def test_export_parquet(self, client: ClientSession, factories: Factories) -> None:
+        guild_xid, channel_xid, user_xid = self.seed_export(factories)
+
+        resp = await client.get(f"/u/{user_xid}/export.parquet")
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "application/vnd.apache.parquet"
+        assert "Content-Encoding" not in resp.headers
+        table = pq.read_table(io.BytesIO(await resp.read()))
+        assert table.column("players").to_pylist() == [
+            [{"name": "user-1", "xid": 101}, {"name": "user-2", "xid": 102}],
+        ]
+
+        resp = await client.get(f"/g/{guild_xid}/c/{channel_xid}/export.parquet")
+        assert resp.status == 200
+        table = pq.read_table(io.BytesIO(await resp.read()))
+        assert sorted(table.column("user_xid").to_pylist()) == [101, 102]
+
+    async def test_export_unknown_format(self, client: ClientSession) -> None:
+        resp = await client.get("/u/101/export.xlsx")
+        assert resp.status == 404
+
     async def test_channel_export_no_plays(
         self,
         client: ClientSession,
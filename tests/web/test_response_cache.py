@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from spellbot import redis_client
+from spellbot.redis_client import close_redis
+from spellbot.settings import settings
+from spellbot.web import response_cache
+from spellbot.web.response_cache import cached_response, response_cache_key
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from freezegun.api import FrozenDateTimeFactory
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_redis_client() -> AsyncGenerator[None]:
+    redis_client._redis_client = None
+    yield
+    await close_redis()
+
+
+class FakeRedis:
+    """Just enough of a Redis client for the response cache, kept in a dict."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, *, ex: int, nx: bool = False) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value.encode()
+        return True
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        assert script == response_cache.RELEASE_LOCK_SCRIPT
+        if self.data.get(key) != token.encode():
+            return 0
+        del self.data[key]
+        return 1
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.data)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await self.release.wait()
+        return f"response {self.calls}"
+
+
+KEY = response_cache_key("dashboard", "/admin/dashboard/summary", "30d", "all", None)
+
+
+@pytest.mark.asyncio
+class TestLocalResponseCache:
+    @pytest.fixture(autouse=True)
+    def without_redis(self) -> Any:
+        with patch.object(settings, "REDIS_URL", None):
+            yield
+
+    async def test_caches_until_ttl(self, freezer: FrozenDateTimeFactory) -> None:
+        compute = Counter()
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        freezer.tick(61)
+        assert await cached_response(KEY, 60, compute) == "response 2"
+
+    async def test_keys_are_separate(self) -> None:
+        compute = Counter()
+        other = response_cache_key("dashboard", "/admin/dashboard/summary", "7d", "all", None)
+        await cached_response(KEY, 60, compute)
+        assert await cached_response(other, 60, compute) == "response 2"
+
+    async def test_single_flight(self) -> None:
+        compute = Counter()
+        compute.release.clear()
+        waiters = [asyncio.create_task(cached_response(KEY, 60, compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        compute.release.set()
+        assert await asyncio.gather(*waiters) == ["response 1"] * 5
+        assert compute.calls == 1
+        assert not response_cache.responses_in_flight
+
+    async def test_errors_are_not_cached(self) -> None:
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError):
+            await cached_response(KEY, 60, failing)
+        assert await cached_response(KEY, 60, Counter()) == "response 1"
+
+
+@pytest.mark.asyncio
+class TestRedisResponseCache:
+    @pytest.fixture
+    def redis(self) -> Any:
+        fake = FakeRedis()
+        with (
+            patch.object(settings, "REDIS_URL", "redis://localhost"),
+            patch("spellbot.redis_client.aioredis.from_url", AsyncMock(return_value=fake)),
+        ):
+            yield fake
+
+    async def test_shares_responses_through_redis(self, redis: FakeRedis) -> None:
+        compute = Counter()
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        assert redis.data[KEY] == b"response 1"
+        assert f"{KEY}:lock" not in redis.data
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        assert compute.calls == 1
+        assert not response_cache.response_cache
+
+    async def test_waits_for_another_process(self, redis: FakeRedis) -> None:
+        redis.data[f"{KEY}:lock"] = b"1"
+        compute = Counter()
+
+        async def other_process_finishes() -> None:
+            await asyncio.sleep(0.1)
+            redis.data[KEY] = b"theirs"
+            del redis.data[f"{KEY}:lock"]
+
+        finisher = asyncio.create_task(other_process_finishes())
+        assert await cached_response(KEY, 60, compute) == "theirs"
+        await finisher
+        assert compute.calls == 0
+
+    async def test_computes_when_other_process_gives_up(self, redis: FakeRedis) -> None:
+        redis.data[f"{KEY}:lock"] = b"1"
+        compute = Counter()
+
+        async def other_process_fails() -> None:
+            await asyncio.sleep(0.1)
+            del redis.data[f"{KEY}:lock"]
+
+        failer = asyncio.create_task(other_process_fails())
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        await failer
+
+    async def test_falls_back_to_local_cache_on_redis_errors(self, redis: FakeRedis) -> None:
+        compute = Counter()
+        with patch.object(redis, "get", AsyncMock(side_effect=RedisConnectionError)):
+            assert await cached_response(KEY, 60, compute) == "response 1"
+        assert await cached_response(KEY, 60, compute) == "response 1"
+        assert compute.calls == 1
+
+    async def test_keeps_a_lock_taken_by_another_request(self, redis: FakeRedis) -> None:
+        compute = Counter()
+        compute.release.clear()
+        task = asyncio.create_task(cached_response(KEY, 60, compute))
+        await asyncio.sleep(0.01)
+
+        # The lock expired while computing and another request took it.
+        redis.data[f"{KEY}:lock"] = b"theirs"
+        compute.release.set()
+        assert await task == "response 1"
+        assert redis.data[f"{KEY}:lock"] == b"theirs"
+
+    async def test_returns_the_response_when_redis_fails_to_store_it(
+        self,
+        redis: FakeRedis,
+    ) -> None:
+        compute = Counter()
+        real_set = redis.set
+
+        async def set_lock_only(key: str, value: str, *, ex: int, nx: bool = False) -> bool:
+            if not nx:
+                raise RedisConnectionError
+            return await real_set(key, value, ex=ex, nx=nx)
+
+        with patch.object(redis, "set", set_lock_only):
+            assert await cached_response(KEY, 60, compute) == "response 1"
+        assert compute.calls == 1
+        assert f"{KEY}:lock" not in redis.data
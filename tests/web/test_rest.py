@@ -10,6 +10,7 @@ import pytest_asyncio
 from spellbot.data import PostData
 from spellbot.enums import GameFormat
 from spellbot.models import GameStatus
+from spellbot.services import apps
 from spellbot.web.api import rest
 from spellbot.web.api.rest import (
     close_http_session,
@@ -237,6 +238,30 @@ class TestWebRecord:
         assert resp.status == 429
         assert await resp.json() == {"error": "Rate limited"}
 
+    async def test_token_is_loaded_once(
+        self,
+        client: ClientSession,
+        factories: Factories,
+        mocker: MockerFixture,
+    ) -> None:
+        token = factories.token.create(key="ONCE", scopes="game")
+        load = mocker.spy(apps, "load_token_scopes")
+
+        for _ in range(3):
+            resp = await client.post(
+                "/api/game/1/verify",
+                headers={"Authorization": f"Bearer {token.key}"},
+                json={"user_xid": 1, "guild_xid": 1, "pin": "A"},
+            )
+            assert resp.status == 200
+        resp = await client.post(
+            "/api/other/1",
+            headers={"Authorization": f"Bearer {token.key}"},
+            json={},
+        )
+        assert resp.status == 403
+        assert load.call_count == 1
+
 
 class TestReply:
     def test_reply_success(self) -> None:
@@ -418,6 +443,57 @@ class TestSendDm:
         await send_dm(101, {"content": "Hello"})
         assert mock_post.call_count == 2
 
+    async def test_send_dm_caches_channel(self, mocker: MockerFixture) -> None:
+        redis = mocker.MagicMock()
+        redis.get = mocker.AsyncMock(return_value=None)
+        redis.set = mocker.AsyncMock()
+        mocker.patch.object(rest.settings, "REDIS_URL", "redis://localhost")
+        mocker.patch("spellbot.web.api.rest.get_redis", mocker.AsyncMock(return_value=redis))
+        mocker.patch(
+            "spellbot.web.api.rest.post_with_retry",
+            side_effect=[{"id": "channel123"}, {"id": "message456"}],
+        )
+        await send_dm(101, {"content": "Hello"})
+        redis.set.assert_awaited_once_with(
+            f"{rest.DM_CHANNEL_KEY_PREFIX}101",
+            "channel123",
+            ex=rest.DM_CHANNEL_TTL_S,
+        )
+
+    async def test_send_dm_uses_cached_channel(self, mocker: MockerFixture) -> None:
+        redis = mocker.MagicMock()
+        redis.get = mocker.AsyncMock(return_value=b"channel123")
+        mocker.patch.object(rest.settings, "REDIS_URL", "redis://localhost")
+        mocker.patch("spellbot.web.api.rest.get_redis", mocker.AsyncMock(return_value=redis))
+        mock_post = mocker.patch(
+            "spellbot.web.api.rest.post_with_retry",
+            return_value={"id": "message456"},
+        )
+        await send_dm(101, {"content": "Hello"})
+        mock_post.assert_called_once_with(
+            rest.get_http_session(),
+            "/channels/channel123/messages",
+            {"content": "Hello"},
+        )
+
+    async def test_send_dm_reopens_missing_channel(self, mocker: MockerFixture) -> None:
+        redis = mocker.MagicMock()
+        redis.get = mocker.AsyncMock(return_value=b"gone")
+        redis.set = mocker.AsyncMock()
+        redis.delete = mocker.AsyncMock()
+        mocker.patch.object(rest.settings, "REDIS_URL", "redis://localhost")
+        mocker.patch("spellbot.web.api.rest.get_redis", mocker.AsyncMock(return_value=redis))
+        missing = aiohttp.ClientResponseError(None, None, status=404)  # type: ignore
+        mock_post = mocker.patch(
+            "spellbot.web.api.rest.post_with_retry",
+            side_effect=[missing, {"id": "channel123"}, {"id": "message456"}],
+        )
+        await send_dm(101, {"content": "Hello"})
+        assert mock_post.call_count == 3
+        assert mock_post.call_args.args[1] == "/channels/channel123/messages"
+        redis.delete.assert_awaited_once_with(f"{rest.DM_CHANNEL_KEY_PREFIX}101")
+        redis.set.assert_awaited_once()
+
     async def test_send_dm_unrecoverable_error(self, mocker: MockerFixture) -> None:
         exc = aiohttp.ClientResponseError(None, None, status=403)  # type: ignore
         mocker.patch("spellbot.web.api.rest.post_with_retry", side_effect=exc)
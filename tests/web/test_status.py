@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from spellbot.pool_stats import PoolStats
 from spellbot.shard_status import ShardStatus
 from spellbot.web.api.status import format_latency, format_time_ago, get_int, get_latency_class
 
@@ -277,6 +278,35 @@ class TestWebStatus:
             text = await resp.text()
             assert "300.0ms" in text
 
+    async def test_status_pools(self, client: ClientSession) -> None:
+        """Test status page shows database pool statistics published by the bot."""
+        stats = PoolStats(name="primary", size=20, max_overflow=40)
+        stats.record_checkout(wait_ms=120.0, in_use=25, overflow=5, age_s=1790.0)
+        mock_metadata = {
+            "shard_count": 1,
+            "total_guilds": 100,
+            "last_updated": "2026-01-13T12:00:00+00:00",
+            "pools": [stats.snapshot()],
+        }
+
+        with (
+            patch(
+                "spellbot.web.api.status.get_all_shard_statuses",
+                new_callable=AsyncMock,
+                return_value=([], mock_metadata),
+            ),
+            patch("spellbot.web.api.status.pool_snapshots", return_value=[]),
+        ):
+            resp = await client.get("/status")
+            assert resp.status == 200
+            text = await resp.text()
+            assert "Database Pools" in text
+            assert "Bot · primary" in text
+            assert "25/20 (peak 25)" in text
+            assert "5/40 (peak 5)" in text
+            assert "250ms / 120ms" in text
+            assert "1790s" in text
+
 
 @pytest.mark.asyncio
 class TestWebStatusJson: